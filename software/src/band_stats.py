@@ -0,0 +1,531 @@
+"""band_stats.py.
+
+Summary statistics for band power rows. summarize() is a fused kernel for
+arrays held in memory; OnlineStats is an online, mergeable accumulator whose
+mean and variance use Welford's algorithm and whose median, quartiles, and
+mode come from a bounded-memory t-digest, so a live session can be summarized
+at any time without re-scanning its history.
+"""
+
+import numpy as np
+
+# global variables
+COMPRESSION = 100  # t-digest size parameter; ~COMPRESSION centroids max
+BUFFER_SIZE = 500  # rows buffered before each t-digest compression
+
+
+def summarize(values) -> dict:
+    """Computes every get_stats measure for each column in a fused pass.
+
+    One partition of a working copy yields the minimum, maximum, median and
+    quartiles; the mean and variance come from the same copy, which is then
+    reused to histogram the values for a mode estimate.
+
+    Missing values (NaN) are skipped per column, as pandas does: columns
+    without any go through the fused pass together, and each column with
+    some is summarized from its remaining values alone.
+
+    Arguments:
+        values (array-like): A (n_rows, n_columns) array of numbers, NaN
+            where a value is missing.
+
+    Returns:
+        dict: Arrays of one value per column for mean, median, mode, range,
+            variance, std_dev, and iqr. Variance uses ddof=1 and quantiles
+            interpolate linearly, as pandas does. Columns with no values are
+            NaN throughout.
+    """
+    work = np.array(values, dtype=float, order="F", ndmin=2)
+    missing = np.isnan(work)
+    if not missing.any():
+        return _summarize(work)
+
+    gaps = missing.any(axis=0)
+    complete = _summarize(np.asfortranarray(work[:, ~gaps]))
+    stats = {key: np.full(work.shape[1], np.nan) for key in complete}
+    for key, column_values in complete.items():
+        stats[key][~gaps] = column_values
+    for column in np.flatnonzero(gaps):
+        present = work[~missing[:, column], column]
+        if len(present):
+            for key, value in _summarize(present[:, None]).items():
+                stats[key][column] = value[0]
+
+    return stats
+
+
+def _summarize(work: np.ndarray) -> dict:
+    """Fused summarize() pass over a Fortran-ordered working copy with no
+    missing values; the copy is overwritten."""
+    n = len(work)
+
+    # order statistics from a single in-place partition
+    positions = np.array([0.25, 0.5, 0.75]) * (n - 1)
+    lower = np.floor(positions).astype(int)
+    upper = np.ceil(positions).astype(int)
+    kth = np.unique(np.concatenate([[0, n - 1], lower, upper]))
+    work.partition(kth, axis=0)
+
+    fraction = (positions - lower)[:, None]
+    quartiles = work[lower] + (work[upper] - work[lower]) * fraction
+    minimum = work[0].copy()
+    maximum = work[-1].copy()
+
+    # moments: center the working copy in place, then one dot per column
+    mean = work.sum(axis=0) / n
+    work -= mean
+    m2 = np.einsum("ij,ij->j", work, work)
+    variance = m2 / (n - 1) if n > 1 else np.full(len(mean), np.nan)
+
+    return {
+        "mean": mean,
+        "median": quartiles[1],
+        "mode": _histogram_mode(work, minimum - mean, maximum - mean) + mean,
+        "range": maximum - minimum,
+        "variance": variance,
+        "std_dev": np.sqrt(variance),
+        "iqr": quartiles[2] - quartiles[0],
+    }
+
+
+def _histogram_mode(
+    values: np.ndarray, low: np.ndarray, high: np.ndarray
+) -> np.ndarray:
+    """Center of the fullest histogram bin in each column.
+
+    Uses the Rice rule, 2 * n ** (1 / 3) equal-width bins per column, and a
+    single bincount over all columns.
+    """
+    n, n_columns = values.shape
+    n_bins = max(1, int(np.ceil(2 * n ** (1 / 3))))
+    width = (high - low) / n_bins
+    constant = width == 0
+    width[constant] = 1.0
+
+    index = ((values - low) / width).astype(np.intp)
+    np.clip(index, 0, n_bins - 1, out=index)
+    index += np.arange(n_columns) * n_bins
+    counts = np.bincount(index.ravel(), minlength=n_bins * n_columns)
+    fullest = counts.reshape(n_columns, n_bins).argmax(axis=1)
+    width[constant] = 0.0
+
+    return low + (fullest + 0.5) * width
+
+
+class TDigest:
+    """Merging t-digest quantile sketch for one numeric column.
+
+    Values are buffered and periodically merged into at most about
+    `compression` weighted centroids using the k1 scale function, which
+    keeps the tails accurate. Two digests merge by pooling their centroids.
+    """
+
+    def __init__(self, compression: int = COMPRESSION):
+        """Creates an empty digest.
+
+        Arguments:
+            compression (int): Accuracy/size trade-off; larger keeps more
+                centroids.
+        """
+        self.compression = compression
+        self._means = np.empty(0)
+        self._weights = np.empty(0)
+        self._buffer = []
+        self._buffered = 0
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def count(self) -> float:
+        """Total weight of every value added."""
+        return float(self._weights.sum()) + self._buffered
+
+    def update(self, values) -> None:
+        """Adds values to the digest.
+
+        Arguments:
+            values (array-like): One or more numeric values.
+
+        Returns:
+            None.
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        if len(values) == 0:
+            return
+
+        self._buffer.append(values)
+        self._buffered += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+        if self._buffered >= BUFFER_SIZE:
+            self._compress()
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        """Folds another digest into this one.
+
+        Arguments:
+            other (TDigest): The digest to merge in. It is not modified.
+
+        Returns:
+            TDigest: This digest.
+        """
+        other._compress()
+        self._compress()
+        self._means = np.concatenate([self._means, other._means])
+        self._weights = np.concatenate([self._weights, other._weights])
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress(force=True)
+
+        return self
+
+    def centroids(self) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the compressed centroid means and weights, sorted.
+
+        Arguments:
+            None.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Means and weights.
+        """
+        self._compress()
+        return self._means.copy(), self._weights.copy()
+
+    def quantile(self, q: float) -> float:
+        """Estimates a quantile by interpolating between centroids.
+
+        Arguments:
+            q (float): Quantile in [0, 1].
+
+        Returns:
+            float: The estimated value, or NaN if the digest is empty.
+        """
+        self._compress()
+        if len(self._means) == 0:
+            return np.nan
+        if len(self._means) == 1:
+            return float(self._means[0])
+
+        # each centroid sits at the middle of its cumulative weight
+        total = self._weights.sum()
+        centers = np.cumsum(self._weights) - self._weights / 2
+        positions = np.concatenate([[0.0], centers, [total]])
+        values = np.concatenate([[self.min], self._means, [self.max]])
+
+        return float(np.interp(q * total, positions, values))
+
+    def mode(self) -> float:
+        """Estimates the mode as the centroid with the highest density.
+
+        Density is centroid weight divided by the span between the midpoints
+        to its neighbors.
+
+        Arguments:
+            None.
+
+        Returns:
+            float: The estimated mode, or NaN if the digest is empty.
+        """
+        self._compress()
+        if len(self._means) == 0:
+            return np.nan
+        if len(self._means) == 1:
+            return float(self._means[0])
+
+        edges = np.concatenate(
+            [
+                [self.min],
+                (self._means[1:] + self._means[:-1]) / 2,
+                [self.max],
+            ]
+        )
+        widths = np.maximum(np.diff(edges), np.finfo(float).tiny)
+
+        return float(self._means[np.argmax(self._weights / widths)])
+
+    def _compress(self, force: bool = False) -> None:
+        """Merges buffered values into the centroid list."""
+        if not self._buffer and not force:
+            return
+
+        means = np.concatenate([self._means, *self._buffer])
+        weights = np.concatenate(
+            [self._weights, *(np.ones(len(b)) for b in self._buffer)]
+        )
+        self._buffer = []
+        self._buffered = 0
+        if len(means) == 0:
+            return
+
+        order = np.argsort(means, kind="stable")
+        means = means[order]
+        weights = weights[order]
+        total = weights.sum()
+
+        new_means = []
+        new_weights = []
+        cur_mean = means[0]
+        cur_weight = weights[0]
+        so_far = 0.0
+        limit = self._q_limit(0.0) * total
+
+        for mean, weight in zip(means[1:], weights[1:]):
+            if so_far + cur_weight + weight <= limit:
+                cur_weight += weight
+                cur_mean += (mean - cur_mean) * weight / cur_weight
+            else:
+                new_means.append(cur_mean)
+                new_weights.append(cur_weight)
+                so_far += cur_weight
+                limit = self._q_limit(so_far / total) * total
+                cur_mean = mean
+                cur_weight = weight
+
+        new_means.append(cur_mean)
+        new_weights.append(cur_weight)
+        self._means = np.array(new_means)
+        self._weights = np.array(new_weights)
+
+    def _q_limit(self, q: float) -> float:
+        """Largest quantile the next centroid may reach under the k1 scale
+        function."""
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q - 1) + 1
+        if k >= self.compression / 4:
+            return 1.0
+        return (np.sin(k * 2 * np.pi / self.compression) + 1) / 2
+
+
+class OnlineStats:
+    """Mergeable running statistics over the columns of band power rows.
+
+    Each update costs O(1) amortized per row, and memory stays bounded no
+    matter how long the session runs. Single rows are copied into a
+    preallocated block and folded in BUFFER_SIZE rows at a time, so update()
+    allocates nothing between flushes. A flush does allocate: it copies the
+    block, builds the block moments, and rebuilds each t-digest's centroid
+    arrays. These are transient or capped by the compression, so memory
+    stays bounded.
+    """
+
+    def __init__(self, columns, compression: int = COMPRESSION):
+        """Creates an empty accumulator.
+
+        Arguments:
+            columns (iterable of str): Column names, e.g. band names.
+            compression (int): t-digest compression for quantiles.
+        """
+        self.columns = list(columns)
+        self._count = 0
+        self._mean = np.zeros(len(self.columns))
+        self._m2 = np.zeros(len(self.columns))
+        self._digests = [TDigest(compression) for _ in self.columns]
+        self._pending = np.empty((BUFFER_SIZE, len(self.columns)))
+        self._n_pending = 0
+
+    @property
+    def count(self) -> int:
+        """Number of rows added."""
+        return self._count + self._n_pending
+
+    def update(self, row) -> None:
+        """Adds one row of values, ordered as columns.
+
+        Arguments:
+            row (array-like): One value per column.
+
+        Returns:
+            None.
+        """
+        if len(row) != len(self.columns):
+            raise ValueError(
+                f"row must have {len(self.columns)} values, got {len(row)}"
+            )
+
+        self._pending[self._n_pending] = row
+        self._n_pending += 1
+        if self._n_pending == BUFFER_SIZE:
+            self._flush()
+
+    def update_many(self, rows) -> None:
+        """Adds a block of rows.
+
+        Arguments:
+            rows (array-like): A (n_rows, n_columns) block of values.
+
+        Returns:
+            None.
+        """
+        rows = np.asarray(rows, dtype=float)
+        if rows.ndim != 2 or rows.shape[1] != len(self.columns):
+            raise ValueError(
+                f"rows must have shape (n, {len(self.columns)}), "
+                f"got {rows.shape}"
+            )
+        if len(rows) == 0:
+            return
+        self._flush()
+
+        if len(rows) == 1:
+            # Welford's update
+            self._count += 1
+            delta = rows[0] - self._mean
+            self._mean += delta / self._count
+            self._m2 += delta * (rows[0] - self._mean)
+        else:
+            block_mean = rows.mean(axis=0)
+            block_m2 = ((rows - block_mean) ** 2).sum(axis=0)
+            self._combine(len(rows), block_mean, block_m2)
+
+        for digest, column in zip(self._digests, rows.T):
+            digest.update(column)
+
+    def merge(self, other: "OnlineStats") -> "OnlineStats":
+        """Folds another accumulator over the same columns into this one.
+
+        Arguments:
+            other (OnlineStats): The accumulator to merge in. It is not
+                modified.
+
+        Returns:
+            OnlineStats: This accumulator.
+        """
+        if other.columns != self.columns:
+            raise ValueError("cannot merge statistics over different columns")
+
+        self._flush()
+        other._flush()
+        self._combine(other.count, other._mean, other._m2)
+        for digest, other_digest in zip(self._digests, other._digests):
+            digest.merge(other_digest)
+
+        return self
+
+    @property
+    def mean(self) -> np.ndarray:
+        """Running mean of each column."""
+        self._flush()
+        return self._mean.copy() if self.count else self._nan()
+
+    @property
+    def variance(self) -> np.ndarray:
+        """Sample variance (ddof=1) of each column."""
+        self._flush()
+        if self.count < 2:
+            return self._nan()
+        return self._m2 / (self.count - 1)
+
+    @property
+    def std_dev(self) -> np.ndarray:
+        """Sample standard deviation of each column."""
+        return np.sqrt(self.variance)
+
+    @property
+    def min(self) -> np.ndarray:
+        """Smallest value seen in each column."""
+        self._flush()
+        if not self.count:
+            return self._nan()
+        return np.array([d.min for d in self._digests])
+
+    @property
+    def max(self) -> np.ndarray:
+        """Largest value seen in each column."""
+        self._flush()
+        if not self.count:
+            return self._nan()
+        return np.array([d.max for d in self._digests])
+
+    def quantile(self, q: float) -> np.ndarray:
+        """Estimated quantile of each column.
+
+        Arguments:
+            q (float): Quantile in [0, 1].
+
+        Returns:
+            np.ndarray: One estimate per column.
+        """
+        self._flush()
+        return np.array([d.quantile(q) for d in self._digests])
+
+    def mode(self) -> np.ndarray:
+        """Estimated mode of each column.
+
+        Arguments:
+            None.
+
+        Returns:
+            np.ndarray: One estimate per column.
+        """
+        self._flush()
+        return np.array([d.mode() for d in self._digests])
+
+    def save(self, path) -> None:
+        """Writes the accumulator to an .npz file so a later session or
+        another worker can load and merge it.
+
+        Arguments:
+            path (str | os.PathLike): Destination file.
+
+        Returns:
+            None.
+        """
+        self._flush()
+        centroids = [d.centroids() for d in self._digests]
+        np.savez(
+            path,
+            columns=np.array(self.columns),
+            count=self.count,
+            mean=self._mean,
+            m2=self._m2,
+            compression=self._digests[0].compression if self._digests else 0,
+            bounds=np.array([[d.min, d.max] for d in self._digests]),
+            sizes=np.array([len(m) for m, _ in centroids]),
+            means=np.concatenate([m for m, _ in centroids] or [[]]),
+            weights=np.concatenate([w for _, w in centroids] or [[]]),
+        )
+
+    @classmethod
+    def load(cls, path) -> "OnlineStats":
+        """Reads an accumulator written by save().
+
+        Arguments:
+            path (str | os.PathLike): Source file.
+
+        Returns:
+            OnlineStats: The restored accumulator.
+        """
+        with np.load(path, allow_pickle=False) as state:
+            stats = cls(state["columns"].tolist(), int(state["compression"]))
+            stats._count = int(state["count"])
+            stats._mean = state["mean"]
+            stats._m2 = state["m2"]
+            offsets = np.cumsum(np.concatenate([[0], state["sizes"]]))
+            for i, digest in enumerate(stats._digests):
+                window = slice(offsets[i], offsets[i + 1])
+                digest._means = state["means"][window]
+                digest._weights = state["weights"][window]
+                digest.min, digest.max = state["bounds"][i]
+
+        return stats
+
+    def _combine(self, count, mean, m2) -> None:
+        """Chan et al. parallel combination of count, mean and M2."""
+        if count == 0:
+            return
+
+        total = self._count + count
+        delta = mean - self._mean
+        self._mean = self._mean + delta * count / total
+        self._m2 = self._m2 + m2 + delta**2 * self._count * count / total
+        self._count = total
+
+    def _flush(self) -> None:
+        """Folds the rows buffered by update() into the statistics."""
+        if self._n_pending:
+            rows = self._pending[: self._n_pending].copy()
+            self._n_pending = 0
+            self.update_many(rows)
+
+    def _nan(self) -> np.ndarray:
+        return np.full(len(self.columns), np.nan)
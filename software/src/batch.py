@@ -0,0 +1,534 @@
+"""batch.py.
+
+Non-interactive batch processing of many EEG recordings. Takes a directory or
+glob of CSV and .nsrec recordings, spreads the files across a process pool,
+and writes each file's band powers and stats to an output directory while
+reporting per-file progress and overall throughput.
+
+Runs can be interrupted and restarted: a manifest in the output directory
+records finished files with their output checksums, and each file in
+progress checkpoints after every chunk.
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+
+# global variables
+EXTENSIONS = (".csv", ".nsrec")
+BANDS_SUFFIX = ".bands.csv"
+STATS_SUFFIX = ".stats.csv"
+PARTIAL_SUFFIX = ".partial"  # raw rows of an unfinished file
+CHECKPOINT_SUFFIX = ".checkpoint.json"  # windows done for that file
+MANIFEST = "manifest.json"  # finished files and output checksums
+MANIFEST_VERSION = 1
+CHUNK_SIZE = 65536  # samples processed between checkpoints
+# BLAS/FFT thread pools per worker; the pool already uses every core
+THREAD_ENV = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+
+def find_recordings(source, prefer_converted: bool = False) -> list[str]:
+    """Lists the recordings in a directory, or the files matching a glob.
+
+    Arguments:
+        source (str | os.PathLike): A directory, searched recursively for
+            EXTENSIONS, or a glob pattern.
+        prefer_converted (bool): Leaves out each CSV that has a .nsrec of the
+            same name next to it, treating the binary copy as the same
+            recording. Nothing checks that the two hold the same samples.
+
+    Returns:
+        list[str]: Matching recording paths, sorted.
+    """
+    source = os.fspath(source)
+    if os.path.isdir(source):
+        pattern = os.path.join(source, "**", "*")
+    else:
+        pattern = source
+
+    paths = {
+        path
+        for path in glob.glob(pattern, recursive=True)
+        if os.path.isfile(path) and path.endswith(EXTENSIONS)
+    }
+    if not prefer_converted:
+        return sorted(paths)
+
+    converted = {
+        os.path.splitext(path)[0] + ".csv"
+        for path in paths
+        if path.endswith(".nsrec")
+    }
+
+    return sorted(paths - converted)
+
+
+def output_paths(path, root, out_dir) -> tuple[str, str]:
+    """Returns the band power and stats output paths for a recording,
+    mirroring its location under root.
+
+    Arguments:
+        path (str): Recording path.
+        root (str): Directory the output layout is relative to.
+        out_dir (str): Output directory.
+
+    Returns:
+        tuple[str, str]: Band power CSV and stats CSV paths.
+    """
+    relative = os.path.splitext(os.path.relpath(path, root))[0]
+    base = os.path.join(out_dir, relative)
+
+    return base + BANDS_SUFFIX, base + STATS_SUFFIX
+
+
+def process_file(
+    path,
+    root,
+    out_dir,
+    method="periodogram",
+    cache_dir=None,
+    chunk_size: int = CHUNK_SIZE,
+    resume: bool = True,
+    dtype: str = "float64",
+):
+    """Processes one recording and writes its outputs. Runs in a worker.
+
+    Band power rows are appended to a partial file after every chunk and a
+    checkpoint records how many windows are done, so an interrupted file
+    resumes from its last completed chunk.
+
+    Arguments:
+        path (str): CSV or .nsrec recording.
+        root (str): Directory the output layout is relative to.
+        out_dir (str): Output directory.
+        method (str): PSD estimator, one of spectral.PSD_METHODS.
+        cache_dir (str | None): result_cache directory, or None for no cache.
+        chunk_size (int): Samples read per chunk between checkpoints.
+        resume (bool): Continues from an existing checkpoint if it matches
+            the file and configuration.
+        dtype (str): Band power precision, one of spectral.DTYPES.
+
+    Returns:
+        dict: Report with the path, band power rows, input bytes, seconds
+            spent, output checksums, windows resumed from a checkpoint, and
+            an error message if processing failed.
+    """
+    start = time.perf_counter()
+    report = {"path": path, "rows": 0, "bytes": os.path.getsize(path)}
+
+    try:
+        import pandas as pd
+
+        import data_processing
+        import recording
+        import result_cache
+        import spectral
+
+        sampling_rate = spectral.SAMPLING_RATE
+        if path.endswith(recording.EXTENSION):
+            sampling_rate = recording.load(path).sampling_rate
+        plan = spectral.get_plan(sampling_rate=sampling_rate, dtype=dtype)
+        bands_path, stats_path = output_paths(path, root, out_dir)
+        os.makedirs(os.path.dirname(bands_path), exist_ok=True)
+
+        cache = key = result = None
+        if cache_dir is not None:
+            cache = result_cache.ResultCache(cache_dir)
+            key = cache.key(path, plan, method)
+            result = cache.get(key)
+
+        if result is None:
+            frame = _checkpointed_bands(
+                path, bands_path, plan, method, chunk_size, resume, report
+            )
+            stats = data_processing.get_stats(
+                frame.drop(columns=["timestamp"])
+            )
+            result = {"frequency_data": frame, "stats": stats}
+            if cache is not None:
+                cache.put(key, result)
+
+        _write_csv(result["frequency_data"], bands_path, index=False)
+        _write_csv(pd.DataFrame(result["stats"]), stats_path, index=True)
+        for suffix in (PARTIAL_SUFFIX, CHECKPOINT_SUFFIX):
+            if os.path.exists(bands_path + suffix):
+                os.remove(bands_path + suffix)
+
+        report["rows"] = len(result["frequency_data"])
+        report["outputs"] = {
+            output: file_checksum(output)
+            for output in (bands_path, stats_path)
+        }
+    except Exception as error:  # one bad file must not stop the batch
+        report["error"] = f"{type(error).__name__}: {error}"
+
+    report["seconds"] = time.perf_counter() - start
+
+    return report
+
+
+def _checkpointed_bands(
+    path, bands_path, plan, method, chunk_size, resume, report
+):
+    """Computes band power chunk by chunk, resuming from a checkpoint."""
+    import numpy as np
+    import pandas as pd
+
+    import data_processing
+    import recording
+    import spectral
+
+    partial_path = bands_path + PARTIAL_SUFFIX
+    checkpoint_path = bands_path + CHECKPOINT_SUFFIX
+    # float64 timestamp then band powers in the plan's precision
+    row = np.dtype(
+        [("timestamp", float), ("powers", plan.dtype, plan.n_bands)]
+    )
+    source = {
+        **_source_stamp(path),
+        "method": method,
+        "dtype": plan.dtype,
+        "row_bytes": row.itemsize,
+    }
+
+    checkpoint = _read_json(checkpoint_path) if resume else None
+    windows = 0
+    if checkpoint is not None and checkpoint.get("source") == source:
+        windows = checkpoint["windows"]
+    report["resumed_windows"] = windows
+
+    begin = windows * plan.step_size
+    if path.endswith(recording.EXTENSION):
+        blocks = data_processing.recording_blocks(
+            recording.load(path), plan, chunk_size, begin
+        )
+    else:
+        blocks = data_processing.read_csv_chunks(path, plan, chunk_size, begin)
+
+    with open(partial_path, "r+b" if windows else "wb") as partial:
+        partial.truncate(windows * row.itemsize)  # drops any torn write
+        partial.seek(0, os.SEEK_END)
+
+        for timestamps, samples in blocks:
+            powers = spectral.band_power(samples, plan, method)
+            rows = np.empty(len(powers), row)
+            rows["timestamp"] = timestamps[:: plan.step_size][: len(powers)]
+            rows["powers"] = powers
+
+            partial.write(rows.tobytes())
+            partial.flush()
+            os.fsync(partial.fileno())
+            windows += len(powers)
+            _write_json(
+                checkpoint_path, {"source": source, "windows": windows}
+            )
+
+    rows = np.fromfile(partial_path, dtype=row)
+    frame = pd.DataFrame(rows["powers"], columns=plan.band_names)
+    frame.insert(0, "timestamp", rows["timestamp"])
+
+    return frame
+
+
+def _source_stamp(path) -> dict:
+    """Size and modification time identifying one version of an input."""
+    info = os.stat(path)
+    return {"size": info.st_size, "mtime_ns": info.st_mtime_ns}
+
+
+def file_checksum(path) -> str:
+    """Returns the SHA-256 of a file's contents.
+
+    Arguments:
+        path (str): File to hash.
+
+    Returns:
+        str: Hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, data) -> None:
+    """Writes JSON next to its destination and renames it into place."""
+    partial = path + ".tmp"
+    with open(partial, "w", encoding="utf-8") as file:
+        json.dump(data, file)
+    os.replace(partial, path)
+
+
+def _write_csv(frame, path, index):
+    """Writes a CSV next to its destination and renames it into place."""
+    partial = path + ".tmp"
+    frame.to_csv(partial, index=index)
+    os.replace(partial, path)
+
+
+class Manifest:
+    """Record of finished files for a batch output directory.
+
+    Each entry holds the input's size and modification time, the run
+    configuration, and the checksums of the outputs, so a restarted batch
+    skips a file only if the input is unchanged and its outputs are intact.
+    """
+
+    def __init__(self, path):
+        """Loads the manifest, or starts an empty one.
+
+        Arguments:
+            path (str): Manifest JSON file.
+        """
+        self.path = path
+        data = _read_json(path)
+        self.files = {} if data is None else data.get("files", {})
+
+    def is_done(self, path, config: dict) -> bool:
+        """Returns True if a file finished with this configuration and its
+        outputs still match their recorded checksums.
+
+        Arguments:
+            path (str): Recording path.
+            config (dict): Run configuration.
+
+        Returns:
+            bool: True if the file can be skipped.
+        """
+        entry = self.files.get(os.path.abspath(path))
+        if entry is None or entry["config"] != config:
+            return False
+        if entry["source"] != _source_stamp(path):
+            return False
+
+        return all(
+            os.path.exists(output) and file_checksum(output) == checksum
+            for output, checksum in entry["outputs"].items()
+        )
+
+    def record(self, report: dict, config: dict) -> None:
+        """Marks a processed file as done and saves the manifest.
+
+        Arguments:
+            report (dict): Successful process_file report.
+            config (dict): Run configuration.
+
+        Returns:
+            None.
+        """
+        self.files[os.path.abspath(report["path"])] = {
+            "source": _source_stamp(report["path"]),
+            "config": config,
+            "rows": report["rows"],
+            "outputs": report["outputs"],
+        }
+        _write_json(
+            self.path, {"version": MANIFEST_VERSION, "files": self.files}
+        )
+
+
+def run_batch(
+    source,
+    out_dir,
+    workers: int | None = None,
+    method: str = "periodogram",
+    cache_dir=None,
+    progress=print,
+    resume: bool = True,
+    dtype: str = "float64",
+    prefer_converted: bool = False,
+) -> list[dict]:
+    """Processes every recording in a directory or glob across processes.
+
+    Finished files are recorded in OUT_DIR/manifest.json. With resume, a
+    restarted batch skips files whose inputs and outputs are unchanged and
+    continues unfinished files from their last checkpointed chunk.
+
+    Arguments:
+        source (str | os.PathLike): Directory or glob of recordings.
+        out_dir (str | os.PathLike): Directory for band power and stats CSVs.
+        workers (int | None): Worker processes. Defaults to the CPU count.
+        method (str): PSD estimator, one of spectral.PSD_METHODS.
+        cache_dir (str | None): result_cache directory, or None for no cache.
+        progress (callable): Receives one progress line per finished file and
+            a final summary line.
+        resume (bool): Skips finished files and resumes checkpoints. False
+            reprocesses everything.
+        dtype (str): Band power precision, one of spectral.DTYPES.
+        prefer_converted (bool): Skips CSVs that have a .nsrec copy, as in
+            find_recordings; each skipped CSV is named in the progress.
+
+    Returns:
+        list[dict]: One report per recording, in path order. Skipped files
+            have "skipped" set.
+    """
+    paths = find_recordings(source, prefer_converted)
+    out_dir = os.fspath(out_dir)
+    if prefer_converted:
+        for path in sorted(set(find_recordings(source)) - set(paths)):
+            progress(f"skipping {path}: a converted .nsrec copy is used")
+    if not paths:
+        progress(f"no recordings found in {source}")
+        return []
+
+    if os.path.isdir(source):
+        root = os.fspath(source)
+    else:
+        root = os.path.commonpath([os.path.dirname(p) or "." for p in paths])
+
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = Manifest(os.path.join(out_dir, MANIFEST))
+    config = {"method": method, "dtype": dtype}
+
+    reports = {}
+    pending = []
+    for path in paths:
+        if resume and manifest.is_done(path, config):
+            reports[path] = {"path": path, "skipped": True}
+        else:
+            pending.append(path)
+    if reports:
+        progress(f"skipping {len(reports)} files already done")
+
+    start = time.perf_counter()
+    total_bytes = 0
+    workers = max(1, min(workers or os.cpu_count() or 1, len(pending)))
+
+    saved = {name: os.environ.get(name) for name in THREAD_ENV}
+    for name, value in saved.items():  # inherited by the spawned workers
+        os.environ[name] = value or "1"
+    try:
+        with ProcessPoolExecutor(
+            workers, mp_context=get_context("spawn")
+        ) as pool:
+            futures = [
+                pool.submit(
+                    process_file,
+                    path,
+                    root,
+                    out_dir,
+                    method,
+                    cache_dir,
+                    resume=resume,
+                    dtype=dtype,
+                )
+                for path in pending
+            ]
+            for done, future in enumerate(as_completed(futures), start=1):
+                report = future.result()
+                reports[report["path"]] = report
+                total_bytes += report["bytes"]
+                if "error" not in report:
+                    manifest.record(report, config)
+                progress(_progress_line(done, len(pending), report))
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    failed = sum("error" in report for report in reports.values())
+    progress(
+        f"processed {len(pending)} files ({failed} failed) in {elapsed:.1f} s "
+        f"with {workers} workers: {len(pending) / elapsed:.1f} files/s, "
+        f"{total_bytes / elapsed / 1e6:.1f} MB/s"
+    )
+
+    return [reports[path] for path in paths]
+
+
+def _progress_line(done, total, report):
+    """Formats one file's progress report."""
+    name = os.path.basename(report["path"])
+    if "error" in report:
+        return f"[{done}/{total}] {name}: failed ({report['error']})"
+
+    rate = report["bytes"] / max(report["seconds"], 1e-9) / 1e6
+    resumed = ""
+    if report.get("resumed_windows"):
+        resumed = f", resumed after {report['resumed_windows']} windows"
+    return (
+        f"[{done}/{total}] {name}: {report['rows']} rows in "
+        f"{report['seconds']:.2f} s ({rate:.1f} MB/s{resumed})"
+    )
+
+
+def main(argv=None):
+    """Command-line entry point.
+
+    Arguments:
+        argv (list[str] | None): Arguments, defaulting to sys.argv.
+
+    Returns:
+        int: Exit status; 1 if any file failed.
+    """
+    import spectral
+
+    parser = argparse.ArgumentParser(
+        description="Process a directory or glob of EEG recordings"
+    )
+    parser.add_argument("source", help="Directory or glob of recordings")
+    parser.add_argument("out_dir", help="Directory for band power and stats")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Worker processes"
+    )
+    parser.add_argument(
+        "--method",
+        choices=spectral.PSD_METHODS,
+        default="periodogram",
+        help="PSD estimator used for band power",
+    )
+    parser.add_argument(
+        "--dtype",
+        choices=spectral.DTYPES,
+        default="float64",
+        help="Precision of the band power computation",
+    )
+    parser.add_argument(
+        "--cache", default=None, help="Result cache directory (optional)"
+    )
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="Reprocess every file, ignoring the manifest and checkpoints",
+    )
+    parser.add_argument(
+        "--prefer-nsrec",
+        action="store_true",
+        help="Skip each CSV that has a converted .nsrec copy next to it",
+    )
+    args = parser.parse_args(argv)
+
+    reports = run_batch(
+        args.source,
+        args.out_dir,
+        args.workers,
+        args.method,
+        args.cache,
+        resume=not args.no_resume,
+        dtype=args.dtype,
+        prefer_converted=args.prefer_nsrec,
+    )
+
+    return int(any("error" in report for report in reports))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
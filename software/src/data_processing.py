@@ -1,197 +1,520 @@
-"""data_processing.py.
-
-Processes EEG data for Muse 2, including:
-- Reading CSV
-- FFT transformation
-- Statistical calculations
-"""
-
-import os
-
-import numpy as np
-import pandas as pd
-from scipy.fft import fft, fftfreq
-
-import graphing
-
-# global variables
-FOLDER_NAME = os.path.abspath(os.path.join("..", "data"))
-
-
-# --
-# get_data
-# Original version is commented nehehehe
-# def get_data(file_name):
-#     Extracts file from data folder for processing. Ensures compatibility
-#     across platforms.
-#
-#     Arguments:
-#         file_name (String): The full file name of the file to be processed.
-#
-#     Returns:
-#         String: The platform-specific path to the file.
-#     original: path = os.path.join(folder_name, file_name)
-#     return path
-#     # 2/20/26 returns stats instead of printing
-# --
-
-
-# Updated version for tests & usage:
-def get_data(file_name):
-    """Extracts file from the data folder for processing. Ensures compatibility
-    across platforms.
-
-    Arguments:
-        file_name (str): The full file name of the file to be processed.
-
-    Returns:
-        str: The platform-specific path to the file.
-
-    Change note: 2/20/26 — uncommented and fixed indentation so that function
-    works.
-    """
-    if not isinstance(file_name, str):
-        raise TypeError("file_name must be a string")
-
-    path = os.path.join(FOLDER_NAME, file_name)
-    return path
-
-
-def transform_to_hz(data: pd.DataFrame) -> pd.DataFrame:
-    """Converts EEG band power features from time domain samples using FFT.
-
-    Arguments:
-        data (pd.DataFrame): The CSV file data in mV to be converted to Hz.
-
-    Returns:
-        pd.DataFrame: The output set of normalized frequencies after an FFT.
-    """
-    if not isinstance(data, pd.DataFrame):
-        raise TypeError("Input must be a pandas DataFrame")
-    # 2/20/26 added input check to make sure it only runs on a pandas DataFrame
-    window_size = 256  # sampling rate of Muse 2 headband
-    step_size = 128  # 50% overlap between windows
-    columns = ["timestamp", "delta", "theta", "alpha", "beta"]
-    signal_cols = ["ch1", "ch2", "ch3", "ch4"]
-    fft_df = pd.DataFrame(columns=columns)  # define FFT DataFrame
-
-    # FFT for all channels
-    for start in range(0, len(data) - window_size + 1, step_size):
-        window = data.iloc[start : start + window_size]
-        signal_window = window[signal_cols].values
-        fft_vals = (
-            fft(signal_window, axis=0) / window_size
-        )  # normalize by dividing by window size
-        freqs = fftfreq(window_size, 1 / window_size)
-
-        # compute bands; square for band power
-        delta_band = np.sum(abs(fft_vals[(freqs >= 0.5) & (freqs < 4)]) ** 2)
-        theta_band = np.sum(abs(fft_vals[(freqs >= 4) & (freqs < 8)]) ** 2)
-        alpha_band = np.sum(abs(fft_vals[(freqs >= 8) & (freqs < 13)]) ** 2)
-        beta_band = np.sum(abs(fft_vals[(freqs >= 13) & (freqs < 32)]) ** 2)
-
-        new_row = pd.DataFrame(
-            [
-                {
-                    "timestamp": data["timestamp"].iloc[start],
-                    "delta": float(delta_band),
-                    "theta": float(theta_band),
-                    "alpha": float(alpha_band),
-                    "beta": float(beta_band),
-                }
-            ],
-            columns=columns,
-        )
-
-        # initialize DataFrame if empty, otherwise concatenate
-        if fft_df.empty:
-            fft_df = new_row
-        elif not new_row.empty and not new_row.isna().all().all():
-            fft_df = pd.concat([fft_df, new_row], ignore_index=True)
-
-    return fft_df
-
-
-# --
-# get_stats
-# Returns statistical measures for a pandas DataFrame.
-# --
-def get_stats(data):
-    """Returns statistical measures for a pandas DataFrame.
-
-    Arguments:
-        data (pd.DataFrame): Input DataFrame containing numeric columns.
-
-    Returns:
-        dict: Dictionary containing mean, median, mode, range, variance,
-              standard deviation, and interquartile range of the columns.
-              Returns None if DataFrame is empty.
-
-    Raises:
-        TypeError: If input is not a pandas DataFrame.
-    """
-    if not isinstance(data, pd.DataFrame):
-        raise TypeError("Input must be a pandas DataFrame")
-
-    if data.empty:
-        return None
-
-    stats = {
-        "mean": data.mean(),
-        "median": data.median(),
-        "mode": data.mode(),
-        "range": data.max() - data.min(),
-        "variance": data.var(),
-        "std_dev": data.std(),
-        "iqr": data.quantile(0.75) - data.quantile(0.25),
-    }
-
-    return stats
-
-
-def process_pipeline(df: pd.DataFrame):
-    """
-    Full dynamic processing pipeline:
-    raw EEG → FFT → stats
-    """
-    freq_data = transform_to_hz(df)
-    stats_data = freq_data.drop(columns=["timestamp"], errors="ignore")
-    stats = get_stats(stats_data)
-    graphing.run(freq_data)
-
-    return {
-        "frequency_data": freq_data,
-        "stats": stats,
-    }
-
-
-def run():
-    """Reads CSV EEG data, transforms it to frequency bands, prints sample
-    data, and calculates statistics.
-
-    Arguments:
-        None.
-
-    Returns:
-        None.
-    """
-    # change to get_data(file) later with file being an arg in main
-    file_path = get_data("muse2_eeg_data.csv")
-    # path to data file
-
-    # check file existence
-    if not os.path.exists(file_path):
-        print(f"file does not exist at: {file_path}")
-        return
-
-    # prints first five rows of readings, split by channel; sanity check
-    df = pd.read_csv(file_path)  # CSV reading to pandas DataFrame
-    result = process_pipeline(df)
-
-    print("\n--- STATS ---")
-    for key, value in result["stats"].items():
-        print(f"\n{key}:\n{value}")
-
-
-if __name__ == "__main__":
-    run()
+"""data_processing.py.
+
+Processes EEG data for Muse 2, including:
+- Reading CSV
+- FFT transformation
+- Statistical calculations
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+import band_stats
+import recording
+import spectral
+import streaming
+from sinks import DEFAULT_SINKS, get_runner, is_headless, make_sink
+
+# global variables
+FOLDER_NAME = os.path.abspath(os.path.join("..", "data"))
+CHUNK_SIZE = 65536  # CSV rows read at a time by the chunked reader
+
+
+# --
+# get_data
+# Original version is commented nehehehe
+# def get_data(file_name):
+#     Extracts file from data folder for processing. Ensures compatibility
+#     across platforms.
+#
+#     Arguments:
+#         file_name (String): The full file name of the file to be processed.
+#
+#     Returns:
+#         String: The platform-specific path to the file.
+#     original: path = os.path.join(folder_name, file_name)
+#     return path
+#     # 2/20/26 returns stats instead of printing
+# --
+
+
+# Updated version for tests & usage:
+def get_data(file_name):
+    """Extracts file from the data folder for processing. Ensures compatibility
+    across platforms.
+
+    Arguments:
+        file_name (str): The full file name of the file to be processed.
+
+    Returns:
+        str: The platform-specific path to the file.
+
+    Change note: 2/20/26 — uncommented and fixed indentation so that function
+    works.
+    """
+    if not isinstance(file_name, str):
+        raise TypeError("file_name must be a string")
+
+    path = os.path.join(FOLDER_NAME, file_name)
+    return path
+
+
+def transform_to_hz(
+    data: pd.DataFrame | recording.Recording,
+    plan: spectral.BandPlan | None = None,
+    method: str = "periodogram",
+) -> pd.DataFrame:
+    """Converts EEG band power features from time domain samples using FFT.
+
+    A memory-mapped recording.Recording is processed in blocks of
+    CHUNK_SIZE samples, so sessions larger than RAM are never loaded whole.
+
+    Arguments:
+        data (pd.DataFrame | recording.Recording): The CSV file data in mV to
+            be converted to Hz, or a loaded binary recording.
+        plan (spectral.BandPlan | None): Band/window configuration. Defaults
+            to spectral.get_plan() at the recording's sampling rate.
+        method (str): PSD estimator, one of spectral.PSD_METHODS.
+
+    Returns:
+        pd.DataFrame: The output set of normalized frequencies after an FFT.
+
+    Raises:
+        ValueError: If a recording's sampling rate differs from the plan's.
+    """
+    plan = _plan_for(data, plan)
+    if isinstance(data, recording.Recording):
+        return _blocks_to_frame(recording_blocks(data, plan), plan, method)
+
+    if not isinstance(data, pd.DataFrame):
+        raise TypeError("Input must be a pandas DataFrame or a Recording")
+    # 2/20/26 added input check to make sure it only runs on a pandas DataFrame
+
+    # FFT for all channels and windows at once, as a single session
+    samples = data[list(plan.channels)].to_numpy(dtype=plan.dtype)
+    powers = spectral.session_band_power(samples[None], plan, method)[0]
+
+    return _band_frame(
+        data["timestamp"].to_numpy(), powers, plan.step_size, plan
+    )
+
+
+def recording_blocks(
+    rec: recording.Recording,
+    plan: spectral.BandPlan | None = None,
+    chunk_size: int = CHUNK_SIZE,
+    start: int = 0,
+):
+    """Yields window-aligned blocks of a memory-mapped recording.
+
+    Arguments:
+        rec (recording.Recording): A loaded binary recording.
+        plan (spectral.BandPlan | None): Band/window configuration. Defaults
+            to spectral.get_plan() at the recording's sampling rate.
+        chunk_size (int): Approximate number of new samples per block.
+        start (int): Sample to begin at; a window start to resume a run.
+
+    Yields:
+        tuple[np.ndarray, np.ndarray]: Timestamps and (n_samples,
+            n_channels) sample views holding at least one full window.
+
+    Raises:
+        ValueError: If the recording's sampling rate differs from the plan's.
+    """
+    plan = _plan_for(rec, plan)
+    samples = rec.select(plan.channels)[start:]
+    timestamps = rec.timestamps[start:]
+    for first, stop in spectral.window_blocks(len(samples), plan, chunk_size):
+        yield timestamps[first:stop], samples[first:stop]
+
+
+def _plan_for(data, plan):
+    """Returns plan, or the default plan at a recording's sampling rate, and
+    checks that a recording was sampled at the plan's rate."""
+    if not isinstance(data, recording.Recording):
+        return spectral.get_plan() if plan is None else plan
+    if plan is None:
+        return spectral.get_plan(sampling_rate=data.sampling_rate)
+    if plan.sampling_rate != data.sampling_rate:
+        raise ValueError(
+            f"recording is sampled at {data.sampling_rate} Hz but the plan "
+            f"expects {plan.sampling_rate} Hz"
+        )
+
+    return plan
+
+
+def transform_to_hz_incremental(
+    data: pd.DataFrame,
+    update_every: int = 16,
+    plan: spectral.BandPlan | None = None,
+) -> pd.DataFrame:
+    """Converts EEG samples to band power with a sliding DFT, emitting a row
+    every few samples instead of once per 128-sample hop.
+
+    Rows that fall on a hop boundary agree with transform_to_hz.
+
+    Arguments:
+        data (pd.DataFrame): The CSV file data in mV to be converted to Hz.
+        update_every (int): Number of samples between output rows.
+        plan (spectral.BandPlan | None): Band/window configuration with a
+            rectangular window. Defaults to spectral.get_plan().
+
+    Returns:
+        pd.DataFrame: Band power per update, timestamped with the first sample
+            of its window.
+    """
+    if not isinstance(data, pd.DataFrame):
+        raise TypeError("Input must be a pandas DataFrame")
+    plan = spectral.get_plan() if plan is None else plan
+
+    sliding = streaming.SlidingBandPower(plan, update_every)
+    powers = sliding.push_chunk(
+        data[list(plan.channels)].to_numpy(dtype=float)
+    )
+
+    return _band_frame(
+        data["timestamp"].to_numpy(), powers, update_every, plan
+    )
+
+
+def read_csv_chunks(
+    path,
+    plan: spectral.BandPlan | None = None,
+    chunk_size: int = CHUNK_SIZE,
+    start: int = 0,
+):
+    """Reads a recording in fixed-size chunks, yielding blocks of samples
+    that start on a window boundary of the whole file.
+
+    The samples after the last full window of a block (window - hop samples
+    when the block ends on a hop) are carried into the next block, so the
+    windows of all blocks are exactly the windows of the whole recording.
+
+    Arguments:
+        path (str | os.PathLike): CSV file with timestamp and channel columns.
+        plan (spectral.BandPlan | None): Band/window configuration. Defaults
+            to spectral.get_plan().
+        chunk_size (int): Number of CSV rows read at a time.
+        start (int): Sample row to begin at; a window start to resume a run.
+            The rows before it are still parsed, one chunk at a time.
+
+    Yields:
+        tuple[np.ndarray, np.ndarray]: Timestamps and a (n_samples,
+            n_channels) array of samples in plan.dtype holding at least one
+            full window.
+
+    Raises:
+        ValueError: If chunk_size is not positive.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    plan = spectral.get_plan() if plan is None else plan
+    channels = list(plan.channels)
+
+    carry_time = np.empty(0)
+    carry = np.empty((0, len(channels)), dtype=plan.dtype)
+
+    with pd.read_csv(
+        path,
+        usecols=["timestamp", *channels],
+        dtype={"timestamp": "float64", **dict.fromkeys(channels, plan.dtype)},
+        chunksize=chunk_size,
+    ) as reader:
+        for chunk in reader:
+            # skipped rows are parsed and dropped a chunk at a time, since a
+            # skiprows range would hold a set of every skipped row
+            if start >= len(chunk):
+                start -= len(chunk)
+                continue
+            chunk, start = chunk.iloc[start:], 0
+
+            timestamps = np.concatenate(
+                (carry_time, chunk["timestamp"].to_numpy(dtype=float))
+            )
+            samples = np.concatenate(
+                (carry, chunk[channels].to_numpy(dtype=plan.dtype))
+            )
+
+            if len(samples) < plan.window_size:
+                carry_time, carry = timestamps, samples
+                continue
+
+            n_windows = (len(samples) - plan.window_size) // plan.step_size + 1
+            end = (n_windows - 1) * plan.step_size + plan.window_size
+            next_start = n_windows * plan.step_size
+
+            yield timestamps[:end], samples[:end]
+            carry_time, carry = timestamps[next_start:], samples[next_start:]
+
+
+def transform_csv_to_hz(
+    path,
+    plan: spectral.BandPlan | None = None,
+    method: str = "periodogram",
+    chunk_size: int = CHUNK_SIZE,
+) -> pd.DataFrame:
+    """Converts a CSV recording to band power without loading the whole file.
+
+    Peak memory is bounded by the chunk size plus the band power output, and
+    the result is identical to transform_to_hz on the whole file.
+
+    Arguments:
+        path (str | os.PathLike): CSV file with timestamp and channel columns.
+        plan (spectral.BandPlan | None): Band/window configuration. Defaults
+            to spectral.get_plan().
+        method (str): PSD estimator, one of spectral.PSD_METHODS.
+        chunk_size (int): Number of CSV rows read at a time.
+
+    Returns:
+        pd.DataFrame: Band power per window, timestamped with the first sample
+            of its window.
+    """
+    plan = spectral.get_plan() if plan is None else plan
+    blocks = read_csv_chunks(path, plan, chunk_size)
+
+    return _blocks_to_frame(blocks, plan, method)
+
+
+def _blocks_to_frame(blocks, plan, method):
+    """Concatenates band power over window-aligned sample blocks."""
+    frames = [
+        _band_frame(
+            timestamps,
+            spectral.band_power(samples, plan, method),
+            plan.step_size,
+            plan,
+        )
+        for timestamps, samples in blocks
+    ]
+    if not frames:
+        return _band_frame(
+            np.empty(0),
+            np.empty((0, plan.n_bands), dtype=plan.dtype),
+            plan.step_size,
+            plan,
+        )
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def _band_frame(timestamps, powers, stride, plan):
+    """Builds the timestamped band power DataFrame in one step."""
+    timestamps = np.array(timestamps[: len(powers) * stride : stride])
+
+    fft_df = pd.DataFrame(powers, columns=plan.band_names)
+    fft_df.insert(0, "timestamp", timestamps)
+
+    return fft_df
+
+
+# --
+# get_stats
+# Returns statistical measures for a pandas DataFrame.
+# --
+def get_stats(data):
+    """Returns statistical measures for a pandas DataFrame.
+
+    DataFrames are summarized by the fused band_stats.summarize kernel, and
+    mode is a histogram estimate rather than pandas' exact mode. Also accepts
+    a band_stats.OnlineStats accumulator, in which case median, mode, and
+    interquartile range are t-digest estimates.
+
+    Arguments:
+        data (pd.DataFrame | band_stats.OnlineStats): Input DataFrame
+            containing numeric columns, or a running accumulator.
+
+    Returns:
+        dict: Dictionary containing mean, median, mode, range, variance,
+              standard deviation, and interquartile range of the columns.
+              Returns None if DataFrame is empty.
+
+    Raises:
+        TypeError: If input is not a pandas DataFrame or OnlineStats.
+    """
+    if isinstance(data, band_stats.OnlineStats):
+        return _online_stats(data)
+
+    if not isinstance(data, pd.DataFrame):
+        raise TypeError("Input must be a pandas DataFrame")
+
+    if data.empty:
+        return None
+
+    summary = band_stats.summarize(data.to_numpy(dtype=float))
+    stats = {
+        key: pd.Series(values, index=data.columns)
+        for key, values in summary.items()
+    }
+
+    return stats
+
+
+def _online_stats(acc: band_stats.OnlineStats):
+    """Formats an OnlineStats accumulator in the get_stats dict shape."""
+    if acc.count == 0:
+        return None
+
+    def series(values):
+        return pd.Series(values, index=acc.columns)
+
+    return {
+        "mean": series(acc.mean),
+        "median": series(acc.quantile(0.5)),
+        "mode": series(acc.mode()),
+        "range": series(acc.max - acc.min),
+        "variance": series(acc.variance),
+        "std_dev": series(acc.std_dev),
+        "iqr": series(acc.quantile(0.75) - acc.quantile(0.25)),
+    }
+
+
+def process_pipeline(
+    df: pd.DataFrame | recording.Recording,
+    method: str = "periodogram",
+    plan: spectral.BandPlan | None = None,
+    sinks=None,
+    cache=None,
+):
+    """
+    Full dynamic processing pipeline:
+    raw EEG → FFT → stats → sinks
+
+    Sinks are fed from a background thread, so this returns as soon as the
+    features and stats are computed. The pipeline never imports matplotlib;
+    the plot sink draws in its own process.
+
+    Arguments:
+        df (pd.DataFrame | recording.Recording): Raw EEG samples with
+            timestamp and channel columns, or a loaded binary recording.
+        method (str): PSD estimator, one of spectral.PSD_METHODS.
+        plan (spectral.BandPlan | None): Band/window configuration. A plan
+            with dtype "float32" runs the whole transform in single
+            precision. Defaults to spectral.get_plan(), at a recording's
+            sampling rate.
+        sinks (list | None): Outputs for the result, as sinks.Sink
+            instances, names from sinks.SINK_TYPES, or (name, kwargs) pairs
+            for sinks that need arguments, such as ("uart", {"ser": ser}).
+            Bad specs raise ValueError here rather than on the sink thread.
+            Defaults to sinks.DEFAULT_SINKS,
+            or to no sinks when NEUROSYNC_HEADLESS is set. Pass [] to run
+            headless.
+        cache (result_cache.ResultCache | None): Reuses a stored result for
+            the same samples and configuration instead of recomputing it.
+
+    Returns:
+        dict: The band power DataFrame under "frequency_data" and its
+            get_stats summary under "stats".
+    """
+    plan = _plan_for(df, plan)
+    result = _cached_result(
+        cache, df, plan, method, lambda: transform_to_hz(df, plan, method)
+    )
+
+    return _publish(result, sinks)
+
+
+def process_csv(
+    path,
+    method: str = "periodogram",
+    plan: spectral.BandPlan | None = None,
+    sinks=None,
+    chunk_size: int = CHUNK_SIZE,
+    cache=None,
+):
+    """Runs process_pipeline on a CSV recording read in chunks, so memory
+    stays bounded by the chunk size rather than the recording length.
+
+    Arguments:
+        path (str | os.PathLike): CSV file with timestamp and channel columns.
+        method (str): PSD estimator, one of spectral.PSD_METHODS.
+        plan (spectral.BandPlan | None): Band/window configuration,
+            including its precision.
+        sinks (list | None): Outputs for the result, as in process_pipeline.
+        chunk_size (int): Number of CSV rows read at a time.
+        cache (result_cache.ResultCache | None): Reuses a stored result for
+            an unchanged file and configuration without reading the CSV.
+
+    Returns:
+        dict: The band power DataFrame under "frequency_data" and its
+            get_stats summary under "stats".
+    """
+    plan = spectral.get_plan() if plan is None else plan
+    result = _cached_result(
+        cache,
+        path,
+        plan,
+        method,
+        lambda: transform_csv_to_hz(path, plan, method, chunk_size),
+    )
+
+    return _publish(result, sinks)
+
+
+def _cached_result(cache, source, plan, method, transform):
+    """Returns the summarized band power of a source, from the cache if it
+    holds an entry and computing and storing it otherwise."""
+    if cache is None:
+        return _summarize(transform())
+
+    key = cache.key(source, plan, method)
+    result = cache.get(key)
+    if result is None:
+        result = _summarize(transform())
+        cache.put(key, result)
+
+    return result
+
+
+def _summarize(freq_data):
+    """Pairs band power with its summary statistics."""
+    stats_data = freq_data.drop(columns=["timestamp"], errors="ignore")
+
+    return {
+        "frequency_data": freq_data,
+        "stats": get_stats(stats_data),
+    }
+
+
+def _publish(result, sinks):
+    """Hands a result to the sinks and returns it."""
+    if sinks is None:
+        sinks = () if is_headless() else DEFAULT_SINKS
+    outputs = [make_sink(sink) for sink in sinks]
+    if outputs:
+        get_runner().submit(result, outputs)
+
+    return result
+
+
+def run():
+    """Reads CSV EEG data, transforms it to frequency bands, prints sample
+    data, and calculates statistics.
+
+    Arguments:
+        None.
+
+    Returns:
+        None.
+    """
+    # change to get_data(file) later with file being an arg in main
+    file_path = get_data("muse2_eeg_data.csv")
+    # path to data file
+
+    # check file existence
+    if not os.path.exists(file_path):
+        print(f"file does not exist at: {file_path}")
+        return
+
+    # reads the recording in chunks; memory is bounded by CHUNK_SIZE
+    result = process_csv(file_path)
+
+    print("\n--- STATS ---")
+    for key, value in result["stats"].items():
+        print(f"\n{key}:\n{value}")
+
+
+if __name__ == "__main__":
+    run()
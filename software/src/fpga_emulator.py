@@ -0,0 +1,324 @@
+"""fpga_emulator.py.
+
+Software stand-in for the Nexys A7 UART receiver. PacketParser replays the
+hardware/EEG_Packet_Parser.sv state machine (SYNC1, SYNC2, LEN, payload,
+XOR) one byte at a time, and FPGAEmulator binds it to a Linux
+pseudo-terminal pair so the software stack can open the emulator's port
+with pyserial as if it were the board. The emulator counts good packets,
+checksum and length failures, resyncs, and byte rates, either paced to a
+real baud rate or unthrottled.
+
+The hardware checksum starts from the LEN byte, as in the default
+transmission protocol (version 2); include_len=False emulates a parser for
+protocol version 0, whose XOR covers only the payload.
+"""
+
+import os
+import select
+import threading
+import time
+
+import transmission
+
+# global variables
+BAUDRATE = 115200
+BITS_PER_BYTE = 10  # 8N1: start bit, 8 data bits, stop bit
+READS_PER_SECOND = 100  # paced reads take baud / 10 / 100 bytes at a time
+READ_SIZE = 65536  # bytes read at a time when unthrottled
+POLL_INTERVAL = 0.05  # seconds between checks for stop()
+
+# parser states, numbered as in EEG_Packet_Parser.sv
+S_WAIT_SYNC1 = 0
+S_WAIT_SYNC2 = 1
+S_WAIT_LEN = 2
+S_READ_PAYLOAD = 3
+S_READ_CHK = 4
+
+
+class PacketParser:
+    """Byte-at-a-time model of the FPGA packet parser.
+
+    Counters:
+        packets: Packets whose checksum matched.
+        checksum_errors: Complete packets whose checksum did not match.
+        length_errors: Headers whose LEN byte was not PAYLOAD_LENGTH.
+        resyncs: Times the parser began discarding bytes to find SYNC1.
+        skipped: Bytes discarded while searching for SYNC1.
+        bytes: Bytes fed in total.
+    """
+
+    def __init__(self, include_len: bool = True):
+        """Creates a parser waiting for SYNC1.
+
+        Arguments:
+            include_len (bool): Start the checksum from the LEN byte as the
+                hardware does; False checks the payload only, as protocol
+                version 0 does.
+        """
+        self.include_len = include_len
+        self.state = S_WAIT_SYNC1
+        self.values = (0, 0, 0, 0)  # alpha, beta, theta, delta
+        self.packets = 0
+        self.checksum_errors = 0
+        self.length_errors = 0
+        self.resyncs = 0
+        self.skipped = 0
+        self.bytes = 0
+        self._payload = bytearray(transmission.PAYLOAD_LENGTH)
+        self._index = 0
+        self._check = 0
+        self._hunting = False  # inside a run of skipped bytes
+
+    def feed(self, data) -> int:
+        """Runs the state machine over a block of received bytes.
+
+        Arguments:
+            data (bytes-like): Bytes in the order they arrived.
+
+        Returns:
+            int: Good packets completed by this block.
+        """
+        before = self.packets
+        state = self.state
+        for byte in data:
+            if state == S_WAIT_SYNC1:
+                if byte == transmission.SYNC_BYTE_1:
+                    state = S_WAIT_SYNC2
+                    self._hunting = False
+                else:
+                    self.skipped += 1
+                    if not self._hunting:
+                        self.resyncs += 1
+                        self._hunting = True
+            elif state == S_WAIT_SYNC2:
+                if byte == transmission.SYNC_BYTE_2:
+                    state = S_WAIT_LEN
+                elif byte != transmission.SYNC_BYTE_1:  # overlap-friendly
+                    state = S_WAIT_SYNC1
+            elif state == S_WAIT_LEN:
+                self._check = byte if self.include_len else 0
+                self._index = 0
+                if byte == transmission.PAYLOAD_LENGTH:
+                    state = S_READ_PAYLOAD
+                else:
+                    self.length_errors += 1
+                    state = S_WAIT_SYNC1
+            elif state == S_READ_PAYLOAD:
+                self._payload[self._index] = byte
+                self._check ^= byte
+                self._index += 1
+                if self._index == transmission.PAYLOAD_LENGTH:
+                    state = S_READ_CHK
+            else:  # S_READ_CHK
+                if byte == self._check:
+                    payload = self._payload
+                    self.values = tuple(
+                        payload[i] << 8 | payload[i + 1] for i in (0, 2, 4, 6)
+                    )
+                    self.packets += 1
+                else:
+                    self.checksum_errors += 1
+                state = S_WAIT_SYNC1
+
+        self.state = state
+        self.bytes += len(data)
+
+        return self.packets - before
+
+    def counters(self) -> dict:
+        """Returns a snapshot of the counters.
+
+        Arguments:
+            None.
+
+        Returns:
+            dict: packets, checksum_errors, length_errors, resyncs, skipped,
+                and bytes.
+        """
+        return {
+            "packets": self.packets,
+            "checksum_errors": self.checksum_errors,
+            "length_errors": self.length_errors,
+            "resyncs": self.resyncs,
+            "skipped": self.skipped,
+            "bytes": self.bytes,
+        }
+
+
+class FPGAEmulator:
+    """PacketParser served on a pseudo-terminal by a background thread.
+
+    Open port with serial.Serial (or any tty API) and write packets to it.
+    When paced, the emulator drains the pty no faster than the baud rate
+    allows, so writers feel the same back-pressure as on the board.
+    """
+
+    def __init__(self, baudrate: int | None = BAUDRATE, include_len=True):
+        """Opens the pty pair and starts parsing.
+
+        Arguments:
+            baudrate (int | None): Line rate to pace reads to; None reads as
+                fast as bytes arrive.
+            include_len (bool): Passed to PacketParser.
+
+        Raises:
+            ValueError: If baudrate is not positive.
+        """
+        import tty
+
+        if baudrate is not None and baudrate <= 0:
+            raise ValueError("baudrate must be positive or None")
+
+        self.baudrate = baudrate
+        self.parser = PacketParser(include_len)
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)
+        self.port = os.ttyname(self._slave)
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._first = None  # time the first byte arrived
+        self._last = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stats(self) -> dict:
+        """Returns the parser counters with timing and rates.
+
+        Arguments:
+            None.
+
+        Returns:
+            dict: PacketParser.counters() plus "seconds" from the first to
+                the last byte received, "bytes_per_second", and
+                "packets_per_second".
+        """
+        with self._lock:
+            stats = self.parser.counters()
+            first, last = self._first, self._last
+
+        seconds = 0.0 if first is None else last - first
+        stats["seconds"] = seconds
+        stats["bytes_per_second"] = stats["bytes"] / seconds if seconds else 0
+        stats["packets_per_second"] = (
+            stats["packets"] / seconds if seconds else 0
+        )
+
+        return stats
+
+    def wait_for_bytes(self, n_bytes: int, timeout: float = 10.0) -> bool:
+        """Waits until the emulator has parsed at least n_bytes.
+
+        Arguments:
+            n_bytes (int): Total bytes to wait for.
+            timeout (float): Most seconds to wait.
+
+        Returns:
+            bool: True if the bytes arrived before the timeout.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if self.parser.bytes >= n_bytes:
+                    return True
+            time.sleep(0.005)
+
+        return False
+
+    def close(self) -> None:
+        """Stops the parsing thread and closes both ends of the pty.
+
+        Arguments:
+            None.
+
+        Returns:
+            None.
+        """
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join()
+        os.close(self._slave)
+        os.close(self._master)
+
+    def _run(self) -> None:
+        """Reads the pty master and feeds the parser until close()."""
+        if self.baudrate is None:
+            read_size, byte_time = READ_SIZE, 0.0
+        else:
+            bytes_per_second = self.baudrate / BITS_PER_BYTE
+            read_size = max(1, int(bytes_per_second / READS_PER_SECOND))
+            byte_time = 1 / bytes_per_second
+
+        due = None  # when the line would finish shifting in the last read
+        while not self._stop.is_set():
+            ready, _, _ = select.select([self._master], [], [], POLL_INTERVAL)
+            if not ready:
+                continue
+            data = os.read(self._master, read_size)
+
+            start = time.perf_counter()
+            if byte_time:  # the line needs byte_time per byte to shift in
+                due = max(due or start, start) + len(data) * byte_time
+            with self._lock:
+                self.parser.feed(data)
+                if self._first is None:
+                    self._first = start
+                self._last = due if byte_time else time.perf_counter()
+            if byte_time:
+                time.sleep(max(0.0, due - time.perf_counter()))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(argv=None):
+    """Command-line entry point; serves the emulator until Ctrl+C.
+
+    Arguments:
+        argv (list[str] | None): Arguments, defaulting to sys.argv.
+
+    Returns:
+        None.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Emulate the FPGA packet parser on a pseudo-terminal"
+    )
+    parser.add_argument(
+        "--baud",
+        type=int,
+        default=BAUDRATE,
+        help="Baud rate to pace reads to; 0 for unthrottled",
+    )
+    parser.add_argument(
+        "--payload-checksum",
+        action="store_true",
+        help="Check the payload only, as protocol version 0 does",
+    )
+    args = parser.parse_args(argv)
+
+    with FPGAEmulator(args.baud or None, not args.payload_checksum) as fpga:
+        print(f"Emulating the FPGA on {fpga.port}. Press Ctrl+C to stop.")
+        try:
+            while True:
+                time.sleep(1)
+                stats = fpga.stats()
+                print(
+                    f"{stats['packets']} packets "
+                    f"({stats['packets_per_second']:.0f}/s), "
+                    f"{stats['bytes_per_second']:.0f} B/s, "
+                    f"{stats['checksum_errors']} checksum errors, "
+                    f"{stats['length_errors']} length errors, "
+                    f"{stats['resyncs']} resyncs"
+                )
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
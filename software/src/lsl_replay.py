@@ -0,0 +1,249 @@
+"""lsl_replay.py.
+
+Publishes a recorded CSV or .nsrec session as local LSL outlets, so the live
+path in main.py can be exercised and load-tested without a Muse headset.
+Sessions play at real time, at N times real time, or as fast as possible,
+and can be fanned out to several synthetic headsets that each play the
+session from a different offset.
+
+The report returned by replay() says how far the publisher itself fell
+behind its schedule, which bounds how many streams one process can feed.
+"""
+
+import os
+import time
+
+import numpy as np
+
+import recording
+
+# global variables
+STREAM_NAME = "NeuroSyncReplay"
+STREAM_TYPE = "EEG"  # what main.connect_and_process resolves
+CHUNK_SIZE = 32  # samples pushed per outlet per tick
+SAMPLING_RATE = 256  # Hz, for CSV sessions
+
+
+def load_session(path, sampling_rate: float = SAMPLING_RATE):
+    """Loads the samples of a recorded session.
+
+    Arguments:
+        path (str | os.PathLike): CSV with a timestamp column, or a .nsrec
+            recording.
+        sampling_rate (float): Sampling rate of a CSV session; .nsrec files
+            carry their own.
+
+    Returns:
+        tuple[np.ndarray, tuple[str, ...], float]: (n_samples, n_channels)
+            float32 samples, channel names, and the sampling rate.
+
+    Raises:
+        ValueError: If the session holds no samples.
+    """
+    path = os.fspath(path)
+    if path.endswith(recording.EXTENSION):
+        rec = recording.load(path)
+        samples = np.ascontiguousarray(rec.samples, dtype=np.float32)
+        channels, sampling_rate = rec.channels, rec.sampling_rate
+    else:
+        import pandas as pd
+
+        frame = pd.read_csv(path).drop(columns="timestamp", errors="ignore")
+        samples = frame.to_numpy(dtype=np.float32)
+        channels = tuple(str(column) for column in frame.columns)
+
+    if len(samples) == 0:
+        raise ValueError(f"{path} holds no samples")
+
+    return samples, channels, float(sampling_rate)
+
+
+def make_outlets(
+    n_streams: int,
+    channels,
+    sampling_rate: float,
+    name: str = STREAM_NAME,
+    stream_type: str = STREAM_TYPE,
+) -> list:
+    """Creates one float32 LSL outlet per synthetic headset.
+
+    Arguments:
+        n_streams (int): Number of outlets.
+        channels (sequence of str): Channel labels, one per column.
+        sampling_rate (float): Nominal sampling rate advertised to inlets.
+        name (str): Stream name; outlets after the first get a "-k" suffix.
+        stream_type (str): LSL content type.
+
+    Returns:
+        list[pylsl.StreamOutlet]: The outlets, with unique source ids.
+    """
+    from pylsl import StreamInfo, StreamOutlet, cf_float32
+
+    outlets = []
+    for k in range(n_streams):
+        label = name if k == 0 else f"{name}-{k}"
+        info = StreamInfo(
+            label,
+            stream_type,
+            len(channels),
+            sampling_rate,
+            cf_float32,
+            f"{label}-{os.getpid()}",
+        )
+        labels = info.desc().append_child("channels")
+        for channel in channels:
+            labels.append_child("channel").append_child_value("label", channel)
+        outlets.append(StreamOutlet(info, chunk_size=CHUNK_SIZE))
+
+    return outlets
+
+
+def replay(
+    samples: np.ndarray,
+    sampling_rate: float,
+    outlets,
+    speed: float = 1.0,
+    chunk_size: int = CHUNK_SIZE,
+    loops: int = 1,
+) -> dict:
+    """Pushes a session to every outlet on a real-time schedule.
+
+    Outlet k starts k/len(outlets) of the way through the session and wraps
+    around, so fanned-out headsets never carry identical samples at the same
+    moment. Each tick pushes chunk_size samples to every outlet, then sleeps
+    until the next tick is due.
+
+    Arguments:
+        samples (np.ndarray): (n_samples, n_channels) session samples.
+        sampling_rate (float): Sampling rate of the session.
+        outlets (sequence): Objects with push_chunk(samples), such as
+            make_outlets() returns.
+        speed (float): Playback rate relative to real time; 0 plays as fast
+            as the outlets accept samples.
+        chunk_size (int): Samples pushed per outlet per tick.
+        loops (int): Times to play the session; 0 repeats until interrupted.
+
+    Returns:
+        dict: "samples" pushed per outlet, wall-clock "seconds", the largest
+            "max_lag" in seconds behind schedule, and "late_ticks", the
+            ticks that started more than one tick period late.
+
+    Raises:
+        ValueError: If speed, chunk_size, or loops is out of range, or there
+            are no outlets.
+    """
+    if speed < 0:
+        raise ValueError("speed must be non-negative")
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    if loops < 0:
+        raise ValueError("loops must be non-negative")
+    if not outlets:
+        raise ValueError("outlets must not be empty")
+
+    samples = np.ascontiguousarray(samples, dtype=np.float32)
+    n = len(samples)
+    offsets = [k * n // len(outlets) for k in range(len(outlets))]
+    wrapped = np.empty((chunk_size, samples.shape[1]), samples.dtype)
+
+    period = chunk_size / sampling_rate / speed if speed else 0.0
+    total = n * loops if loops else None
+    pushed = 0
+    max_lag = 0.0
+    late_ticks = 0
+    start = time.perf_counter()
+    try:
+        while total is None or pushed < total:
+            count = (
+                chunk_size
+                if total is None
+                else min(chunk_size, total - pushed)
+            )
+            for outlet, offset in zip(outlets, offsets):
+                first = (offset + pushed) % n
+                if first + count <= n:
+                    outlet.push_chunk(samples[first : first + count])
+                else:  # the chunk runs past the end of the session
+                    indices = np.arange(first, first + count)
+                    np.take(samples, indices, 0, wrapped[:count], "wrap")
+                    outlet.push_chunk(wrapped[:count])
+            pushed += count
+
+            if period:
+                due = start + pushed / chunk_size * period
+                lag = time.perf_counter() - due
+                if lag < 0:
+                    time.sleep(-lag)
+                else:
+                    max_lag = max(max_lag, lag)
+                    late_ticks += lag > period
+    except KeyboardInterrupt:
+        pass
+
+    return {
+        "samples": pushed,
+        "seconds": time.perf_counter() - start,
+        "max_lag": max_lag,
+        "late_ticks": late_ticks,
+    }
+
+
+def main(argv=None):
+    """Command-line entry point.
+
+    Arguments:
+        argv (list[str] | None): Arguments, defaulting to sys.argv.
+
+    Returns:
+        int: Exit status; 1 if any tick fell more than a period behind.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Replay a recorded EEG session as local LSL streams"
+    )
+    parser.add_argument("session", help="CSV or .nsrec recording")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="Playback rate relative to real time; 0 for as fast as possible",
+    )
+    parser.add_argument(
+        "--streams", type=int, default=1, help="Synthetic headsets to publish"
+    )
+    parser.add_argument(
+        "--loops",
+        type=int,
+        default=0,
+        help="Times to play the session; 0 repeats until Ctrl+C",
+    )
+    parser.add_argument(
+        "--sf", type=float, default=SAMPLING_RATE, help="CSV sampling rate"
+    )
+    parser.add_argument("--name", default=STREAM_NAME, help="Stream name")
+    args = parser.parse_args(argv)
+
+    samples, channels, sampling_rate = load_session(args.session, args.sf)
+    outlets = make_outlets(args.streams, channels, sampling_rate, args.name)
+    print(
+        f"Publishing {args.streams} x {len(channels)}-channel stream(s) at "
+        f"{sampling_rate:g} Hz, speed {args.speed or 'max'}. Ctrl+C to stop."
+    )
+    report = replay(
+        samples, sampling_rate, outlets, args.speed, loops=args.loops
+    )
+
+    rate = report["samples"] * len(outlets) / max(report["seconds"], 1e-9)
+    print(
+        f"Pushed {report['samples']} samples per stream in "
+        f"{report['seconds']:.2f} s ({rate:,.0f} samples/s total), "
+        f"max lag {report['max_lag'] * 1e3:.1f} ms, "
+        f"{report['late_ticks']} late ticks"
+    )
+
+    return int(report["late_ticks"] > 0)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,63 +2,151 @@
 
 Streams EEG data from Muse 2 via LSL, computes band power features per window,
 and transmits each result over UART in real time.
+
+Heavy dependencies are imported inside the mode that needs them: LSL mode
+never loads pandas or matplotlib, and csv mode never loads pylsl or pyserial.
+
+Setting NEUROSYNC_DTYPE=float32 runs band power in single precision in either
+mode, trading accuracy the uint16 packets cannot carry anyway for speed.
 """
 
+from __future__ import annotations
+
 import os  # standard library
+from typing import TYPE_CHECKING
 
-import pandas as pd  # third-party
-import serial
-from pylsl import StreamInlet, resolve_byprop
+import numpy as np  # third party
 
-import data_processing  # local
+import band_stats  # local
+import spectral
+import streaming
 import transmission
 
+if TYPE_CHECKING:
+    import serial
+
+# global variables
+DTYPE_ENV = "NEUROSYNC_DTYPE"
+CHANNEL_MAP = (0, 1, 2, 3)  # LSL columns of ch1-ch4: TP9, AF7, AF8, TP10
+MAX_CHUNK = 32  # samples per pull; 125 ms at 256 Hz
+PULL_TIMEOUT = 0.5  # seconds a pull waits for a full chunk
+
+
+def get_plan(
+    sampling_rate: float = spectral.SAMPLING_RATE,
+) -> spectral.BandPlan:
+    """Returns the band/window plan with the precision set by NEUROSYNC_DTYPE.
 
-def connect_and_process(ser: serial.Serial) -> None:
+    Arguments:
+        sampling_rate (float): Sampling rate of the signal in Hz.
+
+    Returns:
+        spectral.BandPlan: The default plan in float64, or in float32 when
+            NEUROSYNC_DTYPE is "float32".
+    """
+    return spectral.get_plan(
+        sampling_rate=sampling_rate,
+        dtype=os.environ.get(DTYPE_ENV) or "float64",
+    )
+
+
+def connect_and_process(
+    ser: serial.Serial,
+    plan: spectral.BandPlan | None = None,
+    channel_map=CHANNEL_MAP,
+    max_chunk: int = MAX_CHUNK,
+    timeout: float = PULL_TIMEOUT,
+    writer=None,
+) -> band_stats.OnlineStats:
     """Streams EEG data from the Muse 2 via LSL, computes band power features
     per window, and transmits each result over UART in real time.
 
+    Samples are pulled in chunks of up to max_chunk straight into a
+    preallocated array in the stream's sample type, and channel_map picks the
+    LSL columns that feed the plan's channels. They go to a long-lived
+    streaming.BandPowerStream, which emits one result per 128-sample hop once
+    the first 256-sample window is full. Every buffer is allocated once up
+    front, so the steady-state loop builds no arrays, dicts, or DataFrames
+    per window. The one exception is the running statistics: every
+    band_stats.BUFFER_SIZE rows they fold their buffer into the t-digests,
+    which allocates transient arrays of about 50 KB and replaces the
+    centroid arrays, whose size is capped by the digest compression.
+
     Arguments:
-        ser (serial.Serial): Open UART serial connection to transmit on.
+        ser (serial.Serial): Open UART serial connection to transmit on, or
+            a serial_writer.SerialWriter that owns one so a stalled UART does
+            not stall acquisition.
+        plan (spectral.BandPlan | None): Band/window configuration. Defaults
+            to get_plan().
+        channel_map (sequence of int): LSL column index of each plan channel.
+        max_chunk (int): Most samples taken per pull_chunk call.
+        timeout (float): Seconds a pull waits for max_chunk samples before
+            returning what has arrived.
+        writer (recording.RecordingWriter | None): Also records the mapped
+            samples with their LSL timestamps.
 
     Returns:
-        None.
+        band_stats.OnlineStats: Running statistics of every band power row
+            transmitted, summarized without keeping the rows.
+
+    Raises:
+        ValueError: If channel_map does not fit the plan and the stream.
     """
+    from pylsl import StreamInlet, resolve_byprop
+
+    stream = streaming.BandPowerStream(get_plan() if plan is None else plan)
+    if len(channel_map) != stream.n_channels:
+        raise ValueError(
+            f"channel_map must have {stream.n_channels} entries, "
+            f"got {len(channel_map)}"
+        )
+    if max_chunk <= 0:
+        raise ValueError("max_chunk must be positive")
+
     print("Resolving Muse 2 EEG stream...")
     # Stream acquisition
     # pylint: disable=unexpected-keyword-arg, too-many-function-args
     streams = resolve_byprop("type", "EEG")
     inlet = StreamInlet(streams[0])
+    if not all(0 <= column < inlet.channel_count for column in channel_map):
+        raise ValueError(
+            f"channel_map {tuple(channel_map)} does not fit a stream of "
+            f"{inlet.channel_count} channels"
+        )
     print("Stream acquired. Beginning transmission. Press Ctrl+C to stop.")
 
-    buffer = []
+    n_bands = stream.plan.n_bands
+    stats = band_stats.OnlineStats(stream.plan.band_names)
+    encoder = transmission.PacketEncoder(stream.plan.band_names)
+    # pull_chunk writes into chunk directly; it must match the stream's type
+    chunk = np.zeros(
+        (max_chunk, inlet.channel_count), dtype=np.dtype(inlet.value_type)
+    )
+    samples = np.empty((max_chunk, stream.n_channels), stream.plan.dtype)
+    results = np.empty((stream.max_results(max_chunk), n_bands), samples.dtype)
 
     try:
-        print("before loop")
         while True:
-            sample, _ = inlet.pull_sample()
-            buffer.append(sample[:5])
-
-            if len(buffer) >= 256:  # window size
-                window_df = pd.DataFrame(
-                    buffer[:256],
-                    columns=["timestamp", "ch1", "ch2", "ch3", "ch4"],
-                )
-                print("before processing")
-                # change below:
-                # band_power_df = data_processing.transform_to_hz(window_df)
-                result = data_processing.process_pipeline(window_df)
-                print("after processing")
-                band_power_df = result["frequency_data"]
-                print("transmitting...")
-                transmission.transmit(band_power_df, ser)
-                print("after transmitting")
-
-                buffer = buffer[128:]  # 50% window overlap
-                print("after loop")
+            _, timestamps = inlet.pull_chunk(
+                timeout=timeout, max_samples=max_chunk, dest_obj=chunk
+            )
+            n = len(timestamps)
+            if n == 0:
+                continue
+
+            for channel, column in enumerate(channel_map):
+                samples[:n, channel] = chunk[:n, column]
+            if writer is not None:
+                writer.append(timestamps, samples[:n])
+
+            for band_powers in stream.push_chunk(samples[:n], results):
+                ser.write(encoder.encode(band_powers))
+                stats.update(band_powers)
     except KeyboardInterrupt:
         print("Stream interrupted. Closing.")
 
+    return stats
+
 
 def main():
     """Opens a UART serial connection and starts streaming and processing EEG
@@ -66,12 +154,27 @@ def main():
     mode = input("Select mode (lsl / csv): ").strip().lower()
 
     if mode == "lsl":
+        import serial
+
+        import serial_writer
+
         # NOTE: change port if needed for Windows (e.g., COM5)
         with serial.Serial(port="COM8", baudrate=115200, timeout=1) as ser:
-            connect_and_process(ser)
+            with serial_writer.SerialWriter(ser) as uart:
+                connect_and_process(uart)
+            stats = uart.stats()
+            print(
+                f"{stats['written']} packets written, "
+                f"{stats['dropped']} dropped, "
+                f"peak queue depth {stats['max_depth']}"
+            )
 
     elif mode == "csv":
-        file = input("Enter CSV file name (inside /data): ")
+        import data_processing
+        import recording
+        import result_cache
+
+        file = input("Enter CSV or .nsrec file name (inside /data): ")
 
         path = data_processing.get_data(file)
 
@@ -79,14 +182,27 @@ def main():
             print("File not found")
             return
 
+        # reuse stored results when a cache directory is configured
+        cache = None
+        if os.environ.get(result_cache.CACHE_DIR_ENV):
+            cache = result_cache.ResultCache()
+
         try:
-            df = pd.read_csv(path)
+            if path.endswith(recording.EXTENSION):
+                # memory-mapped; processed in blocks without loading
+                rec = recording.load(path)
+                result = data_processing.process_pipeline(
+                    rec, plan=get_plan(rec.sampling_rate), cache=cache
+                )
+            else:
+                # chunked read; memory does not grow with recording length
+                result = data_processing.process_csv(
+                    path, plan=get_plan(), cache=cache
+                )
         except IsADirectoryError:
             print("Invalid file name")
             return
 
-        result = data_processing.process_pipeline(df)
-
         print("\n--- STATS ---")
         for key, value in result["stats"].items():
             print(f"\n{key}:\n{value}")
@@ -0,0 +1,334 @@
+"""recording.py.
+
+Binary EEG recording format. A recording file holds a fixed header with the
+sampling rate and sample type, a JSON channel map, one contiguous block of
+float32 or float64 samples, and the float64 timestamps. Loading a recording
+memory-maps both blocks, so sessions larger than RAM can be processed
+without parsing or copying them.
+"""
+
+import json
+import os
+import shutil
+import struct
+import tempfile
+from dataclasses import dataclass
+
+import numpy as np
+
+# global variables
+MAGIC = b"NSYNCREC"
+VERSION = 1
+EXTENSION = ".nsrec"
+ALIGNMENT = 64  # byte alignment of the sample and timestamp blocks
+# magic, version, sample type code, sampling rate, samples, channel map size
+HEADER = struct.Struct("<8sHcxdQI")
+DTYPES = {b"f": np.dtype("<f4"), b"d": np.dtype("<f8")}
+CHUNK_SIZE = 65536  # CSV rows converted at a time
+
+
+def _aligned(offset: int) -> int:
+    """Rounds a byte offset up to the next ALIGNMENT boundary."""
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _dtype_code(dtype) -> bytes:
+    """Returns the header code for a sample type."""
+    dtype = np.dtype(dtype)
+    for code, known in DTYPES.items():
+        if dtype == known or dtype == known.newbyteorder("="):
+            return code
+
+    raise ValueError(f"samples must be float32 or float64, got {dtype}")
+
+
+@dataclass(frozen=True)
+class Recording:
+    """A loaded recording whose samples and timestamps are memory-mapped."""
+
+    path: str
+    sampling_rate: float
+    channels: tuple[str, ...]
+    samples: np.ndarray  # (n_samples, n_channels) memmap
+    timestamps: np.ndarray  # (n_samples,) float64 memmap
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def channel_map(self) -> dict:
+        """Channel name to column index in samples."""
+        return {name: index for index, name in enumerate(self.channels)}
+
+    def select(self, channels) -> np.ndarray:
+        """Returns the samples of some channels, in the order given.
+
+        Arguments:
+            channels (iterable of str): Channel names from the channel map.
+
+        Returns:
+            np.ndarray: A (n_samples, n_selected) array. A view into the
+                memmap when the channels are adjacent and in file order.
+
+        Raises:
+            KeyError: If a channel is not in the recording.
+        """
+        columns = [self.channel_map[name] for name in channels]
+        if columns == list(range(columns[0], columns[0] + len(columns))):
+            return self.samples[:, columns[0] : columns[-1] + 1]
+
+        return self.samples[:, columns]
+
+
+class RecordingWriter:
+    """Writes a recording incrementally without knowing its length upfront.
+
+    Samples are appended to the output file while timestamps go to a
+    temporary file; close() appends the timestamps and fills in the header.
+    """
+
+    def __init__(self, path, channels, sampling_rate, dtype=np.float32):
+        """Opens the output file and writes a provisional header.
+
+        Arguments:
+            path (str | os.PathLike): Output recording file.
+            channels (iterable of str): Channel names, in column order.
+            sampling_rate (float): Sampling rate of the recording in Hz.
+            dtype (np.dtype): Sample type, float32 or float64.
+        """
+        self.path = os.fspath(path)
+        self.channels = tuple(channels)
+        self.sampling_rate = float(sampling_rate)
+        self.dtype = DTYPES[_dtype_code(dtype)]
+        self.n_samples = 0
+
+        self._channel_map = json.dumps(list(self.channels)).encode("utf-8")
+        self._file = open(self.path, "wb")
+        self._times = tempfile.TemporaryFile()
+        self._write_header()
+        self._file.seek(self.data_offset)
+
+    @property
+    def data_offset(self) -> int:
+        """Byte offset of the sample block."""
+        return _aligned(HEADER.size + len(self._channel_map))
+
+    def append(self, timestamps, samples) -> None:
+        """Appends a block of samples.
+
+        Arguments:
+            timestamps (array-like): One timestamp per sample.
+            samples (array-like): A (n_samples, n_channels) block.
+
+        Returns:
+            None.
+        """
+        samples = np.ascontiguousarray(samples, dtype=self.dtype)
+        timestamps = np.ascontiguousarray(timestamps, dtype="<f8")
+        if samples.ndim != 2 or samples.shape[1] != len(self.channels):
+            raise ValueError(
+                f"samples must have shape (n, {len(self.channels)}), "
+                f"got {samples.shape}"
+            )
+        if len(timestamps) != len(samples):
+            raise ValueError("timestamps and samples differ in length")
+
+        self._file.write(samples.tobytes())
+        self._times.write(timestamps.tobytes())
+        self.n_samples += len(samples)
+
+    def close(self) -> None:
+        """Appends the timestamps, finalizes the header, and closes the file.
+
+        Arguments:
+            None.
+
+        Returns:
+            None.
+        """
+        if self._file.closed:
+            return
+
+        end = self.data_offset + self.n_samples * self._row_bytes
+        self._file.write(b"\0" * (_aligned(end) - end))
+        self._times.seek(0)
+        shutil.copyfileobj(self._times, self._file)
+        self._times.close()
+
+        self._write_header()
+        self._file.close()
+
+    @property
+    def _row_bytes(self) -> int:
+        return len(self.channels) * self.dtype.itemsize
+
+    def _write_header(self) -> None:
+        self._file.seek(0)
+        self._file.write(
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                _dtype_code(self.dtype),
+                self.sampling_rate,
+                self.n_samples,
+                len(self._channel_map),
+            )
+        )
+        self._file.write(self._channel_map)
+        self._file.write(b"\0" * (self.data_offset - self._file.tell()))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def save(
+    path, timestamps, samples, channels, sampling_rate, dtype=np.float32
+) -> None:
+    """Writes in-memory samples as a recording file.
+
+    Arguments:
+        path (str | os.PathLike): Output recording file.
+        timestamps (array-like): One timestamp per sample.
+        samples (array-like): A (n_samples, n_channels) array.
+        channels (iterable of str): Channel names, in column order.
+        sampling_rate (float): Sampling rate of the recording in Hz.
+        dtype (np.dtype): Sample type, float32 or float64.
+
+    Returns:
+        None.
+    """
+    with RecordingWriter(path, channels, sampling_rate, dtype) as writer:
+        writer.append(timestamps, samples)
+
+
+def convert_csv(
+    csv_path,
+    path=None,
+    sampling_rate: float = 256,
+    dtype=np.float32,
+    chunk_size: int = CHUNK_SIZE,
+) -> str:
+    """Converts a timestamp + channel CSV recording to the binary format.
+
+    The CSV is read in chunks, so files larger than RAM can be converted.
+
+    Arguments:
+        csv_path (str | os.PathLike): CSV with a timestamp column followed by
+            channel columns, as written by tools/musestreamtest.py.
+        path (str | os.PathLike | None): Output file. Defaults to the CSV
+            path with EXTENSION.
+        sampling_rate (float): Sampling rate of the recording in Hz.
+        dtype (np.dtype): Sample type, float32 or float64.
+        chunk_size (int): Number of CSV rows read at a time.
+
+    Returns:
+        str: Path of the written recording.
+    """
+    import pandas as pd
+
+    if path is None:
+        path = os.path.splitext(os.fspath(csv_path))[0] + EXTENSION
+
+    with pd.read_csv(csv_path, chunksize=chunk_size) as reader:
+        writer = None
+        for chunk in reader:
+            channels = [c for c in chunk.columns if c != "timestamp"]
+            if writer is None:
+                writer = RecordingWriter(path, channels, sampling_rate, dtype)
+            writer.append(
+                chunk["timestamp"].to_numpy(dtype=float),
+                chunk[channels].to_numpy(dtype=float),
+            )
+
+    if writer is None:  # header-only CSV
+        channels = pd.read_csv(csv_path, nrows=0).columns.drop("timestamp")
+        writer = RecordingWriter(path, channels, sampling_rate, dtype)
+    writer.close()
+
+    return os.fspath(path)
+
+
+def load(path, mode: str = "r") -> Recording:
+    """Memory-maps a recording file.
+
+    Arguments:
+        path (str | os.PathLike): Recording file written by this module.
+        mode (str): np.memmap mode; "r" for read-only, "r+" to edit samples
+            in place.
+
+    Returns:
+        Recording: Sampling rate, channel map, and memory-mapped samples and
+            timestamps.
+
+    Raises:
+        ValueError: If the file is not a recording or has an unknown version.
+    """
+    path = os.fspath(path)
+    with open(path, "rb") as file:
+        header = file.read(HEADER.size)
+        if len(header) < HEADER.size or header[:8] != MAGIC:
+            raise ValueError(f"{path} is not a NeuroSync recording")
+        _, version, code, sampling_rate, n_samples, map_size = HEADER.unpack(
+            header
+        )
+        if version != VERSION:
+            raise ValueError(f"unsupported recording version {version}")
+        channels = tuple(json.loads(file.read(map_size).decode("utf-8")))
+
+    dtype = DTYPES[code]
+    data_offset = _aligned(HEADER.size + map_size)
+    time_offset = _aligned(
+        data_offset + n_samples * len(channels) * dtype.itemsize
+    )
+
+    if n_samples == 0:  # zero-length files cannot be mapped
+        samples = np.empty((0, len(channels)), dtype=dtype)
+        timestamps = np.empty(0, dtype="<f8")
+    else:
+        samples = np.memmap(
+            path,
+            dtype=dtype,
+            mode=mode,
+            offset=data_offset,
+            shape=(n_samples, len(channels)),
+        )
+        timestamps = np.memmap(
+            path, dtype="<f8", mode=mode, offset=time_offset, shape=n_samples
+        )
+
+    return Recording(path, sampling_rate, channels, samples, timestamps)
+
+
+def main():
+    """Converts CSV recordings given on the command line.
+
+    Arguments:
+        None.
+
+    Returns:
+        None.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Convert CSV EEG recordings to the binary format"
+    )
+    parser.add_argument("csv", nargs="+", help="CSV recordings to convert")
+    parser.add_argument("--sf", type=float, default=256, help="Sampling rate")
+    parser.add_argument(
+        "--float64",
+        action="store_true",
+        help="Store samples as float64 instead of float32",
+    )
+    args = parser.parse_args()
+
+    dtype = np.float64 if args.float64 else np.float32
+    for csv_path in args.csv:
+        print(f"{csv_path} -> {convert_csv(csv_path, None, args.sf, dtype)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""result_cache.py.
+
+Content-addressed on-disk cache for process_pipeline results. Entries are
+keyed by a SHA-256 of the input samples plus the band/window configuration,
+so changing either the recording or the plan misses the cache. Band power
+frames and stats are stored as .npz arrays with a JSON sidecar (never
+pickled), and the least recently used entries are evicted once the cache
+grows past its size cap.
+"""
+
+import dataclasses
+import hashlib
+import json
+import os
+import tempfile
+import time
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+import recording
+import spectral
+
+# global variables
+CACHE_VERSION = 1  # bump when the band power output format changes
+CACHE_DIR_ENV = "NEUROSYNC_CACHE_DIR"
+DEFAULT_DIR = os.path.join(os.path.expanduser("~"), ".cache", "neurosync")
+MAX_BYTES = 1 << 30  # 1 GiB
+HASH_BLOCK = 1 << 20  # bytes read at a time when hashing files
+FILE_HASHES = "file_hashes.json"
+
+
+class ResultCache:
+    """Directory of cached process_pipeline results with LRU eviction.
+
+    Recency is tracked with file modification times, so several processes
+    can share one cache directory without a central index.
+    """
+
+    def __init__(self, directory=None, max_bytes: int = MAX_BYTES):
+        """Opens or creates a cache directory.
+
+        Arguments:
+            directory (str | os.PathLike | None): Cache location. Defaults to
+                $NEUROSYNC_CACHE_DIR or ~/.cache/neurosync.
+            max_bytes (int): Size cap for stored entries.
+        """
+        if directory is None:
+            directory = os.environ.get(CACHE_DIR_ENV, DEFAULT_DIR)
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+
+        self.directory = os.fspath(directory)
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, source, plan: spectral.BandPlan, method: str) -> str:
+        """Returns the cache key for an input and configuration.
+
+        Arguments:
+            source (str | os.PathLike | pd.DataFrame | recording.Recording |
+                np.ndarray): A recording file, loaded samples, or raw array.
+            plan (spectral.BandPlan): Band/window configuration.
+            method (str): PSD estimator, one of spectral.PSD_METHODS.
+
+        Returns:
+            str: Hex digest naming the cache entry.
+
+        Raises:
+            TypeError: If source is not a supported input type.
+        """
+        config = {
+            "version": CACHE_VERSION,
+            "plan": dataclasses.asdict(plan),
+            "method": method,
+        }
+        digest = hashlib.sha256(json.dumps(config, sort_keys=True).encode())
+        digest.update(self._content_hash(source, plan).encode())
+
+        return digest.hexdigest()
+
+    def get(self, key: str) -> dict | None:
+        """Returns a cached result and marks it as recently used.
+
+        Arguments:
+            key (str): Cache key from key().
+
+        Returns:
+            dict | None: The result with "frequency_data" and "stats", or
+                None on a miss.
+        """
+        arrays_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, encoding="utf-8") as file:
+                meta = json.load(file)
+            with np.load(arrays_path, allow_pickle=False) as arrays:
+                frame = pd.DataFrame(
+                    {
+                        column: arrays[f"frame_{i}"]
+                        for i, column in enumerate(meta["columns"])
+                    },
+                    columns=meta["columns"],
+                )
+                stats = None
+                if meta["stats"] is not None:
+                    stats = {
+                        name: pd.Series(
+                            arrays[f"stat_{name}"], index=meta["stats_index"]
+                        )
+                        for name in meta["stats"]
+                    }
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            return None
+
+        now = time.time()
+        os.utime(arrays_path, (now, now))
+
+        return {"frequency_data": frame, "stats": stats}
+
+    def put(self, key: str, result: dict) -> None:
+        """Stores a result, then evicts old entries past the size cap.
+
+        Arguments:
+            key (str): Cache key from key().
+            result (dict): process_pipeline output.
+
+        Returns:
+            None.
+        """
+        frame = result["frequency_data"]
+        stats = result["stats"]
+        arrays = {
+            f"frame_{i}": frame[column].to_numpy()
+            for i, column in enumerate(frame.columns)
+        }
+        meta = {
+            "columns": [str(column) for column in frame.columns],
+            "stats": None,
+            "stats_index": None,
+        }
+        if stats is not None:
+            meta["stats"] = list(stats)
+            index = next(iter(stats.values())).index
+            meta["stats_index"] = [str(column) for column in index]
+            for name, series in stats.items():
+                arrays[f"stat_{name}"] = series.to_numpy(dtype=float)
+
+        arrays_path, meta_path = self._paths(key)
+        self._write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+        with tempfile.NamedTemporaryFile(
+            dir=self.directory, suffix=".npz", delete=False
+        ) as file:
+            np.savez(file, **arrays)
+        os.replace(file.name, arrays_path)
+
+        self.evict()
+
+    def evict(self) -> None:
+        """Removes least recently used entries until under max_bytes.
+
+        Arguments:
+            None.
+
+        Returns:
+            None.
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".npz"):
+                continue
+            arrays_path = os.path.join(self.directory, name)
+            meta_path = arrays_path[: -len(".npz")] + ".json"
+            try:
+                size = os.path.getsize(arrays_path)
+                size += os.path.getsize(meta_path)
+                used = os.path.getmtime(arrays_path)
+            except OSError:
+                continue
+            entries.append((used, size, arrays_path, meta_path))
+
+        total = sum(size for _, size, _, _ in entries)
+        for _, size, arrays_path, meta_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            for path in (arrays_path, meta_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+
+    def size(self) -> int:
+        """Returns the number of bytes held by cache entries.
+
+        Arguments:
+            None.
+
+        Returns:
+            int: Total size of stored entries.
+        """
+        return sum(
+            os.path.getsize(os.path.join(self.directory, name))
+            for name in os.listdir(self.directory)
+            if name.endswith((".npz", ".json")) and name != FILE_HASHES
+        )
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, key)
+        return base + ".npz", base + ".json"
+
+    def _content_hash(self, source, plan):
+        """Hashes the samples an input contributes to the result."""
+        if isinstance(source, recording.Recording):
+            return self._file_hash(source.path)
+        if isinstance(source, (str, os.PathLike)):
+            return self._file_hash(source)
+
+        digest = hashlib.sha256()
+        if isinstance(source, pd.DataFrame):
+            for column in ["timestamp", *plan.channels]:
+                values = np.ascontiguousarray(source[column].to_numpy())
+                digest.update(f"{column}:{values.dtype.str}:".encode())
+                digest.update(values.tobytes())
+        elif isinstance(source, np.ndarray):
+            values = np.ascontiguousarray(source)
+            digest.update(f"{values.dtype.str}:{values.shape}:".encode())
+            digest.update(values.tobytes())
+        else:
+            raise TypeError(
+                "source must be a path, DataFrame, Recording, or ndarray"
+            )
+
+        return digest.hexdigest()
+
+    def _file_hash(self, path):
+        """Hashes file contents, reusing the digest while the file's size
+        and modification time are unchanged."""
+        path = os.path.abspath(os.fspath(path))
+        info = os.stat(path)
+        stamp = [info.st_size, info.st_mtime_ns]
+
+        memo_path = os.path.join(self.directory, FILE_HASHES)
+        try:
+            with open(memo_path, encoding="utf-8") as file:
+                memo = json.load(file)
+        except (OSError, ValueError):
+            memo = {}
+
+        entry = memo.get(path)
+        if entry is not None and entry[:2] == stamp:
+            return entry[2]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            for block in iter(lambda: file.read(HASH_BLOCK), b""):
+                digest.update(block)
+
+        memo[path] = [*stamp, digest.hexdigest()]
+        self._write_atomic(memo_path, json.dumps(memo).encode("utf-8"))
+
+        return digest.hexdigest()
+
+    def _write_atomic(self, path, data: bytes) -> None:
+        with tempfile.NamedTemporaryFile(
+            dir=self.directory, suffix=".tmp", delete=False
+        ) as file:
+            file.write(data)
+        os.replace(file.name, path)
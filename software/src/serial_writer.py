@@ -0,0 +1,300 @@
+"""serial_writer.py.
+
+Asynchronous UART output. SerialWriter owns an open serial.Serial handle and
+writes to it from a background thread, so a stalled UART never stalls the
+acquisition loop. Producers call write() as they would on the port itself;
+the data is copied into a byte ring allocated up front, and the writer
+thread copies everything pending into one preallocated batch buffer for a
+single write, so the steady state allocates nothing per packet. When the
+ring is out of writes or bytes, the overflow policy decides whether the
+oldest or the newest data is dropped, or whether the producer waits for
+room.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import serial
+
+# global variables
+QUEUE_SIZE = 256  # pending writes; 32 s of packets at 8 per second
+WRITE_SIZE = 16  # ring bytes budgeted per pending write; a packet is <= 13
+DROP_OLDEST = "drop-oldest"
+DROP_NEWEST = "drop-newest"
+BLOCK = "block"
+POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+
+class SerialWriter:
+    """Background thread that drains a bounded write queue into a port.
+
+    Only the writer thread touches the port once the writer is started;
+    closing the writer drains the queue but leaves the port open for its
+    owner to close. The port is handed a memoryview of the writer's batch
+    buffer, which is reused once write() returns.
+
+    Counters:
+        queued: Writes accepted into the queue.
+        dropped: Writes discarded by the overflow policy.
+        written: Queued writes that reached the port.
+        writes: Successful calls to the port's write(), one per coalesced
+            batch.
+        bytes: Bytes written to the port.
+        max_depth: Most writes ever pending at once.
+        errors: Exceptions raised by the port's write(); the batch that
+            raised is lost.
+    """
+
+    def __init__(
+        self,
+        ser: serial.Serial,
+        maxsize: int = QUEUE_SIZE,
+        policy: str = DROP_OLDEST,
+        buffer_size: int | None = None,
+    ):
+        """Starts the writer thread.
+
+        Arguments:
+            ser (serial.Serial): Open port, or anything with write(bytes).
+            maxsize (int): Most writes kept pending.
+            policy (str): What write() does when the queue is full; one of
+                POLICIES.
+            buffer_size (int | None): Most bytes kept pending. Defaults to
+                WRITE_SIZE bytes per pending write. A single write larger
+                than this grows the buffer to fit it and what is pending.
+
+        Raises:
+            ValueError: If maxsize or buffer_size is not positive or the
+                policy is unknown.
+        """
+        if buffer_size is None:
+            buffer_size = maxsize * WRITE_SIZE
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        if buffer_size <= 0:
+            raise ValueError("buffer_size must be positive")
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}")
+
+        self.ser = ser
+        self.maxsize = maxsize
+        self.policy = policy
+        self.queued = 0
+        self.dropped = 0
+        self.written = 0
+        self.writes = 0
+        self.bytes = 0
+        self.max_depth = 0
+        self.errors = []
+        self._ring = memoryview(bytearray(buffer_size))
+        self._batch = memoryview(bytearray(buffer_size))
+        self._lengths = [0] * maxsize  # bytes of each pending write
+        self._head = 0  # index in _lengths of the oldest pending write
+        self._count = 0  # pending writes
+        self._start = 0  # ring offset of the oldest pending byte
+        self._used = 0  # pending bytes
+        self._busy = False  # a batch is being written
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def depth(self) -> int:
+        """Writes pending in the queue."""
+        return self._count
+
+    @property
+    def buffer_size(self) -> int:
+        """Bytes the ring can hold."""
+        return len(self._ring)
+
+    def write(self, data) -> int:
+        """Queues bytes for the port without waiting for I/O.
+
+        The data is copied into the ring, so reused buffers such as
+        transmission.PacketEncoder's may be passed directly. A write is
+        kept or dropped whole: under the drop policies a full queue
+        discards whole writes until the new one fits, and under the block
+        policy it makes the caller wait for room.
+
+        Arguments:
+            data (bytes-like): Bytes to write.
+
+        Returns:
+            int: Bytes queued; 0 if the write was dropped.
+
+        Raises:
+            ValueError: If the writer is closed.
+        """
+        size = len(data)
+        with self._cond:
+            if self._closed:
+                raise ValueError("write to a closed SerialWriter")
+            if size > len(self._ring):
+                self._grow(max(self._used + size, 2 * len(self._ring)))
+            if not self._has_room(size):
+                if self.policy == DROP_NEWEST:
+                    self.dropped += 1
+                    return 0
+                if self.policy == DROP_OLDEST:
+                    while not self._has_room(size):
+                        self._drop_oldest()
+                else:
+                    self._cond.wait_for(
+                        lambda: self._has_room(size) or self._closed
+                    )
+                    if self._closed:
+                        raise ValueError("write to a closed SerialWriter")
+
+            self._copy_in(data, size)
+            self._lengths[(self._head + self._count) % self.maxsize] = size
+            self._count += 1
+            self._used += size
+            self.queued += 1
+            if self._count > self.max_depth:
+                self.max_depth = self._count
+            self._cond.notify_all()
+
+        return size
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Waits until every queued write has reached the port.
+
+        Arguments:
+            timeout (float | None): Most seconds to wait; None waits forever.
+
+        Returns:
+            bool: True if the queue drained before the timeout.
+        """
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._count and not self._busy, timeout
+            )
+
+    def stats(self) -> dict:
+        """Returns a snapshot of the queue depth and counters.
+
+        Arguments:
+            None.
+
+        Returns:
+            dict: depth, max_depth, queued, dropped, written, writes, bytes,
+                and errors (a count).
+        """
+        with self._cond:
+            return {
+                "depth": self._count,
+                "max_depth": self.max_depth,
+                "queued": self.queued,
+                "dropped": self.dropped,
+                "written": self.written,
+                "writes": self.writes,
+                "bytes": self.bytes,
+                "errors": len(self.errors),
+            }
+
+    def close(self) -> None:
+        """Writes what is still queued, then stops the writer thread.
+
+        Arguments:
+            None.
+
+        Returns:
+            None.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def _run(self) -> None:
+        """Writes each batch of pending data until closed and drained."""
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._count or self._closed)
+                if not self._count:
+                    return
+                count, size = self._count, self._used
+                self._gather()
+                self._head = (self._head + count) % self.maxsize
+                self._count = self._used = self._start = 0
+                self._busy = True
+                self._cond.notify_all()  # room for blocked producers
+
+            data = self._batch[:size]
+            try:
+                self.ser.write(data)
+                failed = False
+            except Exception as error:  # keep serving later writes
+                self.errors.append(error)
+                print(f"serial write failed: {error}")
+                failed = True
+
+            with self._cond:
+                if not failed:
+                    self.writes += 1
+                    self.written += count
+                    self.bytes += size
+                self._busy = False
+                self._cond.notify_all()
+
+    def _has_room(self, size: int) -> bool:
+        """Whether a write of size bytes fits now. The caller holds the
+        lock."""
+        return self._count < self.maxsize and self._used + size <= len(
+            self._ring
+        )
+
+    def _drop_oldest(self) -> None:
+        """Discards the oldest pending write. The caller holds the lock."""
+        size = self._lengths[self._head]
+        self._head = (self._head + 1) % self.maxsize
+        self._start = (self._start + size) % len(self._ring)
+        self._count -= 1
+        self._used -= size
+        self.dropped += 1
+
+    def _copy_in(self, data, size: int) -> None:
+        """Appends size bytes of data after the pending bytes, wrapping
+        around the end of the ring. The caller holds the lock."""
+        capacity = len(self._ring)
+        end = (self._start + self._used) % capacity
+        if end + size <= capacity:
+            self._ring[end : end + size] = data
+        else:
+            data = memoryview(data).cast("B")
+            split = capacity - end
+            self._ring[end:] = data[:split]
+            self._ring[: size - split] = data[split:]
+
+    def _gather(self) -> None:
+        """Copies the pending bytes into the batch buffer. The caller holds
+        the lock."""
+        if len(self._batch) < len(self._ring):
+            self._batch = memoryview(bytearray(len(self._ring)))
+        self._copy_out(self._batch)
+
+    def _grow(self, capacity: int) -> None:
+        """Replaces the ring with a larger one holding the same pending
+        bytes. The caller holds the lock."""
+        ring = memoryview(bytearray(capacity))
+        self._copy_out(ring)
+        self._ring = ring
+        self._start = 0
+
+    def _copy_out(self, dest: memoryview) -> None:
+        """Copies the pending bytes, oldest first, to the start of dest. The
+        caller holds the lock."""
+        first = min(self._used, len(self._ring) - self._start)
+        dest[:first] = self._ring[self._start : self._start + first]
+        dest[first : self._used] = self._ring[: self._used - first]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
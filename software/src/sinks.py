@@ -0,0 +1,289 @@
+"""sinks.py.
+
+Output sinks for process_pipeline results. Sinks run on a background thread
+so plotting, UART writes, and file output never block the compute path, and
+the plot sink draws in a separate process so the pipeline itself never
+imports matplotlib.
+"""
+
+import abc
+import atexit
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+
+# global variables
+HEADLESS_ENV = "NEUROSYNC_HEADLESS"  # set to 1 to disable plotting
+DEFAULT_SINKS = ("plot",)
+QUEUE_SIZE = 64  # pending results before the oldest is dropped
+
+
+def is_headless() -> bool:
+    """Returns True if plotting is disabled through the environment.
+
+    Arguments:
+        None.
+
+    Returns:
+        bool: True when NEUROSYNC_HEADLESS is set to a truthy value.
+    """
+    return os.environ.get(HEADLESS_ENV, "").lower() in ("1", "true", "yes")
+
+
+class Sink(abc.ABC):
+    """Base class for pipeline outputs.
+
+    Subclasses implement emit(), which receives the process_pipeline result
+    dict with "frequency_data" and "stats" keys.
+    """
+
+    name = "sink"
+    requires = ()  # constructor arguments that have no default
+
+    @abc.abstractmethod
+    def emit(self, result: dict) -> None:
+        """Consumes one pipeline result.
+
+        Arguments:
+            result (dict): process_pipeline output.
+
+        Returns:
+            None.
+        """
+
+    def close(self) -> None:
+        """Releases any resources held by the sink.
+
+        Arguments:
+            None.
+
+        Returns:
+            None.
+        """
+
+
+class NullSink(Sink):
+    """Discards every result."""
+
+    name = "none"
+
+    def emit(self, result: dict) -> None:
+        pass
+
+
+class PlotSink(Sink):
+    """Plots band power with graphing.run in a separate process.
+
+    The window stays open after the pipeline returns; the interpreter waits
+    for it to close before exiting.
+    """
+
+    name = "plot"
+
+    def __init__(self):
+        self.processes = []
+
+    def emit(self, result: dict) -> None:
+        context = multiprocessing.get_context("spawn")
+        process = context.Process(
+            target=_plot, args=(result["frequency_data"],)
+        )
+        process.start()
+        self.processes.append(process)
+
+
+class UartSink(Sink):
+    """Transmits band power rows as UART packets."""
+
+    name = "uart"
+    requires = ("ser",)
+
+    def __init__(self, ser):
+        """Arguments:
+        ser (serial.Serial): Open UART serial connection to transmit on.
+        """
+        self.ser = ser
+
+    def emit(self, result: dict) -> None:
+        import transmission
+
+        transmission.transmit(result["frequency_data"], self.ser)
+
+
+class FileSink(Sink):
+    """Appends band power rows to a CSV file, writing the header once."""
+
+    name = "file"
+    requires = ("path",)
+
+    def __init__(self, path):
+        """Arguments:
+        path (str | os.PathLike): Destination CSV file.
+        """
+        self.path = path
+
+    def emit(self, result: dict) -> None:
+        write_header = not os.path.exists(self.path)
+        result["frequency_data"].to_csv(
+            self.path, mode="a", header=write_header, index=False
+        )
+
+
+class StatsSink(Sink):
+    """Prints summary statistics in the same layout as main."""
+
+    name = "stats"
+
+    def __init__(self, stream=None):
+        """Arguments:
+        stream (file-like | None): Output stream. Defaults to sys.stdout.
+        """
+        self.stream = stream
+
+    def emit(self, result: dict) -> None:
+        stream = sys.stdout if self.stream is None else self.stream
+        if result["stats"] is None:
+            return
+
+        print("\n--- STATS ---", file=stream)
+        for key, value in result["stats"].items():
+            print(f"\n{key}:\n{value}", file=stream)
+
+
+SINK_TYPES = {
+    sink.name: sink
+    for sink in (NullSink, PlotSink, UartSink, FileSink, StatsSink)
+}
+
+
+def make_sink(spec, **kwargs) -> Sink:
+    """Builds a sink from a name, or returns an existing Sink unchanged.
+
+    Arguments:
+        spec (str | tuple | Sink): One of SINK_TYPES, a (name, kwargs) pair
+            such as ("file", {"path": "bands.csv"}), or a Sink instance.
+        **kwargs: Constructor arguments, e.g. ser for "uart" or path for
+            "file"; they extend those of a (name, kwargs) pair.
+
+    Returns:
+        Sink: The sink.
+
+    Raises:
+        ValueError: If spec is not a known sink name, or names a sink
+            without the arguments it requires.
+    """
+    if isinstance(spec, Sink):
+        return spec
+    if isinstance(spec, tuple):
+        spec, options = spec
+        kwargs = {**options, **kwargs}
+    if spec not in SINK_TYPES:
+        raise ValueError(
+            f"unknown sink {spec!r}; choose from {sorted(SINK_TYPES)}"
+        )
+
+    sink_type = SINK_TYPES[spec]
+    missing = [name for name in sink_type.requires if name not in kwargs]
+    if missing:
+        raise ValueError(
+            f"sink {spec!r} needs {', '.join(missing)}; pass "
+            f"({spec!r}, {{{missing[0]!r}: ...}}) or a {sink_type.__name__}"
+        )
+
+    return sink_type(**kwargs)
+
+
+class SinkRunner:
+    """Background thread that feeds results to sinks from a bounded queue.
+
+    submit() never blocks: when the queue is full the oldest pending result
+    is dropped and counted.
+    """
+
+    def __init__(self, maxsize: int = QUEUE_SIZE):
+        """Starts the worker thread.
+
+        Arguments:
+            maxsize (int): Pending results kept before dropping the oldest.
+        """
+        self.dropped = 0
+        self.errors = []
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._thread = threading.Thread(target=self._work, daemon=True)
+        self._thread.start()
+
+    def submit(self, result: dict, sinks) -> None:
+        """Queues one result for a list of sinks.
+
+        Arguments:
+            result (dict): process_pipeline output.
+            sinks (list[Sink]): Sinks that should receive the result.
+
+        Returns:
+            None.
+        """
+        while True:
+            try:
+                self._queue.put_nowait((result, sinks))
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()  # discard the oldest result
+                    self._queue.task_done()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def flush(self) -> None:
+        """Blocks until every queued result has been emitted.
+
+        Arguments:
+            None.
+
+        Returns:
+            None.
+        """
+        self._queue.join()
+
+    def _work(self) -> None:
+        while True:
+            result, sinks = self._queue.get()
+            for sink in sinks:
+                try:
+                    sink.emit(result)
+                except Exception as error:  # keep serving other sinks
+                    self.errors.append((sink.name, error))
+                    print(f"sink {sink.name} failed: {error}")
+            self._queue.task_done()
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_runner() -> SinkRunner:
+    """Returns the shared SinkRunner, starting it on first use.
+
+    Arguments:
+        None.
+
+    Returns:
+        SinkRunner: The process-wide runner; flushed at interpreter exit.
+    """
+    global _runner
+
+    with _runner_lock:
+        if _runner is None:
+            _runner = SinkRunner()
+            atexit.register(_runner.flush)
+
+    return _runner
+
+
+def _plot(freq_data) -> None:
+    """Child-process entry point for PlotSink."""
+    import graphing
+
+    graphing.run(freq_data)
@@ -0,0 +1,554 @@
+"""spectral.py.
+
+Vectorized band power engine shared by the batch and streaming paths. Windows
+are built as strided views over the raw samples, transformed with a single
+real FFT, and reduced to EEG bands with precomputed bin tables held by a
+cached BandPlan.
+
+Power spectra can be estimated with a periodogram, Welch's method, or a DPSS
+multitaper. All three use the same per-bin scaling, so their band powers are
+directly comparable.
+
+A plan's dtype selects float64 or float32 arithmetic. float32 halves the
+memory and cache traffic of windowing, FFT, and band reduction; timestamps
+and frequency bins stay float64 either way.
+"""
+
+from dataclasses import dataclass, fields
+from functools import cached_property, lru_cache
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.fft import rfft, rfftfreq
+
+# global variables
+SAMPLING_RATE = 256  # sampling rate of Muse 2 headband
+WINDOW_SIZE = 256  # one second of samples
+STEP_SIZE = 128  # 50% overlap between windows
+BANDS = {
+    "delta": (0.5, 4),
+    "theta": (4, 8),
+    "alpha": (8, 13),
+    "beta": (13, 32),
+}
+GAMMA_BAND = (32, 100)
+CHANNELS = ("ch1", "ch2", "ch3", "ch4")
+PSD_METHODS = ("periodogram", "welch", "multitaper")
+MULTITAPER_BANDWIDTH = 2.0  # time-halfbandwidth product NW
+MEMORY_BUDGET = 256 * 2**20  # bytes of FFT work space per batched block
+DTYPES = ("float64", "float32")
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    """Marks a shared plan table as read-only and returns it."""
+    array.setflags(write=False)
+    return array
+
+
+@dataclass(frozen=True)
+class BandPlan:
+    """Immutable band/window configuration with precomputed bin tables.
+
+    Plans are hashable and compared by configuration. The frequency bins,
+    band slices, reduction matrix, and window coefficients are computed on
+    first use and then reused, so build plans through get_plan() to share
+    them between callers.
+    """
+
+    sampling_rate: float = SAMPLING_RATE
+    window_size: int = WINDOW_SIZE
+    step_size: int = STEP_SIZE
+    window: str = "boxcar"
+    bands: tuple[tuple[str, float, float], ...] = tuple(
+        (name, low, high) for name, (low, high) in BANDS.items()
+    )
+    channels: tuple[str, ...] = CHANNELS
+    dtype: str = "float64"
+
+    def __post_init__(self):
+        if self.window_size <= 0:
+            raise ValueError("window_size must be positive")
+        if self.step_size <= 0 or self.step_size > self.window_size:
+            raise ValueError("step_size must be in (0, window_size]")
+        for name, low, high in self.bands:
+            if not 0 <= low < high <= self.sampling_rate / 2:
+                raise ValueError(f"invalid edges for band {name!r}")
+        if self.dtype not in DTYPES:
+            raise ValueError(f"dtype must be one of {DTYPES}")
+
+    @property
+    def band_names(self) -> list[str]:
+        """Names of the bands, in output column order."""
+        return [name for name, _, _ in self.bands]
+
+    @property
+    def n_bands(self) -> int:
+        """Number of output bands."""
+        return len(self.bands)
+
+    @cached_property
+    def freqs(self) -> np.ndarray:
+        """Center frequency of each one-sided FFT bin in Hz."""
+        return _read_only(rfftfreq(self.window_size, 1 / self.sampling_rate))
+
+    @cached_property
+    def band_slices(self) -> tuple[slice, ...]:
+        """Contiguous bin range covered by each band."""
+        slices = []
+        for _, low, high in self.bands:
+            bins = np.flatnonzero((self.freqs >= low) & (self.freqs < high))
+            start = int(bins[0]) if len(bins) else 0
+            slices.append(slice(start, start + len(bins)))
+        return tuple(slices)
+
+    @cached_property
+    def bins(self) -> np.ndarray:
+        """Sorted indices of every bin used by at least one band."""
+        return _read_only(
+            np.unique(
+                np.concatenate(
+                    [np.arange(s.start, s.stop) for s in self.band_slices]
+                )
+            ).astype(int)
+        )
+
+    @cached_property
+    def twiddle(self) -> np.ndarray:
+        """A (window_size, n_used_bins) table of DFT twiddle factors for the
+        bins in self.bins, indexed by sample position in the window."""
+        phase = np.outer(np.arange(self.window_size), self.bins)
+        twiddle = np.exp(-2j * np.pi * phase / self.window_size)
+        return _read_only(twiddle.astype(np.result_type(self.dtype, 1j)))
+
+    @cached_property
+    def coefficients(self) -> np.ndarray:
+        """Window function coefficients applied before the FFT."""
+        if self.window in ("boxcar", "rectangular", "ones"):
+            return _read_only(np.ones(self.window_size, dtype=self.dtype))
+
+        from scipy.signal import get_window  # slow import; tapers only
+
+        coefficients = get_window(self.window, self.window_size)
+        return _read_only(coefficients.astype(self.dtype))
+
+    @cached_property
+    def scale(self) -> float:
+        """Per-bin power normalization for the window function.
+
+        For a rectangular window this is 1 / window_size**2, the scaling
+        transform_to_hz has always used.
+        """
+        energy = float(np.sum(self.coefficients.astype(float) ** 2))
+        return 1 / (self.window_size * energy)
+
+    @cached_property
+    def band_indicator(self) -> np.ndarray:
+        """A (n_bins, n_bands) 0/1 matrix that sums bin powers into bands."""
+        matrix = np.zeros((len(self.freqs), self.n_bands), dtype=self.dtype)
+        for i, band in enumerate(self.band_slices):
+            matrix[band, i] = 1.0
+        return _read_only(matrix)
+
+    @cached_property
+    def band_matrix(self) -> np.ndarray:
+        """A (n_bins, n_bands) matrix that sums squared FFT magnitudes into
+        bands, with the window power normalization folded in."""
+        return _read_only(self.band_indicator * self.scale)
+
+    @cached_property
+    def welch_plan(self) -> "BandPlan":
+        """Segment plan used for Welch estimates inside one analysis window:
+        half-length Hann segments with 50% overlap."""
+        return self.derive(
+            window_size=self.window_size // 2,
+            step_size=max(1, self.window_size // 4),
+            window="hann",
+        )
+
+    @cached_property
+    def is_rectangular(self) -> bool:
+        """True if the window leaves samples unweighted."""
+        return bool(np.all(self.coefficients == 1.0))
+
+    def derive(self, **changes) -> "BandPlan":
+        """Returns the shared plan for this configuration with some fields
+        replaced.
+
+        Arguments:
+            **changes: BandPlan fields to override.
+
+        Returns:
+            BandPlan: A cached plan.
+        """
+        config = {f.name: getattr(self, f.name) for f in fields(self)}
+        config.update(changes)
+        return _cached_plan(**config)
+
+
+@lru_cache(maxsize=32)
+def _cached_plan(**config) -> BandPlan:
+    return BandPlan(**config)
+
+
+def get_plan(
+    sampling_rate: float = SAMPLING_RATE,
+    window_size: int = WINDOW_SIZE,
+    step_size: int = STEP_SIZE,
+    window: str = "boxcar",
+    bands: dict | None = None,
+    channels=CHANNELS,
+    include_gamma: bool = False,
+    dtype: str = "float64",
+) -> BandPlan:
+    """Returns the shared BandPlan for a configuration, building it once.
+
+    Arguments:
+        sampling_rate (float): Sampling rate of the signal in Hz.
+        window_size (int): Number of samples per FFT window.
+        step_size (int): Number of samples between window starts.
+        window (str): Window function name accepted by scipy.signal.
+        bands (dict | None): Band name to (low, high) edges in Hz. Defaults
+            to BANDS.
+        channels (iterable of str): Signal column names, in order.
+        include_gamma (bool): Appends a gamma band with GAMMA_BAND edges.
+        dtype (str): Floating point precision, one of DTYPES.
+
+    Returns:
+        BandPlan: A cached plan; equal configurations share one instance.
+    """
+    bands = dict(BANDS if bands is None else bands)
+    if include_gamma:
+        bands.setdefault("gamma", GAMMA_BAND)
+
+    return _cached_plan(
+        sampling_rate=float(sampling_rate),
+        window_size=int(window_size),
+        step_size=int(step_size),
+        window=window,
+        bands=tuple(
+            (name, float(low), float(high))
+            for name, (low, high) in bands.items()
+        ),
+        channels=tuple(channels),
+        dtype=np.dtype(dtype).name,
+    )
+
+
+def sliding_windows(
+    signal: np.ndarray,
+    window_size: int = WINDOW_SIZE,
+    step_size: int = STEP_SIZE,
+) -> np.ndarray:
+    """Returns every full window of a signal as a read-only strided view.
+
+    Arguments:
+        signal (np.ndarray): A (n_samples, n_channels) array of samples.
+        window_size (int): Number of samples per window.
+        step_size (int): Number of samples between window starts.
+
+    Returns:
+        np.ndarray: A (n_windows, n_channels, window_size) view. No samples
+            are copied.
+    """
+    if len(signal) < window_size:
+        return np.empty((0, signal.shape[1], window_size), dtype=signal.dtype)
+
+    return sliding_window_view(signal, window_size, axis=0)[::step_size]
+
+
+def window_blocks(n_samples: int, plan: BandPlan, block_size: int):
+    """Splits a recording into sample ranges that tile its windows.
+
+    Each range holds whole windows only, and together the ranges cover every
+    window of the recording exactly once, so band power over the blocks
+    matches band power over the whole recording.
+
+    Arguments:
+        n_samples (int): Length of the recording.
+        plan (BandPlan): Band/window configuration.
+        block_size (int): Approximate number of new samples per block.
+
+    Yields:
+        tuple[int, int]: Start and stop sample of each block.
+    """
+    if n_samples < plan.window_size:
+        return
+
+    n_windows = (n_samples - plan.window_size) // plan.step_size + 1
+    per_block = max(1, block_size // plan.step_size)
+
+    for first in range(0, n_windows, per_block):
+        last = min(first + per_block, n_windows) - 1
+        yield (
+            first * plan.step_size,
+            last * plan.step_size + plan.window_size,
+        )
+
+
+@lru_cache(maxsize=8)
+def dpss_tapers(
+    window_size: int,
+    bandwidth: float = MULTITAPER_BANDWIDTH,
+    dtype: str = "float64",
+) -> np.ndarray:
+    """Returns unit-energy DPSS tapers for a window length, computed once
+    per precision.
+
+    Arguments:
+        window_size (int): Number of samples per taper.
+        bandwidth (float): Time-halfbandwidth product NW. 2 * NW - 1 tapers
+            are returned.
+        dtype (str): Precision of the returned tapers.
+
+    Returns:
+        np.ndarray: A read-only (n_tapers, window_size) array.
+    """
+    from scipy.signal.windows import dpss
+
+    n_tapers = max(1, int(2 * bandwidth) - 1)
+    tapers = np.atleast_2d(dpss(window_size, bandwidth, n_tapers))
+    tapers = tapers / np.sqrt(np.sum(tapers**2, axis=-1, keepdims=True))
+
+    return _read_only(tapers.astype(dtype, copy=False))
+
+
+def _power(x: np.ndarray) -> np.ndarray:
+    """Squared magnitude of the one-sided FFT along the last axis."""
+    spectrum = rfft(x, axis=-1)
+    return spectrum.real**2 + spectrum.imag**2
+
+
+def periodogram(x: np.ndarray, plan: BandPlan) -> np.ndarray:
+    """Windowed periodogram of signals whose last axis is one window long.
+
+    Arguments:
+        x (np.ndarray): A (..., window_size) array of samples.
+        plan (BandPlan): Band/window configuration.
+
+    Returns:
+        np.ndarray: A (..., n_bins) array of power per frequency bin.
+    """
+    if not plan.is_rectangular:
+        x = x * plan.coefficients
+
+    return _power(x) * plan.scale
+
+
+def welch(x: np.ndarray, plan: BandPlan) -> np.ndarray:
+    """Welch estimate: the mean periodogram of overlapping segments.
+
+    Segments are plan.window_size long and start every plan.step_size
+    samples along the last axis.
+
+    Arguments:
+        x (np.ndarray): A (..., n_samples) array with n_samples at least
+            plan.window_size.
+        plan (BandPlan): Segment band/window configuration.
+
+    Returns:
+        np.ndarray: A (..., n_bins) array of power per frequency bin.
+    """
+    segments = sliding_window_view(x, plan.window_size, axis=-1)
+    segments = segments[..., :: plan.step_size, :]
+
+    return periodogram(segments, plan).mean(axis=-2)
+
+
+def multitaper(
+    x: np.ndarray, plan: BandPlan, bandwidth: float = MULTITAPER_BANDWIDTH
+) -> np.ndarray:
+    """DPSS multitaper estimate of signals one window long.
+
+    The plan's window function is ignored; the tapers take its place.
+
+    Arguments:
+        x (np.ndarray): A (..., window_size) array of samples.
+        plan (BandPlan): Band/window configuration.
+        bandwidth (float): Time-halfbandwidth product NW.
+
+    Returns:
+        np.ndarray: A (..., n_bins) array of power per frequency bin.
+    """
+    tapers = dpss_tapers(plan.window_size, bandwidth, plan.dtype)
+    tapered = x[..., None, :] * tapers
+
+    return _power(tapered).mean(axis=-2) / plan.window_size
+
+
+def window_band_power(
+    windows: np.ndarray, plan: BandPlan, method: str = "periodogram"
+) -> np.ndarray:
+    """Estimates band power for signals that are one analysis window long.
+
+    Arguments:
+        windows (np.ndarray): A (..., window_size) array of samples.
+        plan (BandPlan): Band/window configuration.
+        method (str): One of PSD_METHODS. Welch splits each window into
+            plan.welch_plan segments.
+
+    Returns:
+        np.ndarray: A (..., n_bands) array of band powers, ordered as
+            plan.bands.
+    """
+    if method == "periodogram":
+        return periodogram(windows, plan) @ plan.band_indicator
+    if method == "welch":
+        segment_plan = plan.welch_plan
+        return welch(windows, segment_plan) @ segment_plan.band_indicator
+    if method == "multitaper":
+        return multitaper(windows, plan) @ plan.band_indicator
+
+    raise ValueError(f"method must be one of {PSD_METHODS}, got {method!r}")
+
+
+def recording_band_power(
+    signal: np.ndarray, plan: BandPlan, method: str = "welch"
+) -> np.ndarray:
+    """Estimates band power per channel over a whole recording.
+
+    Welch averages plan-sized segments across the recording; the periodogram
+    and multitaper estimators treat the recording as a single window.
+
+    Arguments:
+        signal (np.ndarray): A (n_channels, n_samples) array of samples.
+        plan (BandPlan): Band/window configuration.
+        method (str): One of PSD_METHODS.
+
+    Returns:
+        np.ndarray: A (n_channels, n_bands) array of band powers, ordered as
+            plan.bands.
+    """
+    signal = np.asarray(signal, dtype=plan.dtype)
+    n_samples = signal.shape[-1]
+
+    if method == "welch":
+        if n_samples < plan.window_size:
+            plan = plan.derive(window_size=n_samples, step_size=n_samples)
+        return welch(signal, plan) @ plan.band_indicator
+
+    whole = plan.derive(window_size=n_samples, step_size=n_samples)
+    return window_band_power(signal, whole, method)
+
+
+def band_power(
+    signal: np.ndarray,
+    plan: BandPlan | None = None,
+    method: str = "periodogram",
+) -> np.ndarray:
+    """Computes band power for every window of a multi-channel signal.
+
+    Band power is the sum over all channels of the estimated power in each
+    band. With the default rectangular periodogram this is the squared
+    magnitude of the FFT normalized by the window size.
+
+    Arguments:
+        signal (np.ndarray): A (n_samples, n_channels) array of samples.
+        plan (BandPlan | None): Band/window configuration. Defaults to
+            get_plan().
+        method (str): One of PSD_METHODS.
+
+    Returns:
+        np.ndarray: A (n_windows, n_bands) array of band powers, ordered as
+            plan.bands.
+    """
+    signal = np.asarray(signal)
+
+    return session_band_power(signal[None], plan, method)[0]
+
+
+def session_band_power(
+    signals: np.ndarray,
+    plan: BandPlan | None = None,
+    method: str = "periodogram",
+    memory_budget: int = MEMORY_BUDGET,
+) -> np.ndarray:
+    """Computes band power for every window of many equal-length sessions
+    with batched FFTs.
+
+    Windows are strided views, and the FFT runs over as many sessions and
+    windows at once as fit in memory_budget bytes of work space, so peak
+    memory stays bounded however many sessions are passed.
+
+    Arguments:
+        signals (np.ndarray): A (n_sessions, n_samples, n_channels) array.
+        plan (BandPlan | None): Band/window configuration. Defaults to
+            get_plan().
+        method (str): One of PSD_METHODS.
+        memory_budget (int): Approximate bytes of temporary arrays per block.
+
+    Returns:
+        np.ndarray: A (n_sessions, n_windows, n_bands) array of band powers
+            summed over channels, ordered as plan.bands, in plan.dtype.
+
+    Raises:
+        ValueError: If signals is not 3-D or method is unknown.
+    """
+    plan = get_plan() if plan is None else plan
+    signals = np.asarray(signals)
+    if signals.ndim != 3:
+        raise ValueError(
+            "signals must have shape (n_sessions, n_samples, n_channels), "
+            f"got {signals.shape}"
+        )
+    if method not in PSD_METHODS:
+        raise ValueError(
+            f"method must be one of {PSD_METHODS}, got {method!r}"
+        )
+
+    n_sessions, n_samples, n_channels = signals.shape
+    n_windows = 0
+    if n_samples >= plan.window_size:
+        n_windows = (n_samples - plan.window_size) // plan.step_size + 1
+    powers = np.empty((n_sessions, n_windows, plan.n_bands), plan.dtype)
+    if powers.size == 0:
+        return powers
+
+    # (n_sessions, n_windows, n_channels, window_size) view; nothing copied
+    windows = sliding_window_view(signals, plan.window_size, axis=1)
+    windows = windows[:, :: plan.step_size]
+
+    per_block = max(
+        1, memory_budget // _window_bytes(plan, n_channels, method)
+    )
+    if per_block >= n_windows:
+        sessions = per_block // n_windows
+        for first in range(0, n_sessions, sessions):
+            block = windows[first : first + sessions]
+            powers[first : first + sessions] = _block_power(
+                block, plan, method
+            )
+    else:
+        for session in range(n_sessions):
+            for first in range(0, n_windows, per_block):
+                block = windows[session, first : first + per_block]
+                powers[session, first : first + per_block] = _block_power(
+                    block, plan, method
+                )
+
+    return powers
+
+
+def _window_bytes(plan: BandPlan, n_channels: int, method: str) -> int:
+    """Estimates the temporary bytes needed to transform one window."""
+    n_bins = plan.window_size // 2 + 1
+    size = np.dtype(plan.dtype).itemsize
+    # real copy or windowed samples, complex spectrum, and power
+    per_spectrum = n_channels * size * (plan.window_size + 3 * n_bins)
+    spectra = {
+        "periodogram": 1,
+        "welch": 2,  # overlapping half-length segments
+        "multitaper": len(dpss_tapers(plan.window_size)),
+    }[method]
+
+    return per_spectrum * spectra
+
+
+def _block_power(windows: np.ndarray, plan: BandPlan, method: str):
+    """Band power summed over channels for a block of windows."""
+    windows = np.asarray(windows, dtype=plan.dtype)  # copies only this block
+
+    if method == "periodogram":
+        # fast path: sum channels before reducing the bins
+        return periodogram(windows, plan).sum(axis=-2) @ plan.band_indicator
+
+    return window_band_power(windows, plan, method).sum(axis=-2)
@@ -0,0 +1,339 @@
+"""streaming.py.
+
+Computes band power incrementally from a live EEG stream. Samples are written
+into a preallocated ring buffer and one band power result is emitted for every
+hop of new samples, without building per-window DataFrames or copying lists.
+"""
+
+import numpy as np
+
+import spectral
+
+
+class BandPowerStream:
+    """Long-lived band power engine backed by a mirrored NumPy ring buffer.
+
+    Every sample is written twice, at its ring position and one window length
+    later, so the most recent window is always a contiguous slice of the
+    buffer and can be transformed without copying. Each hop evaluates the DFT
+    of the band bins only, as two real matrix products into preallocated
+    scratch arrays, so push() with an out array allocates nothing.
+    """
+
+    def __init__(self, plan: spectral.BandPlan | None = None):
+        """Allocates the ring buffer for a band/window plan.
+
+        Arguments:
+            plan (spectral.BandPlan | None): Band/window configuration.
+                Defaults to spectral.get_plan().
+        """
+        self.plan = spectral.get_plan() if plan is None else plan
+        self.n_channels = len(self.plan.channels)
+        self.window_size = self.plan.window_size
+        self.step_size = self.plan.step_size
+
+        self._buffer = np.zeros(
+            (2 * self.window_size, self.n_channels), dtype=self.plan.dtype
+        )
+        self._head = 0  # ring position of the next write
+        self._until_emit = self.window_size  # samples left before result
+
+        # band-bin DFT rows with the window function folded in: (bins, W)
+        twiddle = self.plan.twiddle.T * self.plan.coefficients
+        self._cos = np.ascontiguousarray(twiddle.real)
+        self._sin = np.ascontiguousarray(twiddle.imag)
+        self._masks = np.ascontiguousarray(
+            self.plan.band_matrix[self.plan.bins]
+        )
+
+        n_bins = len(self.plan.bins)
+        dtype = self.plan.dtype
+        self._real = np.empty((n_bins, self.n_channels), dtype=dtype)
+        self._imag = np.empty((n_bins, self.n_channels), dtype=dtype)
+        self._bin_power = np.empty(n_bins, dtype=dtype)
+
+    def reset(self) -> None:
+        """Discards all buffered samples.
+
+        Arguments:
+            None.
+
+        Returns:
+            None.
+        """
+        self._buffer.fill(0.0)
+        self._head = 0
+        self._until_emit = self.window_size
+
+    def window(self) -> np.ndarray:
+        """Returns the most recent window of samples, oldest first.
+
+        Arguments:
+            None.
+
+        Returns:
+            np.ndarray: A (window_size, n_channels) view into the ring buffer.
+        """
+        return self._buffer[self._head : self._head + self.window_size]
+
+    def push(self, sample, out: np.ndarray | None = None) -> np.ndarray | None:
+        """Adds one sample and returns a result if it completes a hop.
+
+        Arguments:
+            sample (array-like): One value per channel.
+            out (np.ndarray | None): Preallocated array of n_bands values to
+                write the result into. Reusing one array keeps the live loop
+                free of per-hop allocations.
+
+        Returns:
+            np.ndarray | None: Band powers ordered as plan.bands (out, if
+                given), or None if no window was completed.
+        """
+        if len(sample) != self.n_channels:
+            raise ValueError(
+                f"sample must have {self.n_channels} values, got {len(sample)}"
+            )
+
+        head = self._head
+        self._buffer[head] = sample
+        self._buffer[head + self.window_size] = self._buffer[head]
+        self._head = (head + 1) % self.window_size
+
+        self._until_emit -= 1
+        if self._until_emit:
+            return None
+        self._until_emit = self.step_size
+
+        if out is None:
+            out = np.empty(self.plan.n_bands, dtype=self.plan.dtype)
+
+        return self._compute(out)
+
+    def push_chunk(self, samples, out: np.ndarray | None = None) -> np.ndarray:
+        """Adds a block of samples and returns every result it completes.
+
+        Arguments:
+            samples (array-like): A (n_samples, n_channels) block of samples.
+                Arrays of another float dtype are converted as they are
+                written into the ring, without a copy.
+            out (np.ndarray | None): Preallocated (rows, n_bands) array to
+                write the results into, with at least max_results(n_samples)
+                rows.
+
+        Returns:
+            np.ndarray: A (n_results, n_bands) array of band powers ordered as
+                plan.bands (the first rows of out, if given). Empty if no
+                window was completed.
+
+        Raises:
+            ValueError: If samples has the wrong shape or out is too small.
+        """
+        if not isinstance(samples, np.ndarray):
+            samples = np.asarray(samples, dtype=self.plan.dtype)
+        if samples.ndim != 2 or samples.shape[1] != self.n_channels:
+            raise ValueError(
+                f"samples must have shape (n, {self.n_channels}), "
+                f"got {samples.shape}"
+            )
+
+        n_results = 0
+        if len(samples) >= self._until_emit:
+            n_results = 1 + (len(samples) - self._until_emit) // self.step_size
+        if out is None:
+            out = np.empty((n_results, self.plan.n_bands), self.plan.dtype)
+        elif len(out) < n_results:
+            raise ValueError(
+                f"out has room for {len(out)} of {n_results} rows"
+            )
+        results = out[:n_results]
+
+        done = 0
+        pos = 0
+        while pos < len(samples):
+            take = min(len(samples) - pos, self._until_emit)
+            self._write(samples[pos : pos + take])
+            pos += take
+            self._until_emit -= take
+
+            if self._until_emit == 0:
+                self._compute(results[done])
+                done += 1
+                self._until_emit = self.step_size
+
+        return results
+
+    def max_results(self, n_samples: int) -> int:
+        """Returns the most results one push_chunk of n_samples can emit.
+
+        Arguments:
+            n_samples (int): Samples per push_chunk call.
+
+        Returns:
+            int: Rows needed in a preallocated push_chunk out array.
+        """
+        if n_samples <= 0:
+            return 0
+        return 1 + (n_samples - 1) // self.step_size
+
+    def _write(self, samples: np.ndarray) -> None:
+        """Writes at most one window of samples into both ring halves."""
+        first = min(len(samples), self.window_size - self._head)
+        rest = len(samples) - first
+        head = self._head
+        mirror = head + self.window_size
+
+        self._buffer[head : head + first] = samples[:first]
+        self._buffer[mirror : mirror + first] = samples[:first]
+        if rest:
+            self._buffer[:rest] = samples[first:]
+            self._buffer[self.window_size : self.window_size + rest] = samples[
+                first:
+            ]
+
+        self._head = (head + len(samples)) % self.window_size
+
+    def _compute(self, out: np.ndarray) -> np.ndarray:
+        """Writes band power for the current window into out."""
+        window = self.window()
+        real, imag = self._real, self._imag
+
+        np.matmul(self._cos, window, out=real)
+        np.matmul(self._sin, window, out=imag)
+        np.square(real, out=real)
+        np.square(imag, out=imag)
+        np.add(real, imag, out=real)
+        np.sum(real, axis=1, out=self._bin_power)
+
+        return np.matmul(self._bin_power, self._masks, out=out)
+
+
+class SlidingBandPower:
+    """Incremental band power using a sliding DFT over only the band bins.
+
+    Each new sample updates the running DFT of the needed bins in O(bins)
+    work, so results can be emitted every few samples instead of once per
+    hop. The running sums use absolute sample phase, which leaves the bin
+    magnitudes unchanged, and are recomputed from the ring buffer once per
+    window length so rounding error cannot accumulate.
+    """
+
+    def __init__(
+        self,
+        plan: spectral.BandPlan | None = None,
+        update_every: int = 16,
+    ):
+        """Takes the band bins and twiddle table from a band/window plan.
+
+        Arguments:
+            plan (spectral.BandPlan | None): Band/window configuration with a
+                rectangular window. Defaults to spectral.get_plan().
+            update_every (int): Number of new samples between results.
+        """
+        self.plan = spectral.get_plan() if plan is None else plan
+        if not self.plan.is_rectangular:
+            raise ValueError("sliding DFT requires a rectangular window")
+        if update_every <= 0:
+            raise ValueError("update_every must be positive")
+
+        self.n_channels = len(self.plan.channels)
+        self.window_size = self.plan.window_size
+        self.update_every = update_every
+
+        # always float64: the running sums accumulate every rounding error
+        self._masks = self.plan.band_matrix[self.plan.bins].astype(float)
+        self._twiddle = self.plan.twiddle.astype(complex)  # (window, bins)
+
+        self._ring = np.zeros((self.window_size, self.n_channels))
+        self._sums = np.zeros(
+            (self.n_channels, len(self.plan.bins)), dtype=complex
+        )
+        self._count = 0  # total samples seen
+
+    def reset(self) -> None:
+        """Discards all buffered samples.
+
+        Arguments:
+            None.
+
+        Returns:
+            None.
+        """
+        self._ring.fill(0.0)
+        self._sums.fill(0.0)
+        self._count = 0
+
+    def push(self, sample) -> np.ndarray | None:
+        """Adds one sample and returns a result if an update is due.
+
+        Arguments:
+            sample (array-like): One value per channel.
+
+        Returns:
+            np.ndarray | None: Band powers ordered as plan.bands, or None if
+                no update was due.
+        """
+        result = self.push_chunk(np.asarray(sample, dtype=float)[None, :])
+
+        return result[0] if len(result) else None
+
+    def push_chunk(self, samples) -> np.ndarray:
+        """Adds a block of samples and returns every update it completes.
+
+        A result is emitted once the first full window has arrived and then
+        after every update_every samples.
+
+        Arguments:
+            samples (array-like): A (n_samples, n_channels) block of samples.
+
+        Returns:
+            np.ndarray: A (n_results, n_bands) array of band powers ordered as
+                plan.bands. Empty if no update was due.
+        """
+        samples = np.asarray(samples, dtype=float)
+        if samples.ndim != 2 or samples.shape[1] != self.n_channels:
+            raise ValueError(
+                f"samples must have shape (n, {self.n_channels}), "
+                f"got {samples.shape}"
+            )
+
+        results = []
+        pos = 0
+
+        # split at ring wraps so each block maps to one contiguous ring slice
+        while pos < len(samples):
+            start = self._count % self.window_size
+            take = min(len(samples) - pos, self.window_size - start)
+            results.append(self._update(samples[pos : pos + take], start))
+            pos += take
+
+        if not results:
+            return np.empty((0, self._masks.shape[1]))
+
+        return np.concatenate(results)
+
+    def _update(self, block: np.ndarray, start: int) -> np.ndarray:
+        """Slides the DFT across a block that does not cross a ring wrap."""
+        stop = start + len(block)
+        twiddle = self._twiddle[start:stop]
+        delta = block - self._ring[start:stop]
+
+        # running sums after each sample of the block
+        steps = delta[:, :, None] * twiddle[:, None, :]
+        sums = self._sums + np.cumsum(steps, axis=0)
+
+        counts = self._count + np.arange(1, len(block) + 1)
+        due = (counts >= self.window_size) & (
+            (counts - self.window_size) % self.update_every == 0
+        )
+        emitted = sums[due]
+        power = (emitted.real**2 + emitted.imag**2).sum(axis=1)
+
+        self._ring[start:stop] = block
+        self._count += len(block)
+        if stop == self.window_size:
+            # exact resync from the ring once per window length
+            self._sums = self._ring.T @ self._twiddle
+        else:
+            self._sums = sums[-1]
+
+        return power @ self._masks
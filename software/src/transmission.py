@@ -1,18 +1,115 @@
 """transmission.py.
 
-Calculates the checksum for input data using the CRC8 algorithm. Converts from
-pandas DataFrame to UART packet and vice versa.
+Converts band power rows to UART packets and back. Packet layouts are
+versioned by PROTOCOLS, and all share the sync bytes and big-endian payload:
+
+    0: [AA 55 08][payload][XOR of the payload], the original software rule.
+    1: [AA 55 09 01][payload][CRC-8 of LEN, version, and payload].
+    2: [AA 55 08][payload][XOR of LEN and payload], the rule
+       EEG_Packet_Parser.sv checks, and the default.
+
+The FPGA rejects versions 0 and 1: version 0 fails its checksum, which
+starts from the LEN byte, and version 1 fails its LEN check. Checksums come
+from checksums.py.
+
+PacketEncoder packs band power arrays into one reused packet buffer for the
+real-time loop, and encode_packets packs a whole (n, bands) array into one
+contiguous buffer; pandas is only needed at the DataFrame edges.
+
+PacketDecoder is the receiving side: like EEG_Packet_Parser.sv it hunts for
+SYNC1, SYNC2, and LEN before checking a payload, but it searches whole
+blocks at once and rescans after a bad packet, so a lost, extra, or
+corrupted byte costs at most the packet it landed in. decode_capture does
+the same for a whole captured byte stream at once, viewing aligned runs of
+packets in place through a structured dtype.
 """
 
+from __future__ import annotations
+
+import os
 import struct
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
 
-import pandas as pd
-import serial
+import checksums
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import serial
 
 # global variables
 SYNC_BYTE_1 = 0xAA
 SYNC_BYTE_2 = 0x55
 PAYLOAD_LENGTH = 8  # 4 bands * 2 bytes each
+HEADER_SIZE = 3  # SYNC1, SYNC2, LEN of an unversioned packet
+PACKET_SIZE = HEADER_SIZE + PAYLOAD_LENGTH + 1  # header, payload, checksum
+BAND_ORDER = ("alpha", "beta", "theta", "delta")  # payload order
+READ_BLOCK = 65536  # most bytes read_frames takes from the port at a time
+PROTOCOL_VERSION = 2  # default packet layout, the one the FPGA accepts
+
+
+@dataclass(frozen=True)
+class Protocol:
+    """Wire layout of one packet protocol version."""
+
+    version: int
+    header: bytes  # sync bytes and LEN, then any version byte
+    checksum: str  # name in checksums.CHECKSUMS
+    checksum_start: int  # index of the first byte the checksum covers
+
+    @property
+    def size(self) -> int:
+        """Bytes in one packet."""
+        return len(self.header) + PAYLOAD_LENGTH + 1
+
+    @property
+    def frame_dtype(self) -> np.dtype:
+        """Structured dtype of one packet as laid out on the wire."""
+        fields = [("sync1", "u1"), ("sync2", "u1"), ("length", "u1")]
+        if len(self.header) > 3:
+            fields.append(("version", "u1"))
+        fields += [(band, ">u2") for band in BAND_ORDER]
+        fields.append(("checksum", "u1"))
+        return np.dtype(fields)
+
+    def get_checksum(self) -> checksums.Checksum:
+        """Returns the checksum this version uses."""
+        return checksums.get_checksum(self.checksum)
+
+
+PROTOCOLS = {
+    0: Protocol(
+        0, bytes([SYNC_BYTE_1, SYNC_BYTE_2, PAYLOAD_LENGTH]), "xor", 3
+    ),
+    1: Protocol(
+        1, bytes([SYNC_BYTE_1, SYNC_BYTE_2, PAYLOAD_LENGTH + 1, 1]), "crc8", 2
+    ),
+    2: Protocol(
+        2, bytes([SYNC_BYTE_1, SYNC_BYTE_2, PAYLOAD_LENGTH]), "xor", 2
+    ),
+}
+FRAME_DTYPE = PROTOCOLS[0].frame_dtype
+
+
+def get_protocol(version: int) -> Protocol:
+    """Returns the packet layout of a protocol version.
+
+    Arguments:
+        version (int): A key of PROTOCOLS.
+
+    Returns:
+        Protocol: The layout.
+
+    Raises:
+        ValueError: If the version is unknown.
+    """
+    if version not in PROTOCOLS:
+        raise ValueError(f"version must be one of {tuple(PROTOCOLS)}")
+
+    return PROTOCOLS[version]
 
 
 def xor_checksum(data: bytes) -> int:
@@ -24,43 +121,519 @@ def xor_checksum(data: bytes) -> int:
     return result
 
 
-def validate_packet(packet: bytes) -> bool:
+def validate_packet(packet: bytes, version: int | None = None) -> bool:
     """Returns True if the packet checksum is valid.
 
+    Without a version, packets that start with a versioned header are
+    checked with that version's checksum, and any other packet is valid if
+    an unversioned layout's checksum matches (versions 0 and 2 share a
+    header and differ only in whether LEN is checksummed).
+
     Arguments:
-        packet (bytes): Raw bytes where the last byte is the CRC-8 checksum.
+        packet (bytes): Raw bytes where the last byte is the checksum.
+        version (int | None): Protocol version to check against.
 
     Returns:
         True if checksum is valid, False otherwise.
+
+    Raises:
+        ValueError: If the version is unknown.
     """
-    payload = packet[3:-1]
+    if version is not None:
+        candidates = [get_protocol(version)]
+    else:
+        candidates = [
+            protocol
+            for protocol in PROTOCOLS.values()
+            if len(protocol.header) > HEADER_SIZE
+            and packet[: len(protocol.header)] == protocol.header
+        ]
+        if candidates and len(packet) != candidates[0].size:
+            return False
+        if not candidates:
+            candidates = [
+                protocol
+                for protocol in PROTOCOLS.values()
+                if len(protocol.header) == HEADER_SIZE
+            ]
+
     received_checksum = packet[-1]
-    expected_checksum = xor_checksum(payload)
+    for protocol in candidates:
+        covered = packet[protocol.checksum_start : -1]
+        if protocol.get_checksum().compute(covered) == received_checksum:
+            return True
+
+    return False
+
+
+def validate_packets(packets, version: int = PROTOCOL_VERSION) -> np.ndarray:
+    """Checks the header and checksum of many packets at once.
+
+    Arguments:
+        packets (bytes-like | np.ndarray): Back-to-back packets, or an
+            (n_packets, size) uint8 array.
+        version (int): Protocol version of every packet.
+
+    Returns:
+        np.ndarray: (n_packets,) bool, True where a packet is valid.
+
+    Raises:
+        ValueError: If the data is not a whole number of packets.
+    """
+    protocol = get_protocol(version)
+    if isinstance(packets, np.ndarray):
+        rows = packets.astype(np.uint8, copy=False)
+    else:
+        rows = np.frombuffer(packets, dtype=np.uint8)
+    if rows.size % protocol.size:
+        raise ValueError(
+            f"packets must be a multiple of {protocol.size} bytes"
+        )
+    rows = rows.reshape(-1, protocol.size)
+
+    valid = _headers_ok(rows, protocol.header)
+    covered = rows[:, protocol.checksum_start : -1]
+    valid &= protocol.get_checksum().compute_batch(covered) == rows[:, -1]
+
+    return valid
 
-    return received_checksum == expected_checksum
 
+def _headers_ok(rows: np.ndarray, header: bytes) -> np.ndarray:
+    """Returns which rows of a packet byte array start with header."""
+    valid = rows[:, 0] == header[0]
+    for column in range(1, len(header)):
+        valid &= rows[:, column] == header[column]
 
-def df_to_packet(row: dict) -> bytes:
+    return valid
+
+
+def _find_headers(raw: np.ndarray, header: bytes) -> np.ndarray:
+    """Returns every index of raw where header begins."""
+    n = len(raw) - len(header) + 1
+    if n <= 0:
+        return np.empty(0, dtype=np.intp)
+    match = raw[:n] == header[0]
+    for i in range(1, len(header)):
+        match &= raw[i : n + i] == header[i]
+
+    return np.flatnonzero(match)
+
+
+def detect_version(data) -> int | None:
+    """Returns the protocol version of the first valid packet in data.
+
+    Receivers that do not know the sender's version use this to agree with
+    it: the first packet that checksums correctly decides, by its version
+    byte or, for the unversioned layouts 0 and 2, by which checksum rule
+    matched.
+
+    Arguments:
+        data (bytes-like): Received bytes.
+
+    Returns:
+        int | None: The version, or None if data holds no valid packet.
+    """
+    raw = np.frombuffer(data, dtype=np.uint8)
+    first, version = len(raw), None
+    for protocol in PROTOCOLS.values():
+        starts = _find_headers(raw, protocol.header)
+        starts = starts[starts <= len(raw) - protocol.size]
+        if not len(starts):
+            continue
+        rows = raw[starts[:, None] + np.arange(protocol.size)]
+        covered = rows[:, protocol.checksum_start : -1]
+        valid = protocol.get_checksum().compute_batch(covered) == rows[:, -1]
+        hits = starts[valid]
+        if len(hits) and hits[0] < first:
+            first, version = int(hits[0]), protocol.version
+
+    return version
+
+
+def df_to_packet(row: dict, version: int = PROTOCOL_VERSION) -> bytes:
     """Packs a row of EEG band power values to a UART packet.
 
     Arguments:
         row (dict): A dictionary of EEG band power values.
+        version (int): Protocol version of the packet.
 
     Returns:
         bytes: A set of bytes in the form of a UART packet.
-            [header][delta(u16)][theta(u16)][alpha(u16)][beta(u16)][crc8]
+            [header][alpha(u16)][beta(u16)][theta(u16)][delta(u16)][checksum]
     """
-    BAND_ORDER = ["alpha", "beta", "theta", "delta"]
-
     # define header, payload, and checksum
-    header = bytes([SYNC_BYTE_1, SYNC_BYTE_2, PAYLOAD_LENGTH])
+    protocol = get_protocol(version)
+    header = protocol.header
     values = [max(0, min(65535, int(row[band]))) for band in BAND_ORDER]
     payload = struct.pack(">HHHH", *values)
-    checksum = xor_checksum(payload)
+    covered = (header + payload)[protocol.checksum_start :]
+    checksum = protocol.get_checksum().compute(covered)
 
     return header + payload + bytes([checksum])
 
 
+class PacketEncoder:
+    """Packs band power arrays into a single reused UART packet buffer.
+
+    encode() clamps, reorders, and checksums in place with NumPy, so the
+    real-time loop builds no bytes, lists, or dicts per packet.
+    """
+
+    def __init__(self, band_names=BAND_ORDER, version=PROTOCOL_VERSION):
+        """Allocates the packet buffer for arrays ordered as band_names.
+
+        Arguments:
+            band_names (sequence of str): Band of each position in the arrays
+                passed to encode(), e.g. a spectral.BandPlan's band_names.
+            version (int): Protocol version of the packets.
+
+        Raises:
+            ValueError: If a band in BAND_ORDER is missing from band_names,
+                or the version is unknown.
+        """
+        band_names = list(band_names)
+        missing = [band for band in BAND_ORDER if band not in band_names]
+        if missing:
+            raise ValueError(f"band_names is missing {missing}")
+        protocol = get_protocol(version)
+
+        self.packet = bytearray(protocol.size)
+        self.packet[: len(protocol.header)] = protocol.header
+
+        raw = np.frombuffer(self.packet, dtype=np.uint8)
+        self._order = np.array([band_names.index(b) for b in BAND_ORDER])
+        self._values = np.empty(len(BAND_ORDER))
+        self._payload = raw[len(protocol.header) : -1].view(">u2")
+        self._covered = memoryview(self.packet)[protocol.checksum_start : -1]
+        self._checksum = protocol.get_checksum()
+
+    def encode(self, powers) -> bytearray:
+        """Packs one row of band powers into the packet buffer.
+
+        Values are truncated and clamped to uint16 as in df_to_packet. The
+        buffer is overwritten by the next call; copy it with bytes() to keep
+        a packet.
+
+        Arguments:
+            powers (np.ndarray): Band powers ordered as band_names.
+
+        Returns:
+            bytearray: The reused packet buffer.
+        """
+        np.take(powers, self._order, out=self._values)
+        np.clip(self._values, 0, 65535, out=self._values)
+        np.trunc(self._values, out=self._values)
+        self._payload[...] = self._values
+        self.packet[-1] = self._checksum.compute(self._covered)
+
+        return self.packet
+
+
+def encode_packets(
+    powers, band_names=BAND_ORDER, version: int = PROTOCOL_VERSION
+) -> np.ndarray:
+    """Packs every row of a band power array into consecutive UART packets.
+
+    Values are truncated and clamped to uint16 as in df_to_packet, and the
+    packets are laid out back to back so the whole block can be sent with a
+    single write.
+
+    Arguments:
+        powers (array-like): A (n_rows, n_bands) array of band powers with
+            columns ordered as band_names.
+        band_names (sequence of str): Band of each column in powers.
+        version (int): Protocol version of the packets.
+
+    Returns:
+        np.ndarray: A C-contiguous (n_rows, packet size) uint8 array.
+
+    Raises:
+        ValueError: If powers is not 2-D, a band in BAND_ORDER is missing
+            from band_names, or the version is unknown.
+    """
+    protocol = get_protocol(version)
+    band_names = list(band_names)
+    missing = [band for band in BAND_ORDER if band not in band_names]
+    if missing:
+        raise ValueError(f"band_names is missing {missing}")
+    powers = np.asarray(powers, dtype=float)
+    if powers.ndim != 2 or powers.shape[1] != len(band_names):
+        raise ValueError(
+            f"powers must have shape (n, {len(band_names)}), "
+            f"got {powers.shape}"
+        )
+
+    values = powers[:, [band_names.index(band) for band in BAND_ORDER]]
+    np.clip(values, 0, 65535, out=values)
+    words = values.astype(np.uint16)  # truncates like int()
+
+    start = len(protocol.header)
+    packets = np.empty((len(powers), protocol.size), dtype=np.uint8)
+    packets[:, :start] = tuple(protocol.header)
+    packets[:, start:-1].view(">u2")[...] = words
+    covered = packets[:, protocol.checksum_start : -1]
+    packets[:, -1] = protocol.get_checksum().compute_batch(covered)
+
+    return packets
+
+
+class PacketDecoder:
+    """Incremental packet decoder that resynchronizes on the sync header.
+
+    Bytes are fed in blocks of any size. Every header in the buffer is
+    located with one vectorized comparison and the complete candidates are
+    checksummed together; bytes that belong to no valid packet are skipped.
+    Only an unfinished packet is kept between calls, so memory use does not
+    grow with the stream.
+
+    Counters:
+        packets: Valid packets decoded.
+        checksum_errors: Complete headers whose checksum did not match.
+        skipped: Bytes discarded outside valid packets.
+        bytes: Bytes fed in total.
+    """
+
+    def __init__(self, version: int | None = PROTOCOL_VERSION):
+        """Creates a decoder with an empty buffer.
+
+        Arguments:
+            version (int | None): Protocol version to decode. None adopts the
+                version of the first valid packet (see detect_version).
+
+        Raises:
+            ValueError: If the version is unknown.
+        """
+        self.protocol = None if version is None else get_protocol(version)
+        self.packets = 0
+        self.checksum_errors = 0
+        self.skipped = 0
+        self.bytes = 0
+        self._buffer = bytearray()
+
+    @property
+    def needed(self) -> int:
+        """Bytes still missing from a packet whose header has arrived."""
+        protocol = self.protocol
+        if protocol is None:
+            return 0
+        if self._buffer[: len(protocol.header)] == protocol.header:
+            return protocol.size - len(self._buffer)
+        return 0
+
+    def feed(self, data) -> list[tuple[int, int, int, int]]:
+        """Decodes the packets completed by a block of received bytes.
+
+        Arguments:
+            data (bytes-like): Bytes in the order they arrived.
+
+        Returns:
+            list[tuple[int, int, int, int]]: (alpha, beta, theta, delta) of
+                each valid packet, in arrival order.
+        """
+        buffer = self._buffer
+        buffer += data
+        self.bytes += len(data)
+
+        if self.protocol is None:
+            version = detect_version(buffer)
+            if version is None:  # keep what may be the start of a packet
+                longest = max(protocol.size for protocol in PROTOCOLS.values())
+                drop = max(0, len(buffer) - longest + 1)
+                self.skipped += drop
+                del buffer[:drop]
+                return []
+            self.protocol = PROTOCOLS[version]
+
+        protocol = self.protocol
+        size = protocol.size
+        payload_start = len(protocol.header)
+        raw = np.frombuffer(buffer, dtype=np.uint8)
+        n = len(raw)
+        starts = _find_headers(raw, protocol.header)
+        complete = starts[starts <= n - size]
+        frames = raw[complete[:, None] + np.arange(size)]
+        covered = frames[:, protocol.checksum_start : -1]
+        valid = protocol.get_checksum().compute_batch(covered) == frames[:, -1]
+
+        decoded = []
+        pos = 0  # first byte not yet decoded or skipped
+        for start, ok in zip(complete.tolist(), valid.tolist()):
+            if start < pos:  # a sync pattern inside a valid payload
+                continue
+            if ok:
+                decoded.append(
+                    struct.unpack_from(">HHHH", buffer, start + payload_start)
+                )
+                self.skipped += start - pos
+                pos = start + size
+            else:
+                self.checksum_errors += 1
+
+        # keep an unfinished packet, or a tail that may begin a header
+        pending = starts[starts > n - size]
+        tail = n - len(protocol.header) + 1
+        keep = max(pos, int(pending[0]) if len(pending) else tail)
+        self.skipped += keep - pos
+        self.packets += len(decoded)
+
+        del raw, frames, covered  # release the buffer export before resizing
+        del buffer[:keep]
+
+        return decoded
+
+
+def read_frames(
+    ser: serial.Serial,
+    block_size: int = READ_BLOCK,
+    version: int | None = PROTOCOL_VERSION,
+) -> Iterator[tuple[int, int, int, int]]:
+    """Yields decoded packets from a serial port until a read times out.
+
+    Each read takes whatever the port has buffered (up to block_size), so a
+    busy port is drained in large blocks rather than packet by packet.
+
+    Arguments:
+        ser (serial.Serial): Open UART serial connection with a timeout.
+        block_size (int): Most bytes taken per read.
+        version (int | None): Protocol version, or None to adopt the
+            sender's.
+
+    Yields:
+        tuple[int, int, int, int]: (alpha, beta, theta, delta) of each valid
+            packet.
+    """
+    decoder = PacketDecoder(version)
+    while True:
+        data = ser.read(min(max(ser.in_waiting, 1), block_size))
+        if not data:
+            return
+        yield from decoder.feed(data)
+
+
+@dataclass(frozen=True)
+class Capture:
+    """Packets decoded from a captured UART byte stream."""
+
+    frames: np.ndarray  # frame_dtype; a view of the capture if fully aligned
+    bad: np.ndarray  # indices of frames whose checksum did not match
+    skipped: int  # bytes outside any frame
+    version: int = PROTOCOL_VERSION
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def values(self) -> np.ndarray:
+        """Returns the valid frames as a (n_valid, 4) uint16 array ordered as
+        BAND_ORDER."""
+        frames = self.frames
+        if len(self.bad):
+            frames = np.delete(frames, self.bad)
+        values = np.empty((len(frames), len(BAND_ORDER)), dtype=np.uint16)
+        for i, band in enumerate(BAND_ORDER):
+            values[:, i] = frames[band]
+
+        return values
+
+    def to_frame(self) -> pd.DataFrame:
+        """Returns the valid frames as a DataFrame like receive() does."""
+        import pandas as pd
+
+        return pd.DataFrame(self.values(), columns=list(BAND_ORDER))
+
+
+def _aligned_run(rows: np.ndarray, header: bytes) -> int:
+    """Counts the leading packet rows whose header is intact, checking
+    blocks of doubling size so a short run costs little."""
+    done, size = 0, 64
+    while done < len(rows):
+        block = rows[done : done + size]
+        ok = _headers_ok(block, header)
+        if not ok.all():
+            return done + int(np.argmin(ok))
+        done += len(block)
+        size *= 2
+
+    return done
+
+
+def decode_capture(source, version: int | None = PROTOCOL_VERSION) -> Capture:
+    """Decodes every packet in a captured UART byte stream.
+
+    Frames are read in place with the protocol's frame_dtype, one aligned
+    run at a time: a run starts at a sync header and continues while each
+    following frame still starts with one. When a run breaks, or reaches the
+    end of the capture with a header out of step with its trailing frames,
+    those trailing frames with bad checksums are treated as misaligned and
+    the search resumes at the next header after the last good frame, so a
+    lost or extra byte costs at most the packet it landed in.
+
+    Arguments:
+        source (bytes-like | mmap.mmap | str | os.PathLike): Captured bytes,
+            or a capture file to memory-map.
+        version (int | None): Protocol version of the capture, or None to
+            detect it from the first valid packet.
+
+    Returns:
+        Capture: The frames, the indices of bad-checksum frames, and the
+            number of bytes skipped.
+
+    Raises:
+        ValueError: If the version is unknown.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        if os.path.getsize(source) == 0:  # empty files cannot be mapped
+            source = b""
+        else:
+            source = np.memmap(source, dtype=np.uint8, mode="r")
+    raw = np.frombuffer(source, dtype=np.uint8)
+    n = len(raw)
+    if version is None:
+        version = detect_version(raw)
+        version = PROTOCOL_VERSION if version is None else version
+    protocol = get_protocol(version)
+    size = protocol.size
+    checksum = protocol.get_checksum()
+
+    starts = _find_headers(raw, protocol.header)
+    runs, checks = [], []
+    i = 0
+    while i < len(starts):
+        start = int(starts[i])
+        count = (n - start) // size
+        rows = raw[start : start + count * size].reshape(count, size)
+        length = _aligned_run(rows, protocol.header)
+        covered = rows[:length, protocol.checksum_start : -1]
+        ok = checksum.compute_batch(covered) == rows[:length, -1]
+        good = np.flatnonzero(ok)
+        last = int(good[-1]) + 1 if len(good) else 0
+        if length < count:  # a broken header ended the run
+            length = last
+        elif last < length:  # the capture ended the run on bad frames
+            # a header between them means they are misaligned
+            later = starts[np.searchsorted(starts, start + last * size) :]
+            if np.any((later - start) % size):
+                length = last
+
+        if length:
+            runs.append(rows[:length].view(protocol.frame_dtype)[:, 0])
+            checks.append(ok[:length])
+            resume = start + length * size
+        else:
+            resume = start + 1
+        i = int(np.searchsorted(starts, resume))
+
+    if len(runs) == 1:
+        frames, ok = runs[0], checks[0]
+    elif runs:
+        frames, ok = np.concatenate(runs), np.concatenate(checks)
+    else:
+        frames = np.empty(0, protocol.frame_dtype)
+        ok = np.empty(0, dtype=bool)
+
+    skipped = n - len(frames) * size
+    return Capture(frames, np.flatnonzero(~ok), skipped, version)
+
+
 def packet_to_df(ser: serial.Serial) -> dict | None:
     """Unpacks a UART packet into EEG band power values.
 
@@ -81,40 +654,68 @@ def packet_to_df(ser: serial.Serial) -> dict | None:
     return {"delta": delta, "theta": theta, "alpha": alpha, "beta": beta}
 
 
-def transmit(df: pd.DataFrame, ser: serial.Serial) -> None:
+def transmit(
+    df: pd.DataFrame, ser: serial.Serial, version: int = PROTOCOL_VERSION
+) -> None:
     """Converts all EEG band power data to UART packets then transmits them to
-    the UART.
+    the UART in a single write.
 
     Arguments:
         df (DataFrame): EEG power band data for the delta, theta, alpha, and
             beta bands.
         ser (Serial): Open UART serial connection to transmit on.
+        version (int): Protocol version of the packets.
 
     Returns:
         None.
     """
-    for _, row in df.iterrows():
-        packet = df_to_packet(row)
-        print(f"packet: {packet}")
-        ser.write(packet)
+    if len(df) == 0:
+        return
 
+    powers = df[list(BAND_ORDER)].to_numpy(dtype=float)
+    packets = encode_packets(powers, version=version)
+    ser.write(memoryview(packets.reshape(-1)))
 
-def receive(ser: serial.Serial, expected_rows: int) -> pd.DataFrame:
+
+def receive(
+    ser: serial.Serial,
+    expected_rows: int,
+    version: int | None = PROTOCOL_VERSION,
+) -> pd.DataFrame:
     """Receives all UART packets and converts them back to a pandas DataFrame.
 
+    Reads the bytes of expected_rows packets, and past that only what is
+    needed to finish a packet already started, so one lost or extra byte
+    costs at most one row. Stops early if a read times out.
+
     Arguments:
         ser (Serial): Open UART serial connection to transmit on.
         expected_rows (int): Number of expected rows.
+        version (int | None): Protocol version of the packets, or None to
+            adopt the sender's. Until the first valid packet decides it,
+            reads take one packet of the largest size at a time.
 
     Returns:
         DataFrame: EEG power band data for the delta, theta, alpha, and beta
             bands.
     """
-    rows = []
-    for _ in range(expected_rows):
-        row = packet_to_df(ser)
-
-        if row:
-            rows.append(row)
+    import pandas as pd
 
-    return pd.DataFrame(rows, columns=["alpha", "beta", "theta", "delta"])
+    decoder = PacketDecoder(version)
+    largest = max(protocol.size for protocol in PROTOCOLS.values())
+    rows = []
+    while len(rows) < expected_rows:
+        if decoder.protocol is None:
+            size = largest
+        else:
+            size = expected_rows * decoder.protocol.size - decoder.bytes
+        if size <= 0:
+            size = decoder.needed
+        if size <= 0:
+            break
+        data = ser.read(size)
+        if not data:
+            break
+        rows.extend(decoder.feed(data))
+
+    return pd.DataFrame(rows[:expected_rows], columns=list(BAND_ORDER))
@@ -37,7 +37,7 @@ class TestCSVModeE2E:
 
         with (
             mock.patch("data_processing.FOLDER_NAME", str(tmp_path)),
-            mock.patch("data_processing.graphing.run"),
+            mock.patch.dict("os.environ", {"NEUROSYNC_HEADLESS": "1"}),
             mock.patch("builtins.input", side_effect=["csv", filename]),
         ):
             main.main()
@@ -75,7 +75,7 @@ class TestCSVModeE2E:
 
         with (
             mock.patch("data_processing.FOLDER_NAME", str(tmp_path)),
-            mock.patch("data_processing.graphing.run"),
+            mock.patch.dict("os.environ", {"NEUROSYNC_HEADLESS": "1"}),
             mock.patch("builtins.input", side_effect=["csv", filename]),
         ):
             main.main()
@@ -88,7 +88,7 @@ class TestCSVModeE2E:
         csv_path = _write_temp_csv(512, str(tmp_path))
         df = pd.read_csv(csv_path)
 
-        with mock.patch("data_processing.graphing.run"):
+        with mock.patch.dict("os.environ", {"NEUROSYNC_HEADLESS": "1"}):
             result = data_processing.process_pipeline(df)
 
         assert len(result["frequency_data"]) > 1
@@ -4,6 +4,7 @@ End-to-end tests for the LSL streaming → buffer → FFT → UART packet pipeli
 No real LSL or serial hardware required.
 """
 
+import ctypes
 import unittest.mock as mock
 
 import numpy as np
@@ -13,23 +14,26 @@ import transmission
 
 
 class _FakeLSLInlet:
+    channel_count = 4
+    value_type = ctypes.c_float
+
     def __init__(self, samples):
-        self._iter = iter(samples)
+        self._samples = np.asarray(samples, dtype=np.float32)
+        self._pos = 0
 
-    def pull_sample(self):
-        try:
-            return next(self._iter), None
-        except StopIteration:
+    def pull_chunk(self, timeout=0.0, max_samples=1024, dest_obj=None):
+        if self._pos >= len(self._samples):
             raise KeyboardInterrupt
+        chunk = self._samples[self._pos : self._pos + max_samples]
+        dest_obj[: len(chunk)] = chunk
+        timestamps = (self._pos + np.arange(len(chunk))) / 256
+        self._pos += len(chunk)
+        return None, timestamps.tolist()
 
 
 def _fake_eeg_samples(n, seed=0):
     rng = np.random.default_rng(seed)
-    samples = []
-    for i in range(n):
-        channels = rng.uniform(-100, 100, size=4).tolist()
-        samples.append([float(i)] + channels)
-    return samples
+    return rng.uniform(-100, 100, size=(n, 4)).tolist()
 
 
 def _run_lsl_mode(samples):
@@ -38,11 +42,10 @@ def _run_lsl_mode(samples):
     ser.write.side_effect = lambda p: written.append(p)
 
     with (
-        mock.patch("main.resolve_byprop", return_value=[mock.MagicMock()]),
+        mock.patch("pylsl.resolve_byprop", return_value=[mock.MagicMock()]),
         mock.patch(
-            "main.StreamInlet", side_effect=lambda _: _FakeLSLInlet(samples)
+            "pylsl.StreamInlet", side_effect=lambda _: _FakeLSLInlet(samples)
         ),
-        mock.patch("data_processing.graphing.run"),
     ):
         main.connect_and_process(ser)
 
@@ -80,9 +83,11 @@ class TestLSLToUARTPipelineE2E:
     def test_keyboard_interrupt_exits_cleanly(self):
         ser = mock.MagicMock()
         with (
-            mock.patch("main.resolve_byprop", return_value=[mock.MagicMock()]),
             mock.patch(
-                "main.StreamInlet", side_effect=lambda _: _FakeLSLInlet([])
+                "pylsl.resolve_byprop", return_value=[mock.MagicMock()]
+            ),
+            mock.patch(
+                "pylsl.StreamInlet", side_effect=lambda _: _FakeLSLInlet([])
             ),
         ):
             main.connect_and_process(ser)
@@ -35,7 +35,7 @@ class TestCSVFilePipelineIntegration:
         assert len(df) == 256
         assert list(df.columns) == ["timestamp", "ch1", "ch2", "ch3", "ch4"]
 
-        with mock.patch("data_processing.graphing.run"):
+        with mock.patch.dict("os.environ", {"NEUROSYNC_HEADLESS": "1"}):
             result = data_processing.process_pipeline(df)
 
         assert result["frequency_data"] is not None
@@ -53,7 +53,7 @@ class TestCSVFilePipelineIntegration:
             }
         )
 
-        with mock.patch("data_processing.graphing.run"):
+        with mock.patch.dict("os.environ", {"NEUROSYNC_HEADLESS": "1"}):
             result = data_processing.process_pipeline(df)
 
         assert len(result["frequency_data"]) == 1
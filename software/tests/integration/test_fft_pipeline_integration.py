@@ -59,7 +59,7 @@ class TestFFTPipelineIntegration:
 
     def test_process_pipeline_returns_expected_keys(self):
         df = make_raw_eeg(256)
-        with mock.patch("data_processing.graphing.run"):
+        with mock.patch.dict("os.environ", {"NEUROSYNC_HEADLESS": "1"}):
             result = data_processing.process_pipeline(df)
         assert "frequency_data" in result
         assert "stats" in result
@@ -68,7 +68,7 @@ class TestFFTPipelineIntegration:
 
     def test_process_pipeline_frequency_data_has_band_columns(self):
         df = make_raw_eeg(256)
-        with mock.patch("data_processing.graphing.run"):
+        with mock.patch.dict("os.environ", {"NEUROSYNC_HEADLESS": "1"}):
             result = data_processing.process_pipeline(df)
         for band in ["alpha", "beta", "theta", "delta"]:
             assert band in result["frequency_data"].columns
@@ -76,7 +76,24 @@ class TestFFTPipelineIntegration:
     def test_larger_input_produces_more_windows(self):
         df_small = make_raw_eeg(256)
         df_large = make_raw_eeg(512)
-        with mock.patch("data_processing.graphing.run"):
+        with mock.patch.dict("os.environ", {"NEUROSYNC_HEADLESS": "1"}):
             r_small = data_processing.process_pipeline(df_small)
             r_large = data_processing.process_pipeline(df_large)
         assert len(r_large["frequency_data"]) > len(r_small["frequency_data"])
+
+    def test_process_pipeline_accepts_psd_method(self):
+        df = make_raw_eeg(1024)
+        with mock.patch.dict("os.environ", {"NEUROSYNC_HEADLESS": "1"}):
+            periodogram = data_processing.process_pipeline(df)
+            welch = data_processing.process_pipeline(df, method="welch")
+            multitaper = data_processing.process_pipeline(
+                df, method="multitaper"
+            )
+        assert (
+            len(periodogram["frequency_data"])
+            == len(welch["frequency_data"])
+            == len(multitaper["frequency_data"])
+        )
+        assert not welch["frequency_data"].equals(
+            periodogram["frequency_data"]
+        )
@@ -50,7 +50,7 @@ class TestFFTToPacketIntegration:
 
     def test_pipeline_output_encodes_without_struct_error(self):
         df = make_raw_eeg(256)
-        with mock.patch("data_processing.graphing.run"):
+        with mock.patch.dict("os.environ", {"NEUROSYNC_HEADLESS": "1"}):
             result = data_processing.process_pipeline(df)
 
         freq_df = result["frequency_data"]
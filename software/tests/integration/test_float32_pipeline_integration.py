@@ -0,0 +1,70 @@
+"""test_float32_pipeline_integration.py
+
+Integration tests comparing the float32 pipeline against float64 on the
+bundled Muse 2 recording, from CSV ingestion through UART packets.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_processing
+import spectral
+import streaming
+import transmission
+
+DATA_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "..", "data", "muse2_eeg_data.csv"
+)
+BANDS = ["delta", "theta", "alpha", "beta"]
+
+
+@pytest.fixture(scope="module")
+def recording_df():
+    return pd.read_csv(DATA_PATH)
+
+
+def _transform(path, dtype, method):
+    return data_processing.transform_csv_to_hz(
+        path, spectral.get_plan(dtype=dtype), method
+    )
+
+
+class TestFloat32Pipeline:
+
+    @pytest.mark.parametrize("method", spectral.PSD_METHODS)
+    def test_band_power_within_1e5_of_float64(self, method):
+        single = _transform(DATA_PATH, "float32", method)
+        double = _transform(DATA_PATH, "float64", method)
+
+        assert (single[BANDS].dtypes == np.float32).all()
+        assert single["timestamp"].dtype == np.float64
+        np.testing.assert_array_equal(single["timestamp"], double["timestamp"])
+        np.testing.assert_allclose(single[BANDS], double[BANDS], rtol=1e-5)
+
+    def test_packets_match_float64(self):
+        single = _transform(DATA_PATH, "float32", "periodogram")
+        double = _transform(DATA_PATH, "float64", "periodogram")
+
+        for a, b in zip(single.to_dict("records"), double.to_dict("records")):
+            assert transmission.df_to_packet(a) == transmission.df_to_packet(b)
+
+    def test_streaming_matches_batch(self, recording_df):
+        plan = spectral.get_plan(dtype="float32")
+        stream = streaming.BandPowerStream(plan)
+        powers = stream.push_chunk(recording_df[list(plan.channels)])
+
+        expected = data_processing.transform_to_hz(recording_df, plan)
+        assert powers.dtype == np.float32
+        np.testing.assert_allclose(powers, expected[BANDS], rtol=1e-5)
+
+    def test_pipeline_selects_precision_per_call(self, recording_df):
+        single = data_processing.process_pipeline(
+            recording_df, plan=spectral.get_plan(dtype="float32"), sinks=[]
+        )
+        double = data_processing.process_pipeline(recording_df, sinks=[])
+
+        assert single["frequency_data"]["alpha"].dtype == np.float32
+        assert double["frequency_data"]["alpha"].dtype == np.float64
@@ -45,8 +45,11 @@ class TestTransmitReceiveIntegration:
         mock_ser.write.side_effect = lambda p: written.append(p)
         transmission.transmit(df, mock_ser)
 
-        assert len(written) == 10
-        for packet in written:
+        assert len(written) == 1
+        data = bytes(written[0])
+        packets = [data[i : i + 12] for i in range(0, len(data), 12)]
+        assert len(packets) == 10
+        for packet in packets:
             assert transmission.validate_packet(packet)
 
     def test_receive_reconstructs_all_rows(self):
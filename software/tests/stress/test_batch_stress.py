@@ -0,0 +1,57 @@
+"""test_batch_stress.py
+
+Stress tests for parallel batch processing throughput and core scaling.
+"""
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import batch
+
+
+def write_sessions(directory, n_files, n_samples):
+    rng = np.random.default_rng(0)
+    for i in range(n_files):
+        df = pd.DataFrame(
+            rng.uniform(-100, 100, size=(n_samples, 4)),
+            columns=["ch1", "ch2", "ch3", "ch4"],
+        )
+        df.insert(0, "timestamp", np.arange(n_samples) / 256)
+        df.to_csv(os.path.join(directory, f"session_{i:03d}.csv"), index=False)
+
+
+def timed_batch(source, out_dir, workers):
+    start = time.perf_counter()
+    reports = batch.run_batch(source, out_dir, workers, progress=lambda _: 0)
+    elapsed = time.perf_counter() - start
+    assert all("error" not in report for report in reports)
+    return elapsed
+
+
+class TestBatchThroughput:
+
+    def test_sixteen_five_minute_sessions(self, tmp_path):
+        write_sessions(tmp_path, 16, 256 * 60 * 5)
+        elapsed = timed_batch(tmp_path, tmp_path / "out", None)
+        print(f"\n[batch 16 x 5 min] {elapsed:.2f} s")
+        assert elapsed < 30
+
+    @pytest.mark.skipif(
+        (os.cpu_count() or 1) < 2, reason="scaling needs more than one core"
+    )
+    def test_scales_with_workers(self, tmp_path):
+        workers = min(os.cpu_count(), 4)
+        write_sessions(tmp_path, 8 * workers, 256 * 60 * 5)
+
+        serial = timed_batch(tmp_path, tmp_path / "one", 1)
+        parallel = timed_batch(tmp_path, tmp_path / "many", workers)
+
+        print(
+            f"\n[batch scaling] 1 worker {serial:.2f} s, {workers} workers "
+            f"{parallel:.2f} s ({serial / parallel:.1f}x)"
+        )
+        assert serial / parallel > 0.6 * workers
@@ -6,6 +6,7 @@ Stress tests for data integrity and determinism under large or repeated inputs.
 import numpy as np
 import pandas as pd
 
+import band_stats
 import data_processing
 import transmission
 
@@ -50,6 +51,21 @@ class TestDataIntegrityUnderLoad:
             len(set(round(m, 10) for m in means)) == 1
         ), "get_stats is non-deterministic"
 
+    def test_online_stats_match_batch_stats_over_long_session(self):
+        rng = np.random.default_rng(7)
+        rows = rng.lognormal(3, 1, size=(100_000, 4))
+        acc = band_stats.OnlineStats(["delta", "theta", "alpha", "beta"])
+        for block in np.array_split(rows, 1000):
+            acc.update_many(block)
+
+        batch = data_processing.get_stats(
+            pd.DataFrame(rows, columns=acc.columns)
+        )
+        online = data_processing.get_stats(acc)
+        pd.testing.assert_series_equal(online["mean"], batch["mean"])
+        pd.testing.assert_series_equal(online["variance"], batch["variance"])
+        pd.testing.assert_series_equal(online["iqr"], batch["iqr"], rtol=0.02)
+
     def test_no_crc_collisions_across_500_diverse_payloads(self):
         """Verify no two distinct payloads produce the same encoded packet.
         CRC-8 collisions are theoretically possible but should not appear
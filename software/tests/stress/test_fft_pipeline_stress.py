@@ -4,11 +4,15 @@ Stress tests for FFT pipeline throughput and latency.
 """
 
 import time
+import tracemalloc
 
 import numpy as np
 import pandas as pd
+from scipy.fft import fft, fftfreq
 
 import data_processing
+import spectral
+from result_cache import ResultCache
 
 
 def make_raw_eeg(n_samples=256, seed=0):
@@ -21,6 +25,39 @@ def make_raw_eeg(n_samples=256, seed=0):
     )
 
 
+def loop_transform_to_hz(data):
+    """Original per-window FFT and concat implementation, for comparison."""
+    freqs = fftfreq(256, 1 / 256)
+    fft_df = pd.DataFrame(
+        columns=["timestamp", "delta", "theta", "alpha", "beta"]
+    )
+    for start in range(0, len(data) - 256 + 1, 128):
+        window = data.iloc[start : start + 256]
+        fft_vals = fft(window[["ch1", "ch2", "ch3", "ch4"]].values, axis=0)
+        fft_vals = fft_vals / 256
+        new_row = pd.DataFrame(
+            [
+                {
+                    "timestamp": data["timestamp"].iloc[start],
+                    "delta": np.sum(
+                        abs(fft_vals[(freqs >= 0.5) & (freqs < 4)]) ** 2
+                    ),
+                    "theta": np.sum(
+                        abs(fft_vals[(freqs >= 4) & (freqs < 8)]) ** 2
+                    ),
+                    "alpha": np.sum(
+                        abs(fft_vals[(freqs >= 8) & (freqs < 13)]) ** 2
+                    ),
+                    "beta": np.sum(
+                        abs(fft_vals[(freqs >= 13) & (freqs < 32)]) ** 2
+                    ),
+                }
+            ]
+        )
+        fft_df = new_row if fft_df.empty else pd.concat([fft_df, new_row])
+    return fft_df.reset_index(drop=True)
+
+
 class TestFFTPipelineThroughput:
 
     def test_fft_on_256_samples_completes_under_500ms(self):
@@ -65,3 +102,190 @@ class TestFFTPipelineThroughput:
         print(f"[stats 1000 rows] {elapsed*1000:.2f} ms")
         assert elapsed < 0.5
         assert result is not None
+
+    def test_batched_fft_matches_loop_on_long_recording(self):
+        df = make_raw_eeg(256 * 240)  # four minutes of samples
+        start = time.perf_counter()
+        expected = loop_transform_to_hz(df)
+        loop_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = data_processing.transform_to_hz(df)
+        batched_elapsed = time.perf_counter() - start
+
+        speedup = loop_elapsed / batched_elapsed
+        print(
+            f"[fft long] loop {loop_elapsed*1000:.1f} ms, batched "
+            f"{batched_elapsed*1000:.1f} ms ({speedup:.0f}x)"
+        )
+        pd.testing.assert_frame_equal(
+            result, expected, check_dtype=False, rtol=1e-10
+        )
+        assert speedup > 10
+
+    def test_fft_on_one_hour_recording_completes_under_2s(self):
+        df = make_raw_eeg(256 * 3600)
+        start = time.perf_counter()
+        result = data_processing.transform_to_hz(df)
+        elapsed = time.perf_counter() - start
+        print(f"[fft 1h] {elapsed*1000:.1f} ms  ({len(result)} windows)")
+        assert len(result) == (len(df) - 256) // 128 + 1
+        assert elapsed < 2.0
+
+    def test_fused_stats_beats_separate_pandas_calls_on_1m_rows(self):
+        rng = np.random.default_rng(4)
+        df = pd.DataFrame(
+            rng.lognormal(3, 1, size=(1_000_000, 4)),
+            columns=["alpha", "beta", "theta", "delta"],
+        )
+
+        start = time.perf_counter()
+        {
+            "mean": df.mean(),
+            "median": df.median(),
+            "mode": df.mode(),
+            "range": df.max() - df.min(),
+            "variance": df.var(),
+            "std_dev": df.std(),
+            "iqr": df.quantile(0.75) - df.quantile(0.25),
+        }
+        separate = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = data_processing.get_stats(df)
+        fused = time.perf_counter() - start
+
+        print(
+            f"[stats 1M rows] separate {separate*1000:.0f} ms, fused "
+            f"{fused*1000:.0f} ms ({separate / fused:.1f}x)"
+        )
+        np.testing.assert_allclose(result["median"], df.median())
+        assert fused < separate / 2
+
+    def test_chunked_csv_peak_memory_is_bounded(self, tmp_path):
+        n_samples = 256 * 60 * 10  # 10 minutes
+        path = tmp_path / "recording.csv"
+        make_raw_eeg(n_samples, seed=5).to_csv(path, index=False)
+
+        tracemalloc.start()
+        whole = data_processing.transform_to_hz(pd.read_csv(path))
+        _, whole_peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        chunked = data_processing.transform_csv_to_hz(path, chunk_size=4096)
+        _, chunked_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(
+            f"\n[chunked csv 10 min] peak {chunked_peak / 1e6:.1f} MB vs "
+            f"{whole_peak / 1e6:.1f} MB whole-file"
+        )
+        pd.testing.assert_frame_equal(chunked, whole, rtol=0)
+        assert chunked_peak < whole_peak / 4
+
+    def test_resumed_csv_peak_memory_is_bounded(self, tmp_path):
+        n_samples = 256 * 60 * 60  # 1 hour
+        path = tmp_path / "recording.csv"
+        make_raw_eeg(n_samples, seed=7).to_csv(path, index=False)
+        start = n_samples - 256 * 60  # resume with a minute left
+
+        tracemalloc.start()
+        for _ in data_processing.read_csv_chunks(path, chunk_size=4096):
+            pass
+        _, full_peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        blocks = data_processing.read_csv_chunks(
+            path, chunk_size=4096, start=start
+        )
+        first, _ = next(blocks)
+        for _ in blocks:
+            pass
+        _, resumed_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(
+            f"\n[resumed csv 1 h] peak {resumed_peak / 1e6:.1f} MB vs "
+            f"{full_peak / 1e6:.1f} MB reading from the start"
+        )
+        assert first[0] == start
+        assert resumed_peak < 2 * full_peak
+
+    def test_cached_repeat_run_is_near_instant(self, tmp_path):
+        path = tmp_path / "recording.csv"
+        make_raw_eeg(256 * 60 * 10, seed=6).to_csv(path, index=False)
+        cache = ResultCache(tmp_path / "cache")
+
+        start = time.perf_counter()
+        first = data_processing.process_csv(path, sinks=[], cache=cache)
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        second = data_processing.process_csv(path, sinks=[], cache=cache)
+        warm = time.perf_counter() - start
+
+        print(
+            f"\n[cache 10 min csv] cold {cold*1000:.0f} ms, warm "
+            f"{warm*1000:.1f} ms ({cold / warm:.0f}x)"
+        )
+        pd.testing.assert_frame_equal(
+            second["frequency_data"], first["frequency_data"]
+        )
+        assert warm < cold / 10
+
+    def test_session_api_beats_per_dataframe_loop(self):
+        n_sessions = 200
+        rng = np.random.default_rng(7)
+        sessions = rng.uniform(-100, 100, size=(n_sessions, 256 * 10, 4))
+        frames = [make_raw_eeg(256 * 10) for _ in range(n_sessions)]
+        for frame, samples in zip(frames, sessions):
+            frame[["ch1", "ch2", "ch3", "ch4"]] = samples
+
+        start = time.perf_counter()
+        expected = [data_processing.transform_to_hz(df) for df in frames]
+        loop = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = spectral.session_band_power(sessions)
+        batched = time.perf_counter() - start
+
+        print(
+            f"\n[sessions 200 x 10 s] loop {loop*1000:.0f} ms, batched "
+            f"{batched*1000:.1f} ms ({loop / batched:.1f}x)"
+        )
+        np.testing.assert_allclose(
+            result,
+            np.stack([df.iloc[:, 1:].to_numpy() for df in expected]),
+            rtol=1e-12,
+        )
+        assert batched < loop / 3
+
+    def test_float32_halves_memory_on_one_hour_recording(self):
+        rng = np.random.default_rng(8)
+        signal = rng.uniform(-100, 100, size=(256 * 3600, 4))
+        timings, peaks, results = {}, {}, {}
+        for dtype in ("float64", "float32"):
+            plan = spectral.get_plan(dtype=dtype)
+            samples = signal.astype(dtype)
+            best = float("inf")
+            for _ in range(3):
+                start = time.perf_counter()
+                results[dtype] = spectral.band_power(samples, plan)
+                best = min(best, time.perf_counter() - start)
+            timings[dtype] = best
+
+            tracemalloc.start()
+            spectral.band_power(samples, plan)
+            peaks[dtype] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        speedup = timings["float64"] / timings["float32"]
+        print(
+            f"\n[fft 1h float32] {timings['float32']*1000:.0f} ms vs "
+            f"{timings['float64']*1000:.0f} ms ({speedup:.1f}x), peak "
+            f"{peaks['float32'] / 1e6:.0f} MB vs "
+            f"{peaks['float64'] / 1e6:.0f} MB"
+        )
+        np.testing.assert_allclose(
+            results["float32"], results["float64"], rtol=1e-4
+        )
+        assert peaks["float32"] < 0.6 * peaks["float64"]
+        assert speedup > 1.2
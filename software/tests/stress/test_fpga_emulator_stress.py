@@ -0,0 +1,92 @@
+"""test_fpga_emulator_stress.py
+
+UART throughput of the transmit path against the pty FPGA emulator, both
+unthrottled and paced to the board's 115200 baud, plus recovery from a
+byte stream with dropped bytes.
+"""
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import transmission
+from fpga_emulator import FPGAEmulator
+
+serial = pytest.importorskip("serial")
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, "openpty"), reason="needs a pty"
+)
+
+
+def make_bands(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        rng.uniform(0, 65535, size=(n, 4)),
+        columns=list(transmission.BAND_ORDER),
+    )
+
+
+class TestEmulatedUART:
+
+    def test_unthrottled_transmit_throughput(self):
+        n = 10_000
+        df = make_bands(n)
+        with FPGAEmulator(baudrate=None) as fpga:
+            with serial.Serial(fpga.port, 115200) as ser:
+                start = time.perf_counter()
+                transmission.transmit(df, ser)
+                assert fpga.wait_for_bytes(n * transmission.PACKET_SIZE)
+                elapsed = time.perf_counter() - start
+            stats = fpga.stats()
+
+        print(
+            f"\n[fpga emulator] {n} packets unthrottled in {elapsed:.3f}s  "
+            f"→  {n / elapsed:,.0f} packets/s"
+        )
+        assert stats["packets"] == n
+        assert stats["checksum_errors"] == 0
+
+    def test_paced_to_115200_baud(self):
+        n = 960  # one second of line time at 115200 baud
+        df = make_bands(n)
+        with FPGAEmulator() as fpga:
+            with serial.Serial(fpga.port, 115200) as ser:
+                transmission.transmit(df, ser)
+                assert fpga.wait_for_bytes(n * transmission.PACKET_SIZE)
+            stats = fpga.stats()
+
+        print(
+            f"\n[fpga emulator] 115200 baud: "
+            f"{stats['packets_per_second']:,.0f} packets/s, "
+            f"{stats['bytes_per_second']:,.0f} B/s"
+        )
+        assert stats["packets"] == n
+        assert stats["bytes_per_second"] == pytest.approx(11_520, rel=0.1)
+
+    def test_recovers_from_dropped_bytes(self):
+        n = 1_000
+        encoder = transmission.PacketEncoder()
+        rows = make_bands(n)[list(transmission.BAND_ORDER)].to_numpy()
+        stream = bytearray()
+        for i, row in enumerate(rows):
+            packet = bytes(encoder.encode(row))
+            if i % 100 == 50:
+                packet = packet[:5] + packet[6:]  # lose one payload byte
+            stream += packet
+
+        with FPGAEmulator(baudrate=None) as fpga:
+            fd = os.open(fpga.port, os.O_WRONLY | os.O_NOCTTY)
+            os.write(fd, stream)
+            os.close(fd)
+            assert fpga.wait_for_bytes(len(stream))
+            stats = fpga.stats()
+
+        print(
+            f"\n[fpga emulator] 10 dropped bytes: {stats['packets']} good, "
+            f"{stats['checksum_errors']} checksum errors, "
+            f"{stats['resyncs']} resyncs"
+        )
+        assert stats["packets"] >= n - 20
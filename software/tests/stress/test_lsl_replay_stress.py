@@ -0,0 +1,123 @@
+"""test_lsl_replay_stress.py
+
+Load tests the live path against real LSL streams published by lsl_replay.
+Each test runs a fresh interpreter (the suite stubs pylsl in-process) that
+replays a synthetic session to several outlets while one consumer thread
+pulls every stream into preallocated buffers, computes band power, and
+encodes packets. Skipped where liblsl is not installed.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+SRC = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "src")
+)
+
+# replays to N outlets in a thread and consumes them all in the main thread
+LOAD_TEST = """
+import json, sys, threading, time
+try:
+    import pylsl
+except (ImportError, RuntimeError):
+    sys.exit(3)
+import numpy as np
+import lsl_replay, streaming, transmission
+
+n_streams, speed, seconds = int(sys.argv[1]), float(sys.argv[2]), 2
+rng = np.random.default_rng(0)
+session = rng.uniform(-100, 100, (int(256 * seconds * speed), 4))
+name = f"stress-{n_streams}-{time.time_ns()}"
+outlets = lsl_replay.make_outlets(n_streams, "abcd", 256, name)
+
+inlets = []
+for k in range(n_streams):
+    label = name if k == 0 else f"{name}-{k}"
+    (info,) = pylsl.resolve_byprop("name", label, timeout=5)
+    inlet = pylsl.StreamInlet(info, max_buflen=60)
+    inlet.open_stream(timeout=5)
+    inlets.append(inlet)
+
+report = {}
+publisher = threading.Thread(
+    target=lambda: report.update(
+        lsl_replay.replay(session, 256, outlets, speed)
+    )
+)
+chunk = np.zeros((64, 4), np.float32)
+states = [
+    (streaming.BandPowerStream(), transmission.PacketEncoder())
+    for _ in inlets
+]
+received, packets, busy = [0] * n_streams, 0, 0.0
+publisher.start()
+deadline = time.perf_counter() + seconds + 5
+while time.perf_counter() < deadline:
+    idle = True
+    for k, (inlet, (stream, encoder)) in enumerate(zip(inlets, states)):
+        _, stamps = inlet.pull_chunk(0.0, 64, chunk)
+        if stamps:
+            idle = False
+            start = time.perf_counter()
+            for row in stream.push_chunk(chunk[: len(stamps)]):
+                encoder.encode(row)
+                packets += 1
+            busy += time.perf_counter() - start
+            received[k] += len(stamps)
+    if idle:
+        if not publisher.is_alive() and min(received) >= len(session):
+            break
+        time.sleep(0.002)
+publisher.join()
+print(json.dumps({
+    "pushed": report["samples"], "received": received, "packets": packets,
+    "busy": busy, "seconds": report["seconds"],
+    "max_lag": report["max_lag"], "late_ticks": report["late_ticks"],
+}))
+"""
+
+
+def run_load_test(n_streams, speed):
+    """Runs LOAD_TEST in a fresh interpreter and returns its report."""
+    result = subprocess.run(
+        [sys.executable, "-c", LOAD_TEST, str(n_streams), str(speed)],
+        env={**os.environ, "PYTHONPATH": SRC},
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    if result.returncode == 3:
+        pytest.skip("liblsl is not available")
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+class TestReplayLoad:
+
+    @pytest.mark.parametrize("n_streams", [1, 8])
+    def test_consumer_keeps_up_at_real_time(self, n_streams):
+        report = run_load_test(n_streams, 1)
+        load = report["busy"] / report["seconds"]
+        print(
+            f"\n[lsl replay] {n_streams} stream(s) at 1x: "
+            f"{report['packets']} packets, consumer load {load:.1%}, "
+            f"publisher max lag {report['max_lag'] * 1e3:.1f} ms"
+        )
+        assert report["received"] == [report["pushed"]] * n_streams
+        assert report["late_ticks"] == 0
+
+    def test_fan_out_at_high_speed(self):
+        n_streams, speed = 16, 8
+        report = run_load_test(n_streams, speed)
+        rate = n_streams * report["pushed"] / report["seconds"]
+        print(
+            f"\n[lsl replay] {n_streams} streams at {speed}x: "
+            f"{rate:,.0f} samples/s, "
+            f"consumer busy {report['busy']:.2f} s of "
+            f"{report['seconds']:.2f} s"
+        )
+        assert report["received"] == [report["pushed"]] * n_streams
@@ -32,6 +32,22 @@ class TestPacketEncodeThroughput:
         )
         assert rate > 5_000
 
+    def test_bulk_encode_1m_packets(self):
+        n = 1_000_000
+        rng = np.random.default_rng(0)
+        powers = rng.uniform(0, 65535, size=(n, 4))
+        transmission.encode_packets(powers[:10])  # warm up
+        start = time.perf_counter()
+        packets = transmission.encode_packets(powers)
+        elapsed = time.perf_counter() - start
+        rate = n / elapsed
+        print(
+            f"\n[bulk encode] {n} packets in {elapsed:.3f}s  →  "
+            f"{rate:,.0f} pkt/s"
+        )
+        assert packets.nbytes == n * transmission.PACKET_SIZE
+        assert rate > 1_000_000
+
     def test_validate_10k_packets(self):
         row = make_band_row()
         packets = [transmission.df_to_packet(row) for _ in range(10_000)]
@@ -86,3 +102,87 @@ class TestPacketEncodeThroughput:
             if not transmission.validate_packet(pkt):
                 failures += 1
         assert failures == 0, f"{failures}/{n} packets failed CRC validation"
+
+
+class TestStreamingDecode:
+
+    def test_decode_200k_packets_with_corruption(self):
+        n, errors = 200_000, 200
+        rng = np.random.default_rng(2)
+        values = rng.integers(0, 65536, size=(n, 4))
+        data = bytearray(transmission.encode_packets(values).tobytes())
+        for i in rng.choice(len(data), errors, replace=False):
+            data[i] ^= 0xFF
+
+        decoder = transmission.PacketDecoder()
+        decoded = 0
+        start = time.perf_counter()
+        for i in range(0, len(data), transmission.READ_BLOCK):
+            decoded += len(decoder.feed(data[i : i + transmission.READ_BLOCK]))
+        elapsed = time.perf_counter() - start
+        rate = n / elapsed
+        print(
+            f"\n[stream decode] {n} packets, {errors} corrupted bytes in "
+            f"{elapsed:.3f}s  →  {rate:,.0f} pkt/s, {decoded} decoded"
+        )
+        assert decoded >= n - errors  # each bad byte costs <= 1 packet
+        assert rate > 100_000
+
+
+class TestCaptureDecode:
+
+    def test_decode_1m_packet_capture(self, tmp_path):
+        n = 1_000_000
+        rng = np.random.default_rng(3)
+        values = rng.integers(0, 65536, size=(n, 4))
+        path = tmp_path / "capture.bin"
+        path.write_bytes(transmission.encode_packets(values).tobytes())
+
+        transmission.decode_capture(path)  # warm the page cache
+        start = time.perf_counter()
+        capture = transmission.decode_capture(path)
+        decoded = capture.values()
+        elapsed = time.perf_counter() - start
+        rate = n * transmission.PACKET_SIZE / elapsed / 1e6
+        print(
+            f"\n[capture decode] {n} packets in {elapsed:.3f}s  →  "
+            f"{rate:,.0f} MB/s"
+        )
+        np.testing.assert_array_equal(decoded, values)
+        assert rate > 100
+
+
+class TestChecksumValidation:
+
+    @staticmethod
+    def best_of(runs, func, *args):
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            result = func(*args)
+            times.append(time.perf_counter() - start)
+        return min(times), result
+
+    @staticmethod
+    def folded_xor_ok(packets):
+        # the payload XOR check as done before checksums were pluggable
+        folded = np.bitwise_xor.reduce(packets[:, 3:-1].view(">u2"), axis=1)
+        return (folded >> 8) ^ (folded & 0xFF) == packets[:, -1]
+
+    def test_crc8_batch_keeps_up_with_xor(self):
+        n = 1_000_000
+        values = np.random.default_rng(4).integers(0, 65536, size=(n, 4))
+        legacy = transmission.encode_packets(values, version=0)
+        crc8 = transmission.encode_packets(values, version=1)
+        transmission.validate_packets(crc8, 1)  # build the word tables
+
+        xor_time, xor_ok = self.best_of(5, self.folded_xor_ok, legacy)
+        crc_time, crc_ok = self.best_of(
+            5, transmission.validate_packets, crc8, 1
+        )
+        print(
+            f"\n[checksum batch] {n} packets: XOR {xor_time * 1e3:.1f} ms, "
+            f"CRC-8 {crc_time * 1e3:.1f} ms"
+        )
+        assert xor_ok.all() and crc_ok.all()
+        assert crc_time <= xor_time * 1.1
@@ -1,15 +1,18 @@
 """test_serial_write_stress.py
 
-Stress tests for simulated serial write throughput and timing.
+Stress tests for simulated serial write throughput and timing, and for the
+asynchronous SerialWriter in front of a slow or stalled port.
 """
 
 import threading
 import time
 import unittest.mock as mock
 
+import numpy as np
 import pandas as pd
 
 import transmission
+from serial_writer import DROP_OLDEST, SerialWriter
 
 
 def make_band_row(delta=1000, theta=2000, alpha=3000, beta=4000):
@@ -90,3 +93,75 @@ class TestSerialWriteRateSimulation:
             f"{elapsed:.3f}s  →  {rate:,.0f} ops/s"
         )
         assert len(errors) == 0, f"thread errors: {errors}"
+
+
+class _SlowSerial:
+    """Port whose every write() costs a fixed delay, however short."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.data = bytearray()
+        self.calls = 0
+
+    def write(self, data):
+        time.sleep(self.delay)
+        self.data += data
+        self.calls += 1
+        return len(data)
+
+
+class TestSerialWriterBackpressure:
+
+    def test_slow_port_does_not_slow_producer(self):
+        n = 10_000
+        powers = np.random.default_rng(0).uniform(0, 65535, size=(n, 4))
+        encoder = transmission.PacketEncoder()
+        ser = _SlowSerial(delay=0.005)  # 5 ms per write: 200 writes/s
+
+        with SerialWriter(ser, maxsize=n) as writer:
+            start = time.perf_counter()
+            for row in powers:
+                writer.write(encoder.encode(row))
+            produced = time.perf_counter() - start
+        rate = n / produced
+        print(
+            f"\n[serial writer] {n} packets queued at {rate:,.0f} pkt/s, "
+            f"{ser.calls} port writes"
+        )
+        assert bytes(ser.data) == transmission.encode_packets(powers).tobytes()
+        assert rate > 20_000  # a synchronous loop would manage 200/s
+        assert ser.calls < n / 10
+
+    def test_stalled_port_drops_oldest_without_blocking(self):
+        n = 5_000
+        maxsize = 256
+        ser = mock.MagicMock()
+        entered, stalled = threading.Event(), threading.Event()
+
+        def stall(data):
+            entered.set()
+            stalled.wait(5)
+
+        ser.write.side_effect = stall
+        writer = SerialWriter(ser, maxsize=maxsize, policy=DROP_OLDEST)
+        writer.write(b"first")
+        assert entered.wait(5)  # the writer thread is stuck in the port
+        latencies = []
+        for i in range(n):
+            start = time.perf_counter()
+            writer.write(i.to_bytes(2, "big"))
+            latencies.append(time.perf_counter() - start)
+        stats = writer.stats()
+        stalled.set()
+        writer.close()
+
+        worst = max(latencies) * 1e3
+        print(
+            f"\n[serial writer] stalled port: {stats['dropped']} dropped, "
+            f"depth {stats['depth']}, worst write {worst:.2f} ms"
+        )
+        assert stats["depth"] == maxsize
+        assert stats["dropped"] == n - maxsize
+        assert worst < 50
+        newest = ser.write.call_args.args[0]
+        assert newest[-2:] == (n - 1).to_bytes(2, "big")
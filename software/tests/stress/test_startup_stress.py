@@ -0,0 +1,103 @@
+"""test_startup_stress.py
+
+Startup benchmarks for main.py. Each test runs a fresh interpreter with
+-X importtime and reports the slowest imports, so heavy dependencies that
+creep back into the startup path show up in the test output.
+"""
+
+import os
+import subprocess
+import sys
+
+SRC = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "src")
+)
+
+# fake pylsl that ends the stream after a few hops of samples
+LSL_MODE = """
+import ctypes, sys, types
+pylsl = types.ModuleType("pylsl")
+class StreamInlet:
+    channel_count = 4
+    value_type = ctypes.c_float
+    def __init__(self, info):
+        self.left = 1024
+    def pull_chunk(self, timeout=0.0, max_samples=1024, dest_obj=None):
+        if self.left <= 0:
+            raise KeyboardInterrupt
+        n = min(self.left, max_samples)
+        self.left -= n
+        dest_obj[:n] = [1.0, 2.0, 3.0, 4.0]
+        return None, [0.0] * n
+pylsl.StreamInlet = StreamInlet
+pylsl.resolve_byprop = lambda *a, **k: [None]
+sys.modules["pylsl"] = pylsl
+
+import main
+class Serial:
+    def write(self, data):
+        pass
+main.connect_and_process(Serial())
+print("loaded:", " ".join(sorted(sys.modules)))
+"""
+
+
+def import_report(code):
+    """Runs code under -X importtime and returns (modules, total ms, and
+    cumulative times of packages sorted slowest first)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env={**os.environ, "PYTHONPATH": SRC},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    total_us = 0
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if not name.startswith("  "):  # top-level import
+            total_us += int(cumulative)
+        if "." not in name and name.strip() != "main":
+            timings.append((int(cumulative), name.strip()))
+
+    loaded = set()
+    for line in result.stdout.splitlines():
+        if line.startswith("loaded:"):
+            loaded = set(line.split()[1:])
+
+    return loaded, total_us / 1000, sorted(timings, reverse=True)
+
+
+def print_report(label, total_ms, timings):
+    print(f"\n[{label}] {total_ms:.1f} ms of imports")
+    for us, name in timings[:8]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+
+class TestStartup:
+
+    def test_import_main_skips_heavy_dependencies(self):
+        loaded, total_ms, timings = import_report(
+            "import sys, main\n"
+            "print('loaded:', ' '.join(sorted(sys.modules)))"
+        )
+        print_report("import main", total_ms, timings)
+        for heavy in (
+            "pandas",
+            "matplotlib",
+            "serial",
+            "pylsl",
+            "scipy.signal",
+        ):
+            assert heavy not in loaded, f"{heavy} imported at startup"
+
+    def test_headless_lsl_mode_skips_pandas_and_matplotlib(self):
+        loaded, total_ms, timings = import_report(LSL_MODE)
+        print_report("lsl mode", total_ms, timings)
+        assert "main" in loaded
+        assert "pandas" not in loaded
+        assert "matplotlib" not in loaded
@@ -0,0 +1,67 @@
+"""test_streaming_stress.py
+
+Stress tests for streaming band power latency and throughput.
+"""
+
+import time
+
+import numpy as np
+
+from streaming import BandPowerStream, SlidingBandPower
+
+
+def make_samples(n_samples, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-100, 100, size=(n_samples, 4))
+
+
+class TestStreamingLatency:
+
+    def test_window_latency_is_microseconds(self):
+        stream = BandPowerStream()
+        samples = make_samples(256 * 60)
+        stream.push_chunk(samples[:255])
+
+        latencies = []
+        for pos in range(255, len(samples) - 128, 128):
+            start = time.perf_counter()
+            result = stream.push(samples[pos])  # last sample of a window
+            latencies.append(time.perf_counter() - start)
+            assert result is not None
+            stream.push_chunk(samples[pos + 1 : pos + 128])
+
+        median_us = np.median(latencies) * 1e6
+        print(f"\n[stream latency] median {median_us:.1f} us")
+        assert median_us < 500
+
+    def test_five_minutes_of_samples_one_at_a_time(self):
+        stream = BandPowerStream()
+        samples = make_samples(256 * 60 * 5)
+        start = time.perf_counter()
+        n_results = 0
+        for sample in samples:
+            if stream.push(sample) is not None:
+                n_results += 1
+        elapsed = time.perf_counter() - start
+        rate = len(samples) / elapsed
+        print(f"[stream push] {rate:,.0f} samples/s")
+        assert n_results == (len(samples) - 256) // 128 + 1
+        assert rate > 256 * 10  # keeps up with ten headsets
+
+
+class TestSlidingDFTThroughput:
+
+    def test_updates_every_4_samples_for_one_hour_chunked(self):
+        sliding = SlidingBandPower(update_every=4)
+        samples = make_samples(256 * 3600)
+        start = time.perf_counter()
+        results = np.concatenate(
+            [
+                sliding.push_chunk(samples[i : i + 256])
+                for i in range(0, len(samples), 256)
+            ]
+        )
+        elapsed = time.perf_counter() - start
+        print(f"[sliding dft] {len(results)} updates in {elapsed*1000:.0f} ms")
+        assert len(results) == (len(samples) - 256) // 4 + 1
+        assert elapsed < 10.0
@@ -0,0 +1,241 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from band_stats import OnlineStats, TDigest, summarize
+
+BANDS = ["delta", "theta", "alpha", "beta"]
+
+
+@pytest.fixture
+def rows():
+    rng = np.random.default_rng(0)
+    return rng.lognormal(3, 1, size=(5000, 4))
+
+
+class TestSummarize:
+    def test_matches_pandas(self, rows):
+        df = pd.DataFrame(rows, columns=BANDS)
+        result = summarize(rows)
+        np.testing.assert_allclose(result["mean"], df.mean())
+        np.testing.assert_allclose(result["median"], df.median())
+        np.testing.assert_allclose(result["range"], df.max() - df.min())
+        np.testing.assert_allclose(result["variance"], df.var())
+        np.testing.assert_allclose(result["std_dev"], df.std())
+        np.testing.assert_allclose(
+            result["iqr"], df.quantile(0.75) - df.quantile(0.25)
+        )
+
+    @pytest.mark.parametrize("n", [1, 2, 3, 4, 5, 10])
+    def test_quartiles_match_pandas_for_small_inputs(self, n):
+        values = np.random.default_rng(n).standard_normal((n, 2))
+        df = pd.DataFrame(values)
+        result = summarize(values)
+        np.testing.assert_allclose(result["median"], df.median())
+        np.testing.assert_allclose(
+            result["iqr"], df.quantile(0.75) - df.quantile(0.25)
+        )
+
+    def test_single_row_variance_is_nan(self):
+        assert np.isnan(summarize([[1.0, 2.0]])["variance"]).all()
+
+    def test_does_not_modify_input(self, rows):
+        original = rows.copy()
+        summarize(rows)
+        np.testing.assert_array_equal(rows, original)
+
+    def test_mode_finds_dense_region(self):
+        rng = np.random.default_rng(3)
+        values = np.concatenate(
+            [rng.normal(50, 0.5, 20_000), rng.uniform(0, 100, 5_000)]
+        )
+        assert summarize(values[:, None])["mode"][0] == pytest.approx(
+            50, abs=1.0
+        )
+
+    def test_constant_column_mode(self):
+        assert summarize(np.full((10, 1), 4.0))["mode"][0] == 4.0
+
+    def test_missing_values_are_skipped_per_column(self, rows):
+        values = rows[:50].copy()
+        values[[3, 17, 18], 1] = np.nan
+        values[:, 3] = np.nan
+        df = pd.DataFrame(values, columns=BANDS)
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            result = summarize(values)
+        for key, expected in [
+            ("mean", df.mean()),
+            ("median", df.median()),
+            ("range", df.max() - df.min()),
+            ("variance", df.var()),
+            ("std_dev", df.std()),
+            ("iqr", df.quantile(0.75) - df.quantile(0.25)),
+        ]:
+            np.testing.assert_allclose(result[key], expected)
+        assert np.isfinite(result["mode"][:3]).all()
+        assert np.isnan(result["mode"][3])
+
+    def test_missing_value_in_short_column(self):
+        result = summarize([[1.0], [np.nan], [3.0], [4.0]])
+        assert result["median"][0] == 3.0
+        assert result["mean"][0] == pytest.approx(8 / 3)
+        assert result["range"][0] == 3.0
+
+
+class TestTDigest:
+    def test_empty_quantile_is_nan(self):
+        assert np.isnan(TDigest().quantile(0.5))
+
+    def test_single_value(self):
+        digest = TDigest()
+        digest.update([7.0])
+        assert digest.quantile(0.5) == 7.0
+        assert digest.mode() == 7.0
+
+    def test_median_of_small_sample_is_exact(self):
+        digest = TDigest()
+        digest.update([3.0, 1.0, 2.0])
+        assert digest.quantile(0.5) == 2.0
+
+    def test_quantiles_close_to_exact(self, rows):
+        digest = TDigest()
+        for value in rows[:, 0]:
+            digest.update(value)
+        for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+            exact = np.quantile(rows[:, 0], q)
+            assert digest.quantile(q) == pytest.approx(exact, rel=0.02)
+
+    def test_memory_is_bounded(self):
+        digest = TDigest(compression=100)
+        digest.update(np.random.default_rng(1).standard_normal(100_000))
+        means, _ = digest.centroids()
+        assert len(means) <= 100
+
+    def test_extremes_are_exact(self, rows):
+        digest = TDigest()
+        digest.update(rows[:, 1])
+        assert digest.quantile(0.0) == rows[:, 1].min()
+        assert digest.quantile(1.0) == rows[:, 1].max()
+
+    def test_merge_matches_single_digest(self, rows):
+        left, right = TDigest(), TDigest()
+        left.update(rows[:2500, 0])
+        right.update(rows[2500:, 0])
+        left.merge(right)
+        assert left.count == len(rows)
+        exact = np.quantile(rows[:, 0], 0.5)
+        assert left.quantile(0.5) == pytest.approx(exact, rel=0.02)
+
+    def test_mode_finds_dense_region(self):
+        rng = np.random.default_rng(2)
+        values = np.concatenate(
+            [rng.normal(10, 0.1, 5000), rng.uniform(0, 100, 1000)]
+        )
+        digest = TDigest()
+        digest.update(values)
+        assert digest.mode() == pytest.approx(10, abs=0.5)
+
+
+class TestOnlineStats:
+    def test_mean_and_variance_match_numpy(self, rows):
+        stats = OnlineStats(BANDS)
+        for row in rows:
+            stats.update(row)
+        np.testing.assert_allclose(stats.mean, rows.mean(axis=0))
+        np.testing.assert_allclose(stats.variance, rows.var(axis=0, ddof=1))
+        np.testing.assert_allclose(stats.std_dev, rows.std(axis=0, ddof=1))
+
+    def test_update_many_matches_row_updates(self, rows):
+        one, many = OnlineStats(BANDS), OnlineStats(BANDS)
+        for row in rows[:100]:
+            one.update(row)
+        many.update_many(rows[:60])
+        many.update_many(rows[60:100])
+        np.testing.assert_allclose(one.mean, many.mean)
+        np.testing.assert_allclose(one.variance, many.variance)
+
+    def test_min_max_exact(self, rows):
+        stats = OnlineStats(BANDS)
+        stats.update_many(rows)
+        np.testing.assert_array_equal(stats.min, rows.min(axis=0))
+        np.testing.assert_array_equal(stats.max, rows.max(axis=0))
+
+    def test_merge_across_workers(self, rows):
+        parts = [OnlineStats(BANDS) for _ in range(4)]
+        for part, block in zip(parts, np.array_split(rows, 4)):
+            part.update_many(block)
+        merged = parts[0]
+        for part in parts[1:]:
+            merged.merge(part)
+        assert merged.count == len(rows)
+        np.testing.assert_allclose(merged.mean, rows.mean(axis=0))
+        np.testing.assert_allclose(merged.variance, rows.var(axis=0, ddof=1))
+        np.testing.assert_allclose(
+            merged.quantile(0.5), np.median(rows, axis=0), rtol=0.02
+        )
+
+    def test_merge_rejects_different_columns(self):
+        with pytest.raises(ValueError):
+            OnlineStats(BANDS).merge(OnlineStats(["gamma"]))
+
+    def test_save_and_load_round_trip(self, rows, tmp_path):
+        stats = OnlineStats(BANDS)
+        stats.update_many(rows)
+        path = tmp_path / "session.npz"
+        stats.save(path)
+        loaded = OnlineStats.load(path)
+        assert loaded.columns == BANDS
+        assert loaded.count == stats.count
+        np.testing.assert_allclose(loaded.mean, stats.mean)
+        np.testing.assert_allclose(loaded.quantile(0.25), stats.quantile(0.25))
+
+    def test_empty_stats_are_nan(self):
+        stats = OnlineStats(BANDS)
+        assert np.isnan(stats.mean).all()
+        assert np.isnan(stats.variance).all()
+
+    def test_rejects_wrong_width(self):
+        with pytest.raises(ValueError):
+            OnlineStats(BANDS).update([1.0, 2.0])
+
+    def test_buffered_rows_are_counted_and_reported(self, rows):
+        stats = OnlineStats(BANDS)
+        for row in rows[:3]:
+            stats.update(row)
+        assert stats.count == 3
+        np.testing.assert_array_equal(stats.max, rows[:3].max(axis=0))
+
+    def test_update_does_not_keep_references(self, rows):
+        stats = OnlineStats(BANDS)
+        row = rows[0].copy()
+        stats.update(row)
+        row[:] = 0.0
+        np.testing.assert_array_equal(stats.mean, rows[0])
+
+
+class TestGetStatsAdapter:
+    def test_same_keys_and_shapes_as_dataframe(self, rows):
+        from data_processing import get_stats
+
+        df = pd.DataFrame(rows, columns=BANDS)
+        stats = OnlineStats(BANDS)
+        stats.update_many(rows)
+
+        expected = get_stats(df)
+        result = get_stats(stats)
+
+        assert result.keys() == expected.keys()
+        for key in ("mean", "range", "variance", "std_dev"):
+            pd.testing.assert_series_equal(result[key], expected[key])
+        pd.testing.assert_series_equal(
+            result["median"], expected["median"], rtol=0.02
+        )
+        assert list(result["mode"].index) == BANDS
+
+    def test_empty_accumulator_returns_none(self):
+        from data_processing import get_stats
+
+        assert get_stats(OnlineStats(BANDS)) is None
@@ -0,0 +1,283 @@
+import os
+import unittest.mock as mock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import batch
+import data_processing
+import recording
+import spectral
+
+
+def _write_session(path, n, seed):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        rng.uniform(-100, 100, size=(n, 4)),
+        columns=["ch1", "ch2", "ch3", "ch4"],
+    )
+    df.insert(0, "timestamp", np.arange(n) / 256)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    df.to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    root = tmp_path / "data"
+    paths = [
+        _write_session(str(root / "a.csv"), 1024, 0),
+        _write_session(str(root / "b.csv"), 2048, 1),
+        _write_session(str(root / "day2" / "c.csv"), 512, 2),
+    ]
+    recording.convert_csv(paths[0], str(root / "d.nsrec"), dtype="f8")
+    return root, paths
+
+
+class TestFindRecordings:
+    def test_directory_is_searched_recursively(self, sessions):
+        root, paths = sessions
+        found = batch.find_recordings(root)
+        assert found == sorted(paths + [str(root / "d.nsrec")])
+
+    def test_glob(self, sessions):
+        root, _ = sessions
+        assert batch.find_recordings(str(root / "*.csv")) == [
+            str(root / "a.csv"),
+            str(root / "b.csv"),
+        ]
+
+    def test_prefers_converted_recording_when_asked(self, tmp_path):
+        csv_path = _write_session(str(tmp_path / "s.csv"), 300, 3)
+        assert batch.find_recordings(tmp_path, True) == [csv_path]
+        recording.convert_csv(csv_path)
+        nsrec_path = str(tmp_path / "s.nsrec")
+        assert batch.find_recordings(tmp_path, True) == [nsrec_path]
+        assert batch.find_recordings(tmp_path) == [csv_path, nsrec_path]
+
+    def test_skipped_csv_is_reported(self, tmp_path):
+        csv_path = _write_session(str(tmp_path / "s.csv"), 300, 3)
+        recording.convert_csv(csv_path)
+        lines = []
+        reports = batch.run_batch(
+            tmp_path,
+            tmp_path / "out",
+            workers=1,
+            progress=lines.append,
+            prefer_converted=True,
+        )
+        assert [r["path"] for r in reports] == [str(tmp_path / "s.nsrec")]
+        assert lines[0].startswith(f"skipping {csv_path}")
+
+    def test_ignores_other_files(self, tmp_path):
+        (tmp_path / "notes.txt").write_text("x")
+        assert batch.find_recordings(tmp_path) == []
+
+
+class TestRunBatch:
+    def test_writes_outputs_matching_process_csv(self, sessions, tmp_path):
+        root, paths = sessions
+        out = tmp_path / "out"
+        lines = []
+
+        reports = batch.run_batch(root, out, workers=2, progress=lines.append)
+
+        assert [r["path"] for r in reports] == batch.find_recordings(root)
+        assert all("error" not in r for r in reports)
+        for path in paths:
+            bands_path, stats_path = batch.output_paths(path, root, out)
+            expected = data_processing.process_csv(path, sinks=[])
+            pd.testing.assert_frame_equal(
+                pd.read_csv(bands_path), expected["frequency_data"]
+            )
+            stats = pd.read_csv(stats_path, index_col=0)
+            np.testing.assert_allclose(
+                stats["mean"], expected["stats"]["mean"]
+            )
+        assert os.path.exists(out / "day2" / "c.bands.csv")
+        assert os.path.exists(out / "d.bands.csv")
+
+        assert len(lines) == len(reports) + 1
+        assert lines[0].startswith("[1/4]")
+        assert "files/s" in lines[-1]
+
+    def test_recording_uses_its_sampling_rate(self, tmp_path):
+        csv_path = _write_session(str(tmp_path / "fast.csv"), 2048, 4)
+        nsrec_path = recording.convert_csv(
+            csv_path, str(tmp_path / "fast.nsrec"), 512, dtype="f8"
+        )
+        report = batch.process_file(nsrec_path, tmp_path, tmp_path / "out")
+        assert "error" not in report
+
+        bands_path, _ = batch.output_paths(
+            nsrec_path, tmp_path, tmp_path / "out"
+        )
+        expected = data_processing.transform_to_hz(
+            pd.read_csv(csv_path), spectral.get_plan(sampling_rate=512)
+        )
+        pd.testing.assert_frame_equal(pd.read_csv(bands_path), expected)
+
+    def test_float32_output_matches_process_csv(self, sessions, tmp_path):
+        root, paths = sessions
+        out = tmp_path / "out"
+        batch.process_file(
+            paths[1], root, out, dtype="float32", chunk_size=700
+        )
+
+        bands_path, _ = batch.output_paths(paths[1], root, out)
+        plan = spectral.get_plan(dtype="float32")
+        expected = data_processing.process_csv(paths[1], plan=plan, sinks=[])
+        frame = expected["frequency_data"]
+        assert (frame[list(plan.band_names)].dtypes == np.float32).all()
+        with open(bands_path) as file:
+            assert file.read() == frame.to_csv(index=False)
+
+    def test_bad_file_is_reported_not_fatal(self, sessions, tmp_path):
+        root, _ = sessions
+        (root / "broken.csv").write_text("timestamp,ch1\n0.0,1.0\n")
+        lines = []
+
+        reports = batch.run_batch(
+            root, tmp_path / "out", workers=1, progress=lines.append
+        )
+
+        failed = [r for r in reports if "error" in r]
+        assert [os.path.basename(r["path"]) for r in failed] == ["broken.csv"]
+        assert any("failed" in line for line in lines)
+        assert "(1 failed)" in lines[-1]
+
+    def test_no_recordings(self, tmp_path):
+        lines = []
+        assert batch.run_batch(tmp_path, tmp_path, progress=lines.append) == []
+        assert "no recordings" in lines[0]
+
+    def test_main_exit_status(self, sessions, tmp_path, capsys):
+        root, _ = sessions
+        status = batch.main([str(root), str(tmp_path / "out"), "--workers=1"])
+        assert status == 0
+        assert "[4/4]" in capsys.readouterr().out
+
+
+class TestResume:
+    def test_rerun_skips_finished_files(self, sessions, tmp_path):
+        root, _ = sessions
+        out = tmp_path / "out"
+        batch.run_batch(root, out, workers=1, progress=lambda _: None)
+        lines = []
+
+        reports = batch.run_batch(root, out, workers=1, progress=lines.append)
+
+        assert all(report.get("skipped") for report in reports)
+        assert lines[0] == "skipping 4 files already done"
+
+    def test_changed_input_is_reprocessed(self, sessions, tmp_path):
+        root, paths = sessions
+        out = tmp_path / "out"
+        batch.run_batch(root, out, workers=1, progress=lambda _: None)
+        _write_session(paths[1], 1536, 9)
+
+        reports = batch.run_batch(root, out, workers=1, progress=print)
+
+        redone = [r["path"] for r in reports if not r.get("skipped")]
+        assert redone == [paths[1]]
+
+    def test_damaged_output_is_reprocessed(self, sessions, tmp_path):
+        root, paths = sessions
+        out = tmp_path / "out"
+        batch.run_batch(root, out, workers=1, progress=lambda _: None)
+        bands_path, _ = batch.output_paths(paths[0], root, out)
+        with open(bands_path, "a") as file:
+            file.write("garbage\n")
+
+        reports = batch.run_batch(root, out, workers=1, progress=print)
+
+        redone = [r["path"] for r in reports if not r.get("skipped")]
+        assert redone == [paths[0]]
+        expected = data_processing.process_csv(paths[0], sinks=[])
+        pd.testing.assert_frame_equal(
+            pd.read_csv(bands_path), expected["frequency_data"]
+        )
+
+    def test_method_change_reprocesses(self, sessions, tmp_path):
+        root, _ = sessions
+        out = tmp_path / "out"
+        batch.run_batch(root, out, workers=1, progress=lambda _: None)
+        reports = batch.run_batch(
+            root, out, workers=1, method="welch", progress=print
+        )
+        assert not any(r.get("skipped") for r in reports)
+
+    def test_dtype_change_reprocesses(self, sessions, tmp_path):
+        root, _ = sessions
+        out = tmp_path / "out"
+        batch.run_batch(root, out, workers=1, progress=lambda _: None)
+        reports = batch.run_batch(
+            root, out, workers=1, progress=print, dtype="float32"
+        )
+        assert not any(r.get("skipped") for r in reports)
+
+    @pytest.mark.parametrize("suffix", [".csv", ".nsrec"])
+    def test_interrupted_file_resumes_from_last_chunk(self, tmp_path, suffix):
+        path = _write_session(str(tmp_path / "long.csv"), 256 * 40, 4)
+        if suffix == ".nsrec":
+            path = recording.convert_csv(path, dtype="f8")
+        out = str(tmp_path / "out")
+        real = spectral.band_power
+        done = []
+
+        def crash_on_third_chunk(*args, **kwargs):
+            if len(done) == 2:
+                raise KeyboardInterrupt("preempted")
+            done.append(len(real(*args, **kwargs)))
+            return real(*args, **kwargs)
+
+        with mock.patch("spectral.band_power", wraps=real) as uninterrupted:
+            batch.process_file(
+                path, str(tmp_path), str(tmp_path / "ref"), chunk_size=1024
+            )
+        with mock.patch("spectral.band_power", crash_on_third_chunk):
+            with pytest.raises(KeyboardInterrupt):
+                batch.process_file(path, str(tmp_path), out, chunk_size=1024)
+
+        resumed = []
+
+        def count_windows(*args, **kwargs):
+            resumed.append(len(real(*args, **kwargs)))
+            return real(*args, **kwargs)
+
+        with mock.patch("spectral.band_power", count_windows):
+            report = batch.process_file(
+                path, str(tmp_path), out, chunk_size=1024
+            )
+
+        # only the windows after the last checkpoint are recomputed
+        assert report["resumed_windows"] == sum(done)
+        assert sum(resumed) == report["rows"] - sum(done)
+        assert uninterrupted.call_count > 2
+
+        bands_path, _ = batch.output_paths(path, str(tmp_path), out)
+        expected = data_processing.process_csv(
+            str(tmp_path / "long.csv"), sinks=[]
+        )
+        pd.testing.assert_frame_equal(
+            pd.read_csv(bands_path), expected["frequency_data"]
+        )
+        assert not os.path.exists(bands_path + batch.CHECKPOINT_SUFFIX)
+        assert not os.path.exists(bands_path + batch.PARTIAL_SUFFIX)
+
+    def test_stale_checkpoint_is_ignored(self, tmp_path):
+        path = _write_session(str(tmp_path / "s.csv"), 2048, 5)
+        out = str(tmp_path / "out")
+        bands_path, _ = batch.output_paths(path, str(tmp_path), out)
+        os.makedirs(out)
+        with open(bands_path + batch.CHECKPOINT_SUFFIX, "w") as file:
+            file.write('{"source": {"size": 1}, "windows": 5}')
+
+        report = batch.process_file(path, str(tmp_path), out)
+
+        assert report["resumed_windows"] == 0
+        expected = data_processing.process_csv(path, sinks=[])
+        pd.testing.assert_frame_equal(
+            pd.read_csv(bands_path), expected["frequency_data"]
+        )
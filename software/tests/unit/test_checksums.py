@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from checksums import (
+    CHECKSUMS,
+    Checksum,
+    Crc8Checksum,
+    XorChecksum,
+    crc8_table,
+    get_checksum,
+)
+
+
+class TestCrc8:
+    def test_check_value(self):
+        assert Crc8Checksum().compute(b"123456789") == 0xF4
+
+    def test_matches_crcmod(self):
+        crcmod = pytest.importorskip("crcmod.predefined")
+        reference = crcmod.mkPredefinedCrcFun("crc-8")
+        data = bytes(range(256)) * 3
+        for end in (0, 1, 7, 100, len(data)):
+            assert Crc8Checksum().compute(data[:end]) == reference(data[:end])
+
+    def test_table_entries(self):
+        table = crc8_table()
+        assert table.dtype == np.uint8
+        assert table[0] == 0
+        assert table[1] == 0x07
+        assert table[0x80] == 0x89
+
+    def test_detects_single_bit_errors(self):
+        crc = Crc8Checksum()
+        data = bytearray(b"\x09\x01\x12\x34\x56\x78\x9a\xbc\xde\xf0")
+        good = crc.compute(data)
+        for index in range(len(data)):
+            for bit in range(8):
+                data[index] ^= 1 << bit
+                assert crc.compute(data) != good
+                data[index] ^= 1 << bit
+
+
+class TestBatch:
+    @pytest.mark.parametrize("name", sorted(CHECKSUMS))
+    @pytest.mark.parametrize(
+        "columns",
+        [slice(2, -1), slice(3, -1), slice(0, 1), slice(None, None, 2)],
+    )
+    def test_batch_matches_scalar(self, name, columns):
+        checksum = get_checksum(name)
+        rows = np.random.default_rng(0).integers(
+            0, 256, size=(200, 13), dtype=np.uint8
+        )
+        covered = rows[:, columns]  # strided, as packets are checked
+        expected = [checksum.compute(row.tobytes()) for row in covered]
+        result = checksum.compute_batch(covered)
+        assert result.dtype == np.uint8
+        assert result.tolist() == expected
+
+    @pytest.mark.parametrize("name", sorted(CHECKSUMS))
+    def test_empty_batch(self, name):
+        rows = np.empty((0, 9), dtype=np.uint8)
+        assert get_checksum(name).compute_batch(rows).shape == (0,)
+
+    def test_xor_batch_leaves_input_untouched(self):
+        rows = np.arange(24, dtype=np.uint8).reshape(3, 8)
+        before = rows.copy()
+        XorChecksum().compute_batch(rows)
+        np.testing.assert_array_equal(rows, before)
+
+
+class TestGetChecksum:
+    def test_registered_names(self):
+        assert isinstance(get_checksum("xor"), XorChecksum)
+        assert isinstance(get_checksum("crc8"), Crc8Checksum)
+
+    def test_unknown_name(self):
+        with pytest.raises(ValueError):
+            get_checksum("crc32")
+
+    def test_subclass_must_implement_both_forms(self):
+        class ScalarOnly(Checksum):
+            def compute(self, data):
+                return 0
+
+        with pytest.raises(TypeError):
+            ScalarOnly()
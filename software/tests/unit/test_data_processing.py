@@ -2,7 +2,15 @@ import numpy as np
 import pandas as pd
 import pytest
 
-from data_processing import get_data, get_stats, transform_to_hz
+from data_processing import (
+    get_data,
+    get_stats,
+    read_csv_chunks,
+    transform_csv_to_hz,
+    transform_to_hz,
+    transform_to_hz_incremental,
+)
+from spectral import get_plan
 
 # get_data()
 # Unit tests for the data_processing module.
@@ -49,6 +57,28 @@ def test_transform_to_hz_valid():
     ]
 
 
+def test_transform_to_hz_with_gamma_plan():
+    fake_data = pd.DataFrame(
+        {
+            "timestamp": np.arange(256, dtype=float),
+            "ch1": np.random.rand(256),
+            "ch2": np.random.rand(256),
+            "ch3": np.random.rand(256),
+            "ch4": np.random.rand(256),
+        }
+    )
+
+    result = transform_to_hz(fake_data, get_plan(include_gamma=True))
+    assert list(result.columns) == [
+        "timestamp",
+        "delta",
+        "theta",
+        "alpha",
+        "beta",
+        "gamma",
+    ]
+
+
 def test_transform_to_hz_small_input():
     # Less than 256 rows → should return empty DataFrame
     small_data = pd.DataFrame(
@@ -65,11 +95,116 @@ def test_transform_to_hz_small_input():
     assert result.empty
 
 
+def test_transform_to_hz_timestamps_are_window_starts():
+    n = 640
+    fake_data = pd.DataFrame(
+        {
+            "timestamp": np.arange(n, dtype=float) * 0.5,
+            "ch1": np.random.rand(n),
+            "ch2": np.random.rand(n),
+            "ch3": np.random.rand(n),
+            "ch4": np.random.rand(n),
+        }
+    )
+
+    result = transform_to_hz(fake_data)
+    assert result["timestamp"].tolist() == [0.0, 64.0, 128.0, 192.0]
+
+
 def test_transform_to_hz_invalid_input():
     with pytest.raises(Exception):
         transform_to_hz("not a dataframe")
 
 
+def test_transform_to_hz_incremental_matches_fft_at_hops():
+    n = 1024
+    fake_data = pd.DataFrame(
+        {
+            "timestamp": np.arange(n, dtype=float),
+            "ch1": np.random.rand(n),
+            "ch2": np.random.rand(n),
+            "ch3": np.random.rand(n),
+            "ch4": np.random.rand(n),
+        }
+    )
+
+    result = transform_to_hz_incremental(fake_data, update_every=32)
+    expected = transform_to_hz(fake_data)
+
+    assert len(result) == (n - 256) // 32 + 1
+    pd.testing.assert_frame_equal(
+        result.iloc[::4].reset_index(drop=True), expected, rtol=1e-9
+    )
+
+
+def test_transform_to_hz_incremental_invalid_input():
+    with pytest.raises(TypeError):
+        transform_to_hz_incremental("not a dataframe")
+
+
+def _write_recording(tmp_path, n):
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame(
+        rng.uniform(-100, 100, size=(n, 5)),
+        columns=["ch1", "ch2", "ch3", "ch4", "ch5"],
+    )
+    df.insert(0, "timestamp", 1760485177.5 + np.arange(n) / 256)
+    path = tmp_path / "recording.csv"
+    df.to_csv(path, index=False)
+    return path, pd.read_csv(path)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 100, 255, 256, 384, 1000, 5000])
+def test_transform_csv_to_hz_matches_whole_file(tmp_path, chunk_size):
+    path, df = _write_recording(tmp_path, 2000)
+
+    result = transform_csv_to_hz(path, chunk_size=chunk_size)
+    pd.testing.assert_frame_equal(result, transform_to_hz(df), rtol=0)
+
+
+def test_transform_csv_to_hz_matches_whole_file_welch(tmp_path):
+    path, df = _write_recording(tmp_path, 1500)
+
+    result = transform_csv_to_hz(path, method="welch", chunk_size=300)
+    expected = transform_to_hz(df, method="welch")
+    pd.testing.assert_frame_equal(result, expected, rtol=0)
+
+
+def test_transform_csv_to_hz_short_file(tmp_path):
+    path, _ = _write_recording(tmp_path, 100)
+
+    result = transform_csv_to_hz(path, chunk_size=32)
+    assert result.empty
+    assert list(result.columns) == ["timestamp", *get_plan().band_names]
+
+
+def test_read_csv_chunks_carries_window_minus_hop(tmp_path):
+    path, df = _write_recording(tmp_path, 1024)
+
+    blocks = list(read_csv_chunks(path, chunk_size=512))
+    starts = [timestamps[0] for timestamps, _ in blocks]
+    # the second block starts window - hop samples before its chunk
+    assert starts == [df["timestamp"][0], df["timestamp"][512 - 128]]
+    assert all(len(samples) <= 512 + 128 for _, samples in blocks)
+
+
+@pytest.mark.parametrize("start", [128, 512, 640, 1024])
+def test_read_csv_chunks_resumes_across_chunks(tmp_path, start):
+    path, df = _write_recording(tmp_path, 1536)
+
+    resumed = list(read_csv_chunks(path, chunk_size=256, start=start))
+    timestamps = np.concatenate([t for t, _ in resumed])
+    assert timestamps[0] == df["timestamp"][start]
+    assert timestamps[-1] == df["timestamp"].iloc[-1]
+
+
+def test_read_csv_chunks_invalid_chunk_size(tmp_path):
+    path, _ = _write_recording(tmp_path, 300)
+
+    with pytest.raises(ValueError):
+        next(read_csv_chunks(path, chunk_size=0))
+
+
 # get_stats()
 
 
@@ -99,6 +234,21 @@ def test_get_stats_valid():
         assert key in result
 
 
+def test_get_stats_skips_missing_values():
+    fake_data = pd.DataFrame(
+        {"alpha": [1.0, np.nan, 3.0, 4.0], "beta": [4.0, 5.0, 6.0, 7.0]}
+    )
+
+    result = get_stats(fake_data)
+    for key in ["mean", "median", "range", "variance", "std_dev", "iqr"]:
+        assert not result[key].isna().any(), key
+    assert result["median"]["alpha"] == 3.0
+    assert result["mean"]["alpha"] == pytest.approx(fake_data["alpha"].mean())
+    assert result["variance"]["alpha"] == pytest.approx(
+        fake_data["alpha"].var()
+    )
+
+
 def test_get_stats_empty():
     empty_df = pd.DataFrame(columns=["alpha", "beta", "theta", "delta"])
     result = get_stats(empty_df)
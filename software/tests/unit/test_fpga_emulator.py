@@ -0,0 +1,114 @@
+import os
+import struct
+import time
+
+import pytest
+
+import transmission
+from fpga_emulator import FPGAEmulator, PacketParser
+
+
+def _packet(alpha, beta, theta, delta, include_len=True):
+    """Builds a packet as EEG_Packet_Parser.sv expects it."""
+    payload = struct.pack(">HHHH", alpha, beta, theta, delta)
+    checksum = transmission.xor_checksum(payload)
+    if include_len:
+        checksum ^= transmission.PAYLOAD_LENGTH
+    return bytes([0xAA, 0x55, 0x08]) + payload + bytes([checksum])
+
+
+class TestPacketParser:
+    def test_good_packet(self):
+        parser = PacketParser()
+        assert parser.feed(_packet(1, 2, 3, 4)) == 1
+        assert parser.values == (1, 2, 3, 4)
+        assert parser.counters()["checksum_errors"] == 0
+
+    def test_checksum_starts_from_len(self):
+        parser = PacketParser()
+        parser.feed(_packet(1, 2, 3, 4, include_len=False))
+        assert parser.packets == 0
+        assert parser.checksum_errors == 1
+
+    def test_accepts_default_protocol(self):
+        parser = PacketParser()
+        row = {"alpha": 10, "beta": 20, "theta": 30, "delta": 40}
+        assert parser.feed(transmission.df_to_packet(row)) == 1
+        assert parser.values == (10, 20, 30, 40)
+
+    def test_rejects_payload_only_protocol(self):
+        row = {"alpha": 10, "beta": 20, "theta": 30, "delta": 40}
+        packet = transmission.df_to_packet(row, version=0)
+        assert PacketParser().feed(packet) == 0
+        assert PacketParser(include_len=False).feed(packet) == 1
+
+    def test_packet_split_across_reads(self):
+        parser = PacketParser()
+        packet = _packet(500, 600, 700, 800)
+        for byte in packet:
+            parser.feed(bytes([byte]))
+        assert parser.packets == 1
+        assert parser.bytes == len(packet)
+
+    def test_resyncs_after_garbage(self):
+        parser = PacketParser()
+        good = _packet(1, 2, 3, 4)
+        parser.feed(b"\x01\x02\x03" + good + b"\x07" + good)
+        counters = parser.counters()
+        assert counters["packets"] == 2
+        assert counters["resyncs"] == 2
+        assert counters["skipped"] == 4
+
+    def test_repeated_sync1_is_not_lost(self):
+        parser = PacketParser()
+        assert parser.feed(b"\xaa" + _packet(1, 2, 3, 4)) == 1
+
+    def test_bad_length(self):
+        parser = PacketParser()
+        parser.feed(b"\xaa\x55\x09" + _packet(1, 2, 3, 4))
+        assert parser.length_errors == 1
+        assert parser.packets == 1
+
+
+@pytest.mark.skipif(not hasattr(os, "openpty"), reason="needs a pty")
+class TestFPGAEmulator:
+    def test_counts_packets_written_to_port(self):
+        with FPGAEmulator(baudrate=None) as fpga:
+            fd = os.open(fpga.port, os.O_WRONLY | os.O_NOCTTY)
+            os.write(fd, _packet(1, 2, 3, 4) * 50 + b"\x00")
+            os.close(fd)
+            assert fpga.wait_for_bytes(601)
+            stats = fpga.stats()
+        assert stats["packets"] == 50
+        assert stats["resyncs"] == 1
+
+    def test_transmit_through_pyserial(self):
+        serial = pytest.importorskip("serial")
+        pd = pytest.importorskip("pandas")
+
+        df = pd.DataFrame(
+            [[100 * i, 200, 300, 400] for i in range(20)],
+            columns=list(transmission.BAND_ORDER),
+        )
+        with FPGAEmulator(baudrate=None) as fpga:
+            with serial.Serial(fpga.port, 115200) as ser:
+                transmission.transmit(df, ser)
+            assert fpga.wait_for_bytes(20 * transmission.PACKET_SIZE)
+            assert fpga.stats()["packets"] == 20
+            assert fpga.parser.values == (1900, 200, 300, 400)
+
+    def test_paced_to_baud_rate(self):
+        with FPGAEmulator(baudrate=9600) as fpga:
+            fd = os.open(fpga.port, os.O_WRONLY | os.O_NOCTTY)
+            start = time.perf_counter()
+            os.write(fd, _packet(1, 2, 3, 4) * 16)  # 192 bytes = 0.2 s
+            assert fpga.wait_for_bytes(192)
+            elapsed = time.perf_counter() - start
+            os.close(fd)
+            stats = fpga.stats()
+        assert elapsed >= 0.15
+        assert stats["bytes_per_second"] == pytest.approx(960, rel=0.1)
+
+    def test_rejects_bad_baudrate(self):
+        with pytest.raises(ValueError):
+            FPGAEmulator(baudrate=0)
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import lsl_replay
+import recording
+
+
+class _ListOutlet:
+    """pylsl.StreamOutlet stand-in that keeps a copy of every chunk."""
+
+    def __init__(self, stop_after=None):
+        self.chunks = []
+        self.stop_after = stop_after
+
+    def push_chunk(self, samples):
+        if self.stop_after is not None and len(self.chunks) >= self.stop_after:
+            raise KeyboardInterrupt
+        self.chunks.append(np.array(samples))
+
+    @property
+    def samples(self):
+        return np.concatenate(self.chunks)
+
+
+@pytest.fixture
+def session():
+    rng = np.random.default_rng(0)
+    return rng.uniform(-100, 100, size=(300, 4)).astype(np.float32)
+
+
+class TestLoadSession:
+    def test_csv_drops_timestamp(self, tmp_path, session):
+        path = tmp_path / "session.csv"
+        frame = pd.DataFrame(session, columns=["ch1", "ch2", "ch3", "ch4"])
+        frame.insert(0, "timestamp", np.arange(len(session)) / 256)
+        frame.to_csv(path, index=False)
+
+        samples, channels, sampling_rate = lsl_replay.load_session(path, 200)
+        assert channels == ("ch1", "ch2", "ch3", "ch4")
+        assert sampling_rate == 200
+        assert samples.dtype == np.float32
+        np.testing.assert_allclose(samples, session, rtol=1e-6)
+
+    def test_recording_keeps_its_rate(self, tmp_path, session):
+        path = tmp_path / "session.nsrec"
+        recording.save(path, np.arange(300.0), session, "abcd", 250)
+
+        samples, channels, sampling_rate = lsl_replay.load_session(path)
+        assert channels == ("a", "b", "c", "d")
+        assert sampling_rate == 250
+        np.testing.assert_array_equal(samples, session)
+
+    def test_rejects_empty_session(self, tmp_path):
+        path = tmp_path / "empty.csv"
+        pd.DataFrame(columns=["timestamp", "ch1"]).to_csv(path, index=False)
+        with pytest.raises(ValueError):
+            lsl_replay.load_session(path)
+
+
+class TestReplay:
+    def test_plays_session_once(self, session):
+        outlet = _ListOutlet()
+        report = lsl_replay.replay(session, 256, [outlet], speed=0)
+        assert report["samples"] == len(session)
+        assert all(
+            len(chunk) <= lsl_replay.CHUNK_SIZE for chunk in outlet.chunks
+        )
+        np.testing.assert_array_equal(outlet.samples, session)
+
+    def test_fan_out_starts_at_offsets(self, session):
+        outlets = [_ListOutlet() for _ in range(3)]
+        lsl_replay.replay(session, 256, outlets, speed=0, loops=2)
+        for k, outlet in enumerate(outlets):
+            expected = np.roll(np.tile(session, (2, 1)), -k * 100, axis=0)
+            np.testing.assert_array_equal(outlet.samples, expected)
+
+    def test_session_shorter_than_a_chunk(self, session):
+        outlets = [_ListOutlet(), _ListOutlet()]
+        lsl_replay.replay(session[:5], 256, outlets, speed=0, loops=3)
+        np.testing.assert_array_equal(
+            outlets[1].samples, np.roll(np.tile(session[:5], (3, 1)), -2, 0)
+        )
+
+    def test_paces_to_real_time(self, session):
+        report = lsl_replay.replay(session[:128], 256, [_ListOutlet()], 4)
+        assert report["seconds"] >= 0.12
+        assert report["late_ticks"] == 0
+
+    def test_interrupt_stops_endless_replay(self, session):
+        outlet = _ListOutlet(stop_after=20)
+        report = lsl_replay.replay(session, 256, [outlet], speed=0, loops=0)
+        assert report["samples"] == 20 * lsl_replay.CHUNK_SIZE
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [{"speed": -1}, {"chunk_size": 0}, {"loops": -1}, {"outlets": []}],
+    )
+    def test_rejects_bad_arguments(self, session, kwargs):
+        arguments = {"outlets": [_ListOutlet()], **kwargs}
+        with pytest.raises(ValueError):
+            lsl_replay.replay(session, 256, **arguments)
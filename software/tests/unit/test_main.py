@@ -1,10 +1,11 @@
+import ctypes
 import sys
+import tracemalloc
 import types
 import unittest
 from unittest.mock import MagicMock, patch
 
 import numpy as np
-import pandas as pd
 
 
 # Stub pylsl before main.py is imported
@@ -12,15 +13,21 @@ def _make_pylsl_stub():
     pylsl = types.ModuleType("pylsl")
 
     class FakeInlet:
+        channel_count = 5
+        value_type = ctypes.c_double
+
         def __init__(self, samples):
-            # samples is a list of 4-element lists
+            # samples is a list of 5-element lists
             self._samples = iter(samples)
 
-        def pull_sample(self):
-            try:
-                return next(self._samples), None
-            except StopIteration:
+        def pull_chunk(self, timeout=0.0, max_samples=1024, dest_obj=None):
+            timestamps = []
+            for i, sample in zip(range(max_samples), self._samples):
+                dest_obj[i] = sample
+                timestamps.append(float(i))
+            if not timestamps:
                 raise KeyboardInterrupt  # stop the loop when samples run out
+            return None, timestamps
 
     def resolve_byprop(stream_type, stream_name):
         return [MagicMock()]  # return one fake stream
@@ -35,13 +42,14 @@ sys.modules.setdefault("pylsl", _make_pylsl_stub())
 
 # Now safe to import
 import main  # noqa: E402
+import spectral  # noqa: E402
 
 #  Helpers
 
 
 def _fake_samples(n: int) -> list:
-    """Generate n fake EEG samples, each with 5 channels (main.py slices
-    [:4])."""
+    """Generate n fake EEG samples, each with 5 channels (main.CHANNEL_MAP
+    takes the first 4)."""
     rng = np.random.default_rng(0)
     return rng.standard_normal((n, 5)).tolist()
 
@@ -55,358 +63,208 @@ def _make_fake_ser():
 #  Tests
 
 #  patch target helper
-# main.py uses "from pylsl import StreamInlet, resolve_byprop" so the names
-# live directly on the main module, not under main.pylsl.
-# All other dependencies (data_processing, transmission) are imported as
-# modules, so patches use "main.data_processing.X" and "main.transmission.X".
+# main.py imports "from pylsl import StreamInlet, resolve_byprop" inside
+# connect_and_process, so the names are patched on the pylsl module itself.
+# transmission is imported at module level, so patches use
+# "main.transmission.X". The loop packs every result with a reused
+# PacketEncoder, so packet patches replace PacketEncoder.encode.
 
 
 def _patch_inlet(samples):
-    """Patch main.StreamInlet to return a _SampleInlet for the given
+    """Patch pylsl.StreamInlet to return a _SampleInlet for the given
     samples."""
     return patch(
-        "main.StreamInlet", side_effect=lambda _: _SampleInlet(samples)
+        "pylsl.StreamInlet", side_effect=lambda _: _SampleInlet(samples)
     )
 
 
 def _patch_resolve():
-    """Patch main.resolve_byprop to return one fake stream."""
-    return patch("main.resolve_byprop", return_value=[MagicMock()])
+    """Patch pylsl.resolve_byprop to return one fake stream."""
+    return patch("pylsl.resolve_byprop", return_value=[MagicMock()])
 
 
-def _patch_fft(return_value=None):
-    rv = (
-        pd.DataFrame(
-            [{"timestamp": 1, "alpha": 1, "beta": 2, "theta": 3, "delta": 4}]
-        )
-        if return_value is None
-        else return_value
+def _patch_packet(return_value=b"\x00" * 12):
+    return patch(
+        "main.transmission.PacketEncoder.encode", return_value=return_value
     )
-    return patch("main.data_processing.transform_to_hz", return_value=rv)
 
 
-def _patch_fft_side_effect(fn):
-    return patch("main.data_processing.transform_to_hz", side_effect=fn)
+def _capture_rows():
+    """Patch the packet encoder to record every band power row it receives,
+    keyed by band name."""
+    rows = []
+    band_names = spectral.get_plan().band_names
 
+    def capture(band_powers):
+        # the loop reuses one result array, so keep a copy of each row
+        rows.append(dict(zip(band_names, band_powers.tolist())))
+        return b"\x00" * 12
 
-def _patch_packet(return_value=b"\x00" * 12):
-    return patch("main.transmission.df_to_packet", return_value=return_value)
+    return rows, patch(
+        "main.transmission.PacketEncoder.encode", side_effect=capture
+    )
 
 
 class TestConnectAndProcessBuffering(unittest.TestCase):
-    """Tests that the buffer fills correctly and triggers at the right time."""
+    """Tests that the stream fills correctly and triggers at the right time."""
 
     def test_no_processing_before_256_samples(self):
-        """If fewer than 256 samples arrive, transform_to_hz is never
-        called."""
+        """If fewer than 256 samples arrive, no packet is ever built."""
         with (
             _patch_resolve(),
             _patch_inlet(_fake_samples(255)),
-            patch("main.data_processing.transform_to_hz") as mock_fft,
+            _patch_packet() as mock_packet,
         ):
             main.connect_and_process(_make_fake_ser())
-        mock_fft.assert_not_called()
+        mock_packet.assert_not_called()
 
     def test_processing_triggers_at_exactly_256_samples(self):
-        """transform_to_hz is called exactly once when 256 samples arrive."""
+        """One result is emitted when 256 samples arrive."""
         with (
             _patch_resolve(),
             _patch_inlet(_fake_samples(256)),
-            _patch_fft() as mock_fft,
-            _patch_packet(),
+            _patch_packet() as mock_packet,
         ):
             main.connect_and_process(_make_fake_ser())
-        mock_fft.assert_called_once()
+        mock_packet.assert_called_once()
 
     def test_processing_triggers_twice_for_384_samples(self):
-        """384 samples = first window at 256, then 128 remaining + 128 new =
-        second window.
-
-        transform_to_hz should be called twice.
-        """
+        """384 samples = first window at 256, then 128 retained + 128 new =
+        second window."""
         with (
             _patch_resolve(),
             _patch_inlet(_fake_samples(384)),
-            _patch_fft() as mock_fft,
-            _patch_packet(),
+            _patch_packet() as mock_packet,
         ):
             main.connect_and_process(_make_fake_ser())
-        self.assertEqual(mock_fft.call_count, 2)
+        self.assertEqual(mock_packet.call_count, 2)
 
     def test_processing_triggers_three_times_for_512_samples(self):
         """Three full windows in 512 samples."""
         with (
             _patch_resolve(),
             _patch_inlet(_fake_samples(512)),
-            _patch_fft() as mock_fft,
-            _patch_packet(),
+            _patch_packet() as mock_packet,
         ):
             main.connect_and_process(_make_fake_ser())
-        self.assertEqual(mock_fft.call_count, 3)
+        self.assertEqual(mock_packet.call_count, 3)
 
 
 class TestConnectAndProcessWindowShape(unittest.TestCase):
-    """Tests that transform_to_hz receives the right data shape."""
-
-    def test_fft_called_with_dataframe(self):
-        """transform_to_hz must receive a DataFrame, not a list."""
-        captured = {}
-
-        def capture_fft(df):
-            captured["arg"] = df
-            return pd.DataFrame(
-                [
-                    {
-                        "timestamp": 1,
-                        "alpha": 1,
-                        "beta": 2,
-                        "theta": 3,
-                        "delta": 4,
-                    }
-                ]
-            )
-
-        with (
-            _patch_resolve(),
-            _patch_inlet(_fake_samples(256)),
-            _patch_fft_side_effect(capture_fft),
-            _patch_packet(),
-        ):
-            main.connect_and_process(_make_fake_ser())
-
-        self.assertIn("arg", captured)
-        self.assertIsInstance(captured["arg"], pd.DataFrame)
-
-    def test_fft_receives_256_row_window(self):
-        """The DataFrame passed to transform_to_hz must have exactly 256
-        rows."""
-        captured = {}
-
-        def capture_fft(df):
-            captured["shape"] = df.shape
-            return pd.DataFrame(
-                [
-                    {
-                        "timestamp": 1,
-                        "alpha": 1,
-                        "beta": 2,
-                        "theta": 3,
-                        "delta": 4,
-                    }
-                ]
-            )
-
-        with (
-            _patch_resolve(),
-            _patch_inlet(_fake_samples(256)),
-            _patch_fft_side_effect(capture_fft),
-            _patch_packet(),
-        ):
-            main.connect_and_process(_make_fake_ser())
+    """Tests that each emitted row matches the batch FFT of its window."""
 
-        self.assertEqual(captured["shape"][0], 256)
-
-    def test_fft_receives_four_channel_columns(self):
-        """Window DataFrame must have exactly 4 columns (ch1–ch4)."""
-        captured = {}
-
-        def capture_fft(df):
-            captured["cols"] = list(df.columns)
-            return pd.DataFrame(
-                [
-                    {
-                        "timestamp": 1,
-                        "alpha": 1,
-                        "beta": 2,
-                        "theta": 3,
-                        "delta": 4,
-                    }
-                ]
-            )
+    def test_row_has_band_keys(self):
+        """Every row passed to the packet encoder is keyed by band name."""
+        rows, patch_packet = _capture_rows()
 
         with (
             _patch_resolve(),
             _patch_inlet(_fake_samples(256)),
-            _patch_fft_side_effect(capture_fft),
-            _patch_packet(),
+            patch_packet,
         ):
             main.connect_and_process(_make_fake_ser())
 
         self.assertListEqual(
-            captured["cols"], ["timestamp", "ch1", "ch2", "ch3", "ch4"]
+            list(rows[0].keys()), ["delta", "theta", "alpha", "beta"]
         )
 
-    def test_samples_sliced_to_four_channels(self):
-        """main.py does sample[:4] — fifth channel must not reach the
+    def test_row_matches_batch_band_power(self):
+        """The streamed result equals spectral.band_power on the same
         window."""
-        captured = {}
-
-        def capture_fft(df):
-            captured["ncols"] = df.shape[1]
-            return pd.DataFrame(
-                [
-                    {
-                        "timestamp": 1,
-                        "alpha": 1,
-                        "beta": 2,
-                        "theta": 3,
-                        "delta": 4,
-                    }
-                ]
-            )
+        samples = _fake_samples(256)
+        rows, patch_packet = _capture_rows()
+
+        with _patch_resolve(), _patch_inlet(samples), patch_packet:
+            main.connect_and_process(_make_fake_ser())
 
+        expected = spectral.band_power(np.asarray(samples)[:, :4])[0]
+        np.testing.assert_allclose(list(rows[0].values()), expected)
+
+    def test_unmapped_channels_are_ignored(self):
+        """Only the CHANNEL_MAP columns reach the stream — the fifth (AUX)
+        channel is ignored."""
+        samples = _fake_samples(256)
+        shifted = [s[:4] + [s[4] + 1.0] for s in samples]
+        rows, patch_packet = _capture_rows()
+        rows_shifted, patch_packet_shifted = _capture_rows()
+
+        with _patch_resolve(), _patch_inlet(samples), patch_packet:
+            main.connect_and_process(_make_fake_ser())
         with (
             _patch_resolve(),
-            _patch_inlet(_fake_samples(256)),
-            _patch_fft_side_effect(capture_fft),
-            _patch_packet(),
+            _patch_inlet(shifted),
+            patch_packet_shifted,
         ):
             main.connect_and_process(_make_fake_ser())
 
-        self.assertEqual(captured["ncols"], 5)
+        self.assertEqual(rows, rows_shifted)
 
 
 class TestConnectAndProcessOverlap(unittest.TestCase):
-    """Tests the 50% window overlap — buffer[:128] is kept after each
-    window."""
+    """Tests the 50% window overlap — the last 128 samples are kept after
+    each window."""
 
     def test_second_window_uses_overlap_from_first(self):
-        """After the first window (samples 0–255), the buffer keeps samples
+        """After the first window (samples 0–255), the stream keeps samples
         128–255.
 
-        The second window is samples 128–383. transform_to_hz called twice.
+        The second window is samples 128–383.
         """
-        call_count = {"n": 0}
-
-        def counting_fft(df):
-            call_count["n"] += 1
-            return pd.DataFrame(
-                [
-                    {
-                        "timestamp": 1,
-                        "alpha": 1,
-                        "beta": 2,
-                        "theta": 3,
-                        "delta": 4,
-                    }
-                ]
-            )
+        samples = _fake_samples(384)
+        rows, patch_packet = _capture_rows()
 
-        with (
-            _patch_resolve(),
-            _patch_inlet(_fake_samples(384)),
-            _patch_fft_side_effect(counting_fft),
-            _patch_packet(),
-        ):
+        with _patch_resolve(), _patch_inlet(samples), patch_packet:
             main.connect_and_process(_make_fake_ser())
 
         self.assertEqual(
-            call_count["n"],
-            2,
-            "Expected 2 windows with 50% overlap over 384 samples",
+            len(rows), 2, "Expected 2 windows with 50% overlap over 384"
         )
+        expected = spectral.band_power(np.asarray(samples)[128:, :4])[0]
+        np.testing.assert_allclose(list(rows[1].values()), expected)
 
     def test_buffer_not_fully_cleared_between_windows(self):
         """If the buffer were cleared completely (no overlap), only one window
-        would fire for 383 samples.
+        would fire for 384 samples.
 
-        Two windows means overlap is working.
+        383 samples is one short of the second window.
         """
-        call_count = {"n": 0}
-
-        def counting_fft(df):
-            call_count["n"] += 1
-            return pd.DataFrame(
-                [
-                    {
-                        "timestamp": 1,
-                        "alpha": 1,
-                        "beta": 2,
-                        "theta": 3,
-                        "delta": 4,
-                    }
-                ]
-            )
-
         with (
             _patch_resolve(),
             _patch_inlet(_fake_samples(383)),
-            _patch_fft_side_effect(counting_fft),
-            _patch_packet(),
+            _patch_packet() as mock_packet,
         ):
             main.connect_and_process(_make_fake_ser())
 
-        # 383 samples: first window at 256, then 255 in buffer — not enough for
+        # 383 samples: first window at 256, then 127 new — not enough for
         # second
-        self.assertEqual(call_count["n"], 1)
+        self.assertEqual(mock_packet.call_count, 1)
 
 
 class TestConnectAndProcessTransmission(unittest.TestCase):
     """Tests that packets are built and written to serial correctly."""
 
-    def test_ser_write_called_for_each_fft_row(self):
-        """ser.write() must be called once per row returned by
-        transform_to_hz."""
-        fft_output = pd.DataFrame(
-            [
-                {
-                    "timestamp": 1,
-                    "alpha": 1,
-                    "beta": 2,
-                    "theta": 3,
-                    "delta": 4,
-                },
-                {"delta": 5, "theta": 6, "alpha": 7, "beta": 8},
-            ]
-        )
+    def test_ser_write_called_once_per_window(self):
+        """ser.write() must be called once per emitted window."""
         ser = _make_fake_ser()
 
         with (
             _patch_resolve(),
-            _patch_inlet(_fake_samples(256)),
-            _patch_fft(return_value=fft_output),
+            _patch_inlet(_fake_samples(512)),
             _patch_packet(b"\xaa" * 12),
         ):
             main.connect_and_process(ser)
 
-        self.assertEqual(ser.write.call_count, 2)
-
-    def test_df_to_packet_called_for_each_row(self):
-        """df_to_packet must be called once per FFT output row."""
-        fft_output = pd.DataFrame(
-            [
-                {
-                    "timestamp": 1,
-                    "delta": 10,
-                    "theta": 20,
-                    "alpha": 30,
-                    "beta": 40,
-                }
-            ]
-        )
+        self.assertEqual(ser.write.call_count, 3)
 
-        with (
-            _patch_resolve(),
-            _patch_inlet(_fake_samples(256)),
-            _patch_fft(return_value=fft_output),
-            patch(
-                "main.transmission.df_to_packet", return_value=b"\x00" * 12
-            ) as mock_packet,
-        ):
-            main.connect_and_process(_make_fake_ser())
-
-        mock_packet.assert_called_once()
-
-    def test_packet_written_to_serial_is_from_df_to_packet(self):
-        """The bytes passed to ser.write() must come directly from
-        df_to_packet."""
+    def test_packet_written_to_serial_is_from_packet_encoder(self):
+        """The bytes passed to ser.write() must come directly from the
+        packet encoder."""
         expected_packet = b"\xaa\x55\x08" + b"\x00" * 8 + b"\xff"
         ser = _make_fake_ser()
 
         with (
             _patch_resolve(),
             _patch_inlet(_fake_samples(256)),
-            _patch_fft(),
             _patch_packet(expected_packet),
         ):
             main.connect_and_process(ser)
@@ -420,12 +278,201 @@ class TestConnectAndProcessTransmission(unittest.TestCase):
         with (
             _patch_resolve(),
             _patch_inlet(_fake_samples(100)),
-            patch("main.data_processing.transform_to_hz") as mock_fft,
+            _patch_packet() as mock_packet,
         ):
             main.connect_and_process(ser)
 
         ser.write.assert_not_called()
-        mock_fft.assert_not_called()
+        mock_packet.assert_not_called()
+
+
+class TestConnectAndProcessPackets(unittest.TestCase):
+    """Tests the packets the unpatched encoder writes to serial."""
+
+    def test_packets_match_df_to_packet(self):
+        samples = _fake_samples(512)
+        written = []
+        ser = _make_fake_ser()
+        ser.write.side_effect = lambda packet: written.append(bytes(packet))
+
+        with _patch_resolve(), _patch_inlet(samples):
+            main.connect_and_process(ser)
+
+        plan = spectral.get_plan()
+        powers = spectral.band_power(np.asarray(samples)[:, :4], plan)
+        expected = [
+            main.transmission.df_to_packet(dict(zip(plan.band_names, row)))
+            for row in powers
+        ]
+        self.assertEqual(written, expected)
+
+    def test_serial_writer_delivers_the_same_bytes(self):
+        import serial_writer
+
+        samples = _fake_samples(1024)
+        direct = []
+        ser = _make_fake_ser()
+        ser.write.side_effect = lambda data: direct.append(bytes(data))
+        with _patch_resolve(), _patch_inlet(samples):
+            main.connect_and_process(ser)
+
+        queued = []
+        ser = _make_fake_ser()
+        ser.write.side_effect = lambda data: queued.append(bytes(data))
+        with _patch_resolve(), _patch_inlet(samples):
+            with serial_writer.SerialWriter(ser) as uart:
+                main.connect_and_process(uart)
+
+        self.assertEqual(b"".join(queued), b"".join(direct))
+        self.assertEqual(uart.written, len(direct))
+        self.assertEqual(uart.dropped, 0)
+
+
+class TestChunkedAcquisition(unittest.TestCase):
+    """Tests pull_chunk acquisition, the channel map, and LSL timestamps."""
+
+    def _run(self, samples, **kwargs):
+        inlet = _SampleInlet(samples)
+        rows, patch_packet = _capture_rows()
+        with (
+            _patch_resolve(),
+            patch("pylsl.StreamInlet", side_effect=lambda _: inlet),
+            patch_packet,
+        ):
+            main.connect_and_process(_make_fake_ser(), **kwargs)
+        return inlet, [list(row.values()) for row in rows]
+
+    def test_pulls_in_chunks(self):
+        inlet, _ = self._run(_fake_samples(512))
+        self.assertEqual(inlet.pulls, 512 // main.MAX_CHUNK + 1)
+        self.assertEqual(inlet.max_samples, main.MAX_CHUNK)
+        self.assertEqual(inlet.timeout, main.PULL_TIMEOUT)
+
+    def test_chunk_size_does_not_change_rows(self):
+        samples = _fake_samples(700)
+        _, expected = self._run(samples)
+        for max_chunk in (1, 7, 128, 300):
+            _, rows = self._run(samples, max_chunk=max_chunk)
+            np.testing.assert_allclose(rows, expected)
+
+    def test_channel_map_selects_and_orders_columns(self):
+        samples = _fake_samples(512)
+        _, rows = self._run(samples, channel_map=(4, 3, 2, 1))
+        expected = spectral.band_power(np.asarray(samples)[:, [4, 3, 2, 1]])
+        np.testing.assert_allclose(rows, expected)
+
+    def test_rejects_channel_map_outside_stream(self):
+        with self.assertRaises(ValueError):
+            self._run(_fake_samples(10), channel_map=(0, 1, 2, 5))
+
+    def test_rejects_channel_map_of_wrong_length(self):
+        with self.assertRaises(ValueError):
+            self._run(_fake_samples(10), channel_map=(0, 1, 2))
+
+    def test_writer_receives_lsl_timestamps(self):
+        samples = _fake_samples(100)
+        writer = _ListWriter()
+        self._run(samples, max_chunk=16, writer=writer)
+
+        np.testing.assert_array_equal(
+            np.concatenate(writer.timestamps), 100.0 + np.arange(100) / 256
+        )
+        np.testing.assert_array_equal(
+            np.concatenate(writer.samples), np.asarray(samples)[:, :4]
+        )
+
+
+class TestSteadyStateAllocations(unittest.TestCase):
+    """Tests that the live loop allocates nothing per window once running,
+    and that the stats flush every band_stats.BUFFER_SIZE rows keeps memory
+    bounded."""
+
+    WARMUP = 256 + 128 * 50  # lets NumPy fill its small-buffer caches
+
+    def _measure(self, windows, ser=None):
+        samples = _fake_samples(self.WARMUP + 128 * windows)
+        inlet = _MeasuringInlet(samples, self.WARMUP)
+
+        tracemalloc.start()
+        try:
+            with (
+                _patch_resolve(),
+                patch("pylsl.StreamInlet", side_effect=lambda _: inlet),
+            ):
+                main.connect_and_process(ser or _NullSerial())
+        finally:
+            tracemalloc.stop()
+
+        return inlet
+
+    def test_no_allocations_per_window_between_flushes(self):
+        inlet = self._measure(400)  # 450 in total: below BUFFER_SIZE
+
+        # one float64 spectrum of one window alone would be 4 KB
+        self.assertLess(inlet.growth, 512)
+        self.assertLess(inlet.peak, 2048)
+
+    def test_serial_writer_allocates_nothing_per_window(self):
+        import serial_writer
+
+        with serial_writer.SerialWriter(_NullSerial()) as uart:
+            inlet = self._measure(400, uart)
+
+        self.assertEqual(uart.written, 451)  # 51 warmup windows + 400
+        self.assertLess(inlet.growth, 512)
+        self.assertLess(inlet.peak, 2048)
+
+    def test_memory_stays_bounded_across_flushes(self):
+        # each flush allocates transient blocks and replaces the t-digest
+        # centroids, whose number is capped by the compression
+        for windows in (1100, 3100):  # 2 and 6 flushes after warmup
+            inlet = self._measure(windows)
+            self.assertLess(inlet.growth, 8192, windows)
+            self.assertLess(inlet.peak, 65536, windows)
+
+
+class TestConnectAndProcessStats(unittest.TestCase):
+    """Tests the running statistics returned by the live loop."""
+
+    def test_returns_stats_over_every_window(self):
+        samples = _fake_samples(512)
+        rows, patch_packet = _capture_rows()
+
+        with _patch_resolve(), _patch_inlet(samples), patch_packet:
+            stats = main.connect_and_process(_make_fake_ser())
+
+        self.assertEqual(stats.count, 3)
+        expected = np.mean([list(r.values()) for r in rows], axis=0)
+        np.testing.assert_allclose(stats.mean, expected)
+
+
+class TestPrecision(unittest.TestCase):
+    """Tests selecting float32 band power through NEUROSYNC_DTYPE."""
+
+    def test_defaults_to_float64(self):
+        with patch.dict("os.environ", {}, clear=True):
+            self.assertEqual(main.get_plan().dtype, "float64")
+
+    def test_env_selects_float32(self):
+        with patch.dict("os.environ", {main.DTYPE_ENV: "float32"}):
+            self.assertEqual(main.get_plan().dtype, "float32")
+
+    def test_float32_rows_match_float64(self):
+        samples = _fake_samples(512)
+        rows64, patch_packet = _capture_rows()
+        with _patch_resolve(), _patch_inlet(samples), patch_packet:
+            main.connect_and_process(_make_fake_ser())
+
+        rows32, patch_packet = _capture_rows()
+        plan = main.spectral.get_plan(dtype="float32")
+        with _patch_resolve(), _patch_inlet(samples), patch_packet:
+            main.connect_and_process(_make_fake_ser(), plan)
+
+        np.testing.assert_allclose(
+            [list(r.values()) for r in rows32],
+            [list(r.values()) for r in rows64],
+            rtol=1e-5,
+        )
 
 
 class TestConnectAndProcessShutdown(unittest.TestCase):
@@ -444,33 +491,89 @@ class TestConnectAndProcessShutdown(unittest.TestCase):
                 )
 
     def test_partial_buffer_discarded_on_interrupt(self):
-        """Samples in a partial buffer (< 256) are discarded without
+        """Samples in a partial window (< 256) are discarded without
         processing."""
         with (
             _patch_resolve(),
             _patch_inlet(_fake_samples(200)),
-            patch("main.data_processing.transform_to_hz") as mock_fft,
+            _patch_packet() as mock_packet,
         ):
             main.connect_and_process(_make_fake_ser())
 
-        mock_fft.assert_not_called()
+        mock_packet.assert_not_called()
 
 
 #  _SampleInlet
-# A minimal LSL inlet stand-in. Returns one sample per pull_sample() call,
-# then raises KeyboardInterrupt to stop the while-True loop in main.py.
+# A minimal LSL inlet stand-in. Each pull_chunk() copies up to max_samples
+# samples into dest_obj, as liblsl does, then raises KeyboardInterrupt once
+# the samples run out to stop the while-True loop in main.py.
 
 
 class _SampleInlet:
-    def __init__(self, samples):
-        self._iter = iter(samples)
-
-    def pull_sample(self):
-        try:
-            return next(self._iter), None
-        except StopIteration:
+    channel_count = 5
+    value_type = ctypes.c_double
+
+    def __init__(self, samples, start_time=100.0):
+        self._samples = samples
+        self._start_time = start_time
+        self._pulled = 0
+        self.pulls = 0
+        self.timeout = self.max_samples = None
+
+    def pull_chunk(self, timeout=0.0, max_samples=1024, dest_obj=None):
+        self.pulls += 1
+        self.timeout, self.max_samples = timeout, max_samples
+        first = self._pulled
+        chunk = self._samples[first : first + max_samples]
+        if not chunk:
             raise KeyboardInterrupt
 
+        dest_obj[: len(chunk)] = chunk
+        self._pulled += len(chunk)
+        timestamps = [
+            self._start_time + (first + i) / 256 for i in range(len(chunk))
+        ]
+        return None, timestamps
+
+
+class _MeasuringInlet(_SampleInlet):
+    """Records traced memory between the end of warmup and the last sample,
+    so the fake inlet's own setup is not counted."""
+
+    def __init__(self, samples, warmup):
+        super().__init__(samples)
+        self._warmup = warmup
+        self._baseline = None
+        self.growth = self.peak = None
+
+    def pull_chunk(self, timeout=0.0, max_samples=1024, dest_obj=None):
+        if self._baseline is None and self._pulled >= self._warmup:
+            tracemalloc.reset_peak()
+            self._baseline = tracemalloc.get_traced_memory()[0]
+        if self._pulled == len(self._samples):
+            current, peak = tracemalloc.get_traced_memory()
+            self.growth = current - self._baseline
+            self.peak = peak - self._baseline
+        return super().pull_chunk(timeout, max_samples, dest_obj)
+
+
+class _ListWriter:
+    """recording.RecordingWriter stand-in that keeps copies of each block."""
+
+    def __init__(self):
+        self.timestamps, self.samples = [], []
+
+    def append(self, timestamps, samples):
+        self.timestamps.append(np.array(timestamps))
+        self.samples.append(np.array(samples))
+
+
+class _NullSerial:
+    """Serial stand-in whose write keeps nothing, unlike a MagicMock."""
+
+    def write(self, data):
+        return len(data)
+
 
 #  Run
 
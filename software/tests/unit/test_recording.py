@@ -0,0 +1,179 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_processing
+import recording
+import spectral
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 3000
+    df = pd.DataFrame(
+        rng.uniform(-100, 100, size=(n, 5)),
+        columns=["ch1", "ch2", "ch3", "ch4", "ch5"],
+    )
+    df.insert(0, "timestamp", 1760485177.5813348 + np.arange(n) / 256)
+    path = tmp_path / "session.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+class TestSaveAndLoad:
+    def test_round_trip_float64(self, tmp_path):
+        rng = np.random.default_rng(1)
+        samples = rng.standard_normal((500, 3))
+        timestamps = 1.7e9 + np.arange(500) / 256
+        path = tmp_path / "a.nsrec"
+        recording.save(
+            path, timestamps, samples, ["a", "b", "c"], 256, np.float64
+        )
+
+        rec = recording.load(path)
+        assert isinstance(rec.samples, np.memmap)
+        assert rec.samples.dtype == np.float64
+        assert rec.sampling_rate == 256
+        assert rec.channels == ("a", "b", "c")
+        np.testing.assert_array_equal(rec.samples, samples)
+        np.testing.assert_array_equal(rec.timestamps, timestamps)
+
+    def test_float32_keeps_timestamps_exact(self, tmp_path):
+        timestamps = 1760485177.5813348 + np.arange(100) / 256
+        samples = np.ones((100, 2))
+        path = tmp_path / "b.nsrec"
+        recording.save(path, timestamps, samples, ["x", "y"], 256)
+
+        rec = recording.load(path)
+        assert rec.samples.dtype == np.float32
+        np.testing.assert_array_equal(rec.timestamps, timestamps)
+
+    def test_blocks_are_aligned(self, tmp_path):
+        path = tmp_path / "c.nsrec"
+        recording.save(path, np.arange(7.0), np.ones((7, 3)), "xyz", 256)
+
+        rec = recording.load(path)
+        assert rec.samples.offset % recording.ALIGNMENT == 0
+        assert rec.timestamps.offset % recording.ALIGNMENT == 0
+
+    def test_empty_recording(self, tmp_path):
+        path = tmp_path / "d.nsrec"
+        recording.save(path, [], np.empty((0, 2)), ["x", "y"], 256)
+
+        rec = recording.load(path)
+        assert len(rec) == 0
+        assert rec.samples.shape == (0, 2)
+
+    def test_rejects_other_files(self, csv_file):
+        with pytest.raises(ValueError):
+            recording.load(csv_file)
+
+    def test_rejects_integer_samples(self, tmp_path):
+        with pytest.raises(ValueError):
+            recording.RecordingWriter(tmp_path / "e.nsrec", ["x"], 256, int)
+
+    def test_append_checks_shape(self, tmp_path):
+        with recording.RecordingWriter(tmp_path / "f.nsrec", "xy", 256) as w:
+            with pytest.raises(ValueError):
+                w.append(np.arange(3.0), np.ones((3, 3)))
+
+
+class TestSelect:
+    def test_adjacent_channels_are_a_view(self, csv_file):
+        rec = recording.load(recording.convert_csv(csv_file))
+        selected = rec.select(["ch2", "ch3"])
+        assert np.shares_memory(selected, rec.samples)
+        np.testing.assert_array_equal(selected, rec.samples[:, 1:3])
+
+    def test_reordered_channels(self, csv_file):
+        rec = recording.load(recording.convert_csv(csv_file))
+        np.testing.assert_array_equal(
+            rec.select(["ch3", "ch1"]), rec.samples[:, [2, 0]]
+        )
+
+    def test_unknown_channel(self, csv_file):
+        rec = recording.load(recording.convert_csv(csv_file))
+        with pytest.raises(KeyError):
+            rec.select(["ch9"])
+
+
+class TestConvertCsv:
+    def test_matches_csv_in_chunks(self, csv_file, tmp_path):
+        out = recording.convert_csv(
+            csv_file, tmp_path / "out.nsrec", dtype=np.float64, chunk_size=700
+        )
+        df = pd.read_csv(csv_file)
+
+        rec = recording.load(out)
+        assert rec.channels == ("ch1", "ch2", "ch3", "ch4", "ch5")
+        np.testing.assert_array_equal(rec.timestamps, df["timestamp"])
+        np.testing.assert_array_equal(rec.samples, df.iloc[:, 1:])
+
+    def test_default_path_uses_extension(self, csv_file):
+        out = recording.convert_csv(csv_file)
+        assert out.endswith(recording.EXTENSION)
+
+    def test_float32_is_half_the_size(self, csv_file, tmp_path):
+        f32 = recording.load(recording.convert_csv(csv_file))
+        f64 = recording.load(
+            recording.convert_csv(csv_file, tmp_path / "64.nsrec", 256, "f8")
+        )
+        assert f32.samples.nbytes * 2 == f64.samples.nbytes
+
+
+class TestTransformRecording:
+    def test_float64_matches_dataframe(self, csv_file, tmp_path):
+        out = recording.convert_csv(csv_file, tmp_path / "64.nsrec", 256, "f8")
+        expected = data_processing.transform_to_hz(pd.read_csv(csv_file))
+
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(data_processing, "CHUNK_SIZE", 500)  # several blocks
+            result = data_processing.transform_to_hz(recording.load(out))
+
+        pd.testing.assert_frame_equal(result, expected, rtol=0)
+
+    def test_float32_is_close_to_dataframe(self, csv_file):
+        rec = recording.load(recording.convert_csv(csv_file))
+        expected = data_processing.transform_to_hz(pd.read_csv(csv_file))
+
+        result = data_processing.transform_to_hz(rec)
+        pd.testing.assert_frame_equal(result, expected, rtol=1e-5)
+
+    def test_process_pipeline_accepts_recording(self, csv_file):
+        rec = recording.load(recording.convert_csv(csv_file))
+        result = data_processing.process_pipeline(rec, sinks=[])
+        assert len(result["frequency_data"]) == (len(rec) - 256) // 128 + 1
+
+    def test_default_plan_uses_recording_sampling_rate(
+        self, csv_file, tmp_path
+    ):
+        out = recording.convert_csv(csv_file, tmp_path / "512.nsrec", 512)
+        rec = recording.load(out)
+        expected = data_processing.transform_to_hz(
+            pd.read_csv(csv_file), spectral.get_plan(sampling_rate=512)
+        )
+        result = data_processing.process_pipeline(rec, sinks=[])
+        pd.testing.assert_frame_equal(
+            result["frequency_data"], expected, rtol=1e-5
+        )
+
+    def test_rejects_plan_at_another_sampling_rate(self, csv_file, tmp_path):
+        rec = recording.load(
+            recording.convert_csv(csv_file, tmp_path / "512.nsrec", 512)
+        )
+        with pytest.raises(ValueError):
+            data_processing.transform_to_hz(rec, spectral.get_plan())
+        with pytest.raises(ValueError):
+            next(data_processing.recording_blocks(rec, spectral.get_plan()))
+
+
+class TestWindowBlocks:
+    @pytest.mark.parametrize("n, block", [(255, 64), (256, 1), (3000, 500)])
+    def test_blocks_tile_every_window(self, n, block):
+        plan = spectral.get_plan()
+        starts = []
+        for start, stop in spectral.window_blocks(n, plan, block):
+            assert (stop - start - plan.window_size) % plan.step_size == 0
+            starts.extend(range(start, stop - plan.window_size + 1, 128))
+        assert starts == list(range(0, n - plan.window_size + 1, 128))
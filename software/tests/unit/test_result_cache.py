@@ -0,0 +1,184 @@
+import os
+import unittest.mock as mock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_processing
+import recording
+import spectral
+from result_cache import ResultCache
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 2048
+    df = pd.DataFrame(
+        rng.uniform(-100, 100, size=(n, 4)),
+        columns=["ch1", "ch2", "ch3", "ch4"],
+    )
+    df.insert(0, "timestamp", np.arange(n) / 256)
+    path = tmp_path / "session.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(tmp_path / "cache")
+
+
+def _count_transforms():
+    return mock.patch(
+        "data_processing.spectral.session_band_power",
+        wraps=spectral.session_band_power,
+    )
+
+
+class TestKey:
+    def test_same_input_same_key(self, cache, csv_file):
+        plan = spectral.get_plan()
+        assert cache.key(csv_file, plan, "welch") == cache.key(
+            str(csv_file), plan, "welch"
+        )
+
+    def test_config_changes_key(self, cache, csv_file):
+        plan = spectral.get_plan()
+        keys = {
+            cache.key(csv_file, plan, "periodogram"),
+            cache.key(csv_file, plan, "welch"),
+            cache.key(csv_file, plan.derive(step_size=64), "periodogram"),
+            cache.key(
+                csv_file, spectral.get_plan(include_gamma=True), "welch"
+            ),
+        }
+        assert len(keys) == 4
+
+    def test_file_contents_change_key(self, cache, csv_file):
+        plan = spectral.get_plan()
+        before = cache.key(csv_file, plan, "periodogram")
+        text = csv_file.read_text().replace("\n0.0,", "\n0.5,", 1)
+        csv_file.write_text(text)
+        os.utime(csv_file, ns=(0, os.stat(csv_file).st_mtime_ns + 10**9))
+        assert cache.key(csv_file, plan, "periodogram") != before
+
+    def test_dataframe_and_array_keys(self, cache, csv_file):
+        plan = spectral.get_plan()
+        df = pd.read_csv(csv_file)
+        assert cache.key(df, plan, "welch") == cache.key(
+            df.copy(), plan, "welch"
+        )
+        changed = df.copy()
+        changed.loc[0, "ch1"] += 1
+        assert cache.key(changed, plan, "welch") != cache.key(
+            df, plan, "welch"
+        )
+        assert cache.key(df.to_numpy(), plan, "welch")
+
+    def test_rejects_unknown_source(self, cache):
+        with pytest.raises(TypeError):
+            cache.key(42, spectral.get_plan(), "welch")
+
+
+class TestPipelineCache:
+    def test_repeat_run_skips_fft(self, cache, csv_file):
+        first = data_processing.process_csv(csv_file, sinks=[], cache=cache)
+        with _count_transforms() as band_power:
+            second = data_processing.process_csv(
+                csv_file, sinks=[], cache=cache
+            )
+        band_power.assert_not_called()
+
+        pd.testing.assert_frame_equal(
+            second["frequency_data"], first["frequency_data"]
+        )
+        for name, series in first["stats"].items():
+            pd.testing.assert_series_equal(second["stats"][name], series)
+
+    def test_config_change_recomputes(self, cache, csv_file):
+        data_processing.process_csv(csv_file, sinks=[], cache=cache)
+        with _count_transforms() as band_power:
+            data_processing.process_csv(
+                csv_file, method="welch", sinks=[], cache=cache
+            )
+        band_power.assert_called()
+
+    def test_dataframe_input(self, cache, csv_file):
+        df = pd.read_csv(csv_file)
+        first = data_processing.process_pipeline(df, sinks=[], cache=cache)
+        with _count_transforms() as band_power:
+            second = data_processing.process_pipeline(
+                df, sinks=[], cache=cache
+            )
+        band_power.assert_not_called()
+        pd.testing.assert_frame_equal(
+            second["frequency_data"], first["frequency_data"]
+        )
+
+    def test_recording_input(self, cache, csv_file):
+        rec = recording.load(recording.convert_csv(csv_file))
+        data_processing.process_pipeline(rec, sinks=[], cache=cache)
+        with _count_transforms() as band_power:
+            data_processing.process_pipeline(rec, sinks=[], cache=cache)
+        band_power.assert_not_called()
+
+    def test_empty_result_round_trips(self, cache, tmp_path):
+        path = tmp_path / "short.csv"
+        pd.DataFrame(
+            {
+                "timestamp": [0.0],
+                "ch1": [1],
+                "ch2": [1],
+                "ch3": [1],
+                "ch4": [1],
+            }
+        ).to_csv(path, index=False)
+
+        data_processing.process_csv(path, sinks=[], cache=cache)
+        result = data_processing.process_csv(path, sinks=[], cache=cache)
+        assert result["frequency_data"].empty
+        assert result["stats"] is None
+
+
+class TestEviction:
+    def test_size_cap_evicts_least_recently_used(self, tmp_path, csv_file):
+        cache = ResultCache(tmp_path / "cache")
+        plan = spectral.get_plan()
+        result = data_processing.process_csv(csv_file, sinks=[])
+        cache.put("a", result)
+        entry_size = cache.size()
+
+        small = ResultCache(tmp_path / "cache", max_bytes=2 * entry_size)
+        small.put("b", result)
+        os.utime(small._paths("a")[0], (1, 1))
+        os.utime(small._paths("b")[0], (2, 2))
+        assert small.get("a") is not None  # touching a makes b the oldest
+
+        small.put(small.key(csv_file, plan, "welch"), result)
+        assert small.get("b") is None
+        assert small.get("a") is not None
+        assert small.size() <= small.max_bytes
+
+    def test_entries_are_not_pickled(self, cache, csv_file):
+        data_processing.process_csv(csv_file, sinks=[], cache=cache)
+        (npz,) = [
+            name
+            for name in os.listdir(cache.directory)
+            if name.endswith("npz")
+        ]
+        with np.load(os.path.join(cache.directory, npz)) as arrays:
+            assert all(arrays[name].dtype != object for name in arrays.files)
+
+    def test_corrupt_entry_is_a_miss(self, cache):
+        arrays_path, meta_path = cache._paths("bad")
+        with open(meta_path, "w") as file:
+            file.write('{"columns": ["timestamp"], "stats": null}')
+        with open(arrays_path, "wb") as file:
+            file.write(b"not an npz")
+        assert cache.get("bad") is None
+
+    def test_invalid_size_cap(self, tmp_path):
+        with pytest.raises(ValueError):
+            ResultCache(tmp_path, max_bytes=0)
@@ -0,0 +1,214 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import transmission
+from serial_writer import (
+    BLOCK,
+    DROP_NEWEST,
+    DROP_OLDEST,
+    SerialWriter,
+)
+
+
+class _StallingSerial:
+    """serial.Serial stand-in whose write() waits until released."""
+
+    def __init__(self, stalled=True):
+        self.writes = []
+        self.entered = threading.Event()
+        self.released = threading.Event()
+        if not stalled:
+            self.released.set()
+
+    def write(self, data):
+        self.entered.set()
+        self.released.wait(5)
+        self.writes.append(bytes(data))
+        return len(data)
+
+
+def _stall(ser, writer):
+    """Parks the writer thread inside a write of b"first"."""
+    writer.write(b"first")
+    assert ser.entered.wait(5)
+
+
+class TestSerialWriter:
+    def test_writes_reach_the_port_in_order(self):
+        ser = _StallingSerial(stalled=False)
+        with SerialWriter(ser) as writer:
+            for i in range(100):
+                writer.write(bytes([i]))
+        assert b"".join(ser.writes) == bytes(range(100))
+        assert writer.written == 100
+        assert writer.bytes == 100
+
+    def test_coalesces_pending_writes(self):
+        ser = _StallingSerial()
+        writer = SerialWriter(ser)
+        _stall(ser, writer)
+        for i in range(10):
+            writer.write(bytes([i]))
+        assert writer.depth == 10
+        ser.released.set()
+        writer.close()
+        assert ser.writes == [b"first", bytes(range(10))]
+        assert writer.stats()["writes"] == 2
+
+    def test_copies_reused_buffers(self):
+        ser = _StallingSerial()
+        encoder = transmission.PacketEncoder()
+        writer = SerialWriter(ser)
+        _stall(ser, writer)
+        writer.write(encoder.encode([1.0, 2.0, 3.0, 4.0]))
+        writer.write(encoder.encode([5.0, 6.0, 7.0, 8.0]))
+        ser.released.set()
+        writer.close()
+        frames = transmission.PacketDecoder().feed(ser.writes[1])
+        assert frames == [(1, 2, 3, 4), (5, 6, 7, 8)]
+
+    def test_drop_oldest(self):
+        ser = _StallingSerial()
+        writer = SerialWriter(ser, maxsize=3, policy=DROP_OLDEST)
+        _stall(ser, writer)
+        start = time.perf_counter()
+        for i in range(10):
+            assert writer.write(bytes([i])) == 1
+        assert time.perf_counter() - start < 0.5  # never waits on the port
+        assert writer.depth == 3
+        assert writer.dropped == 7
+        ser.released.set()
+        writer.close()
+        assert ser.writes[-1] == bytes([7, 8, 9])
+
+    def test_drop_newest(self):
+        ser = _StallingSerial()
+        writer = SerialWriter(ser, maxsize=3, policy=DROP_NEWEST)
+        _stall(ser, writer)
+        accepted = [writer.write(bytes([i])) for i in range(10)]
+        assert accepted == [1, 1, 1] + [0] * 7
+        assert writer.dropped == 7
+        ser.released.set()
+        writer.close()
+        assert ser.writes[-1] == bytes([0, 1, 2])
+
+    def test_block_waits_for_room(self):
+        ser = _StallingSerial()
+        writer = SerialWriter(ser, maxsize=2, policy=BLOCK)
+        _stall(ser, writer)
+        writer.write(b"a")
+        writer.write(b"b")
+        producer = threading.Thread(target=writer.write, args=(b"c",))
+        producer.start()
+        producer.join(0.1)
+        assert producer.is_alive()  # waiting for room
+        ser.released.set()
+        producer.join(5)
+        writer.close()
+        assert b"".join(ser.writes) == b"firstabc"
+        assert writer.dropped == 0
+
+    def test_flush_and_stats(self):
+        ser = _StallingSerial()
+        writer = SerialWriter(ser)
+        _stall(ser, writer)
+        writer.write(b"12")
+        assert not writer.flush(timeout=0.05)
+        ser.released.set()
+        assert writer.flush(timeout=5)
+        stats = writer.stats()
+        writer.close()
+        assert stats == {
+            "depth": 0,
+            "max_depth": 1,
+            "queued": 2,
+            "dropped": 0,
+            "written": 2,
+            "writes": 2,
+            "bytes": 7,
+            "errors": 0,
+        }
+
+    def test_port_errors_are_recorded(self, capsys):
+        class _FailingSerial:
+            def write(self, data):
+                raise OSError("device unplugged")
+
+        with SerialWriter(_FailingSerial()) as writer:
+            writer.write(b"x")
+        assert [str(error) for error in writer.errors] == ["device unplugged"]
+        assert writer.written == 0
+        assert "device unplugged" in capsys.readouterr().out
+
+    def test_transmits_multi_row_frames(self):
+        df = pd.DataFrame(
+            {band: [1.0, 2.0, 3.0] for band in transmission.BAND_ORDER}
+        )
+        ser = _StallingSerial(stalled=False)
+        with SerialWriter(ser, buffer_size=16) as writer:
+            transmission.transmit(df, writer)
+            assert writer.flush(timeout=5)
+            transmission.transmit(df.iloc[:1], writer)
+        data = b"".join(ser.writes)
+        frames = transmission.PacketDecoder().feed(data)
+        assert frames == [(1,) * 4, (2,) * 4, (3,) * 4, (1,) * 4]
+        assert writer.written == 2
+        assert writer.buffer_size >= 3 * transmission.PACKET_SIZE
+
+    def test_drop_oldest_makes_room_in_bytes(self):
+        ser = _StallingSerial()
+        writer = SerialWriter(ser, policy=DROP_OLDEST, buffer_size=8)
+        _stall(ser, writer)
+        for data in (b"abc", b"def", b"gh", b"ijklm"):
+            writer.write(data)
+        assert writer.depth == 2
+        assert writer.dropped == 2
+        ser.released.set()
+        writer.close()
+        assert ser.writes[-1] == b"ghijklm"
+
+    def test_drop_newest_drops_a_write_that_does_not_fit(self):
+        ser = _StallingSerial()
+        writer = SerialWriter(ser, policy=DROP_NEWEST, buffer_size=8)
+        _stall(ser, writer)
+        assert writer.write(b"abcdef") == 6
+        assert writer.write(b"ghi") == 0
+        assert writer.write(b"gh") == 2
+        ser.released.set()
+        writer.close()
+        assert ser.writes[-1] == b"abcdefgh"
+
+    def test_slots_are_reused_around_the_ring(self):
+        ser = _StallingSerial()
+        writer = SerialWriter(ser, maxsize=3)
+        _stall(ser, writer)
+        writer.write(b"a")
+        writer.write(b"bc")
+        ser.released.set()
+        assert writer.flush(timeout=5)
+        ser.entered.clear()
+        ser.released.clear()
+        _stall(ser, writer)
+        for data in (b"de", b"f", b"ghi", b"jk"):  # wraps past the end
+            writer.write(data)
+        ser.released.set()
+        writer.close()
+        assert ser.writes == [b"first", b"abc", b"first", b"fghijk"]
+        assert writer.dropped == 1
+
+    def test_write_after_close(self):
+        writer = SerialWriter(_StallingSerial(stalled=False))
+        writer.close()
+        with pytest.raises(ValueError):
+            writer.write(b"x")
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [{"maxsize": 0}, {"buffer_size": 0}, {"policy": "drop-random"}],
+    )
+    def test_rejects_bad_arguments(self, kwargs):
+        with pytest.raises(ValueError):
+            SerialWriter(_StallingSerial(stalled=False), **kwargs)
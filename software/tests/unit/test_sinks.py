@@ -0,0 +1,209 @@
+import io
+import os
+import subprocess
+import sys
+import threading
+import unittest.mock as mock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_processing
+import sinks
+from sinks import (
+    FileSink,
+    NullSink,
+    PlotSink,
+    Sink,
+    SinkRunner,
+    StatsSink,
+    UartSink,
+    make_sink,
+)
+
+SRC = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "src")
+)
+
+
+@pytest.fixture
+def raw_df():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        rng.uniform(-100, 100, size=(512, 4)),
+        columns=["ch1", "ch2", "ch3", "ch4"],
+    )
+    df.insert(0, "timestamp", np.arange(512) / 256)
+    return df
+
+
+@pytest.fixture
+def result(raw_df):
+    return data_processing.process_pipeline(raw_df, sinks=[])
+
+
+class RecordingSink(Sink):
+    name = "recording"
+
+    def __init__(self, gate=None):
+        self.results = []
+        self.gate = gate
+
+    def emit(self, result):
+        if self.gate is not None:
+            self.gate.wait()
+        self.results.append(result)
+
+
+class TestMakeSink:
+    def test_builds_by_name(self):
+        assert isinstance(make_sink("none"), NullSink)
+        assert isinstance(make_sink("plot"), PlotSink)
+        assert isinstance(make_sink("stats"), StatsSink)
+
+    def test_passes_arguments(self):
+        ser = mock.MagicMock()
+        assert make_sink("uart", ser=ser).ser is ser
+
+    def test_builds_from_name_and_arguments(self, tmp_path):
+        path = tmp_path / "bands.csv"
+        assert make_sink(("file", {"path": path})).path == path
+
+    @pytest.mark.parametrize("name", ["uart", "file"])
+    def test_rejects_name_without_required_arguments(self, name):
+        with pytest.raises(ValueError, match="needs"):
+            make_sink(name)
+
+    def test_returns_instances_unchanged(self):
+        sink = NullSink()
+        assert make_sink(sink) is sink
+
+    def test_rejects_unknown_name(self):
+        with pytest.raises(ValueError):
+            make_sink("printer")
+
+    def test_subclass_without_emit_cannot_be_created(self):
+        class Incomplete(Sink):
+            name = "incomplete"
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+
+class TestSinks:
+    def test_file_sink_writes_header_once(self, result, tmp_path):
+        path = tmp_path / "bands.csv"
+        sink = FileSink(path)
+        sink.emit(result)
+        sink.emit(result)
+
+        written = pd.read_csv(path)
+        assert list(written.columns) == list(result["frequency_data"].columns)
+        assert len(written) == 2 * len(result["frequency_data"])
+
+    def test_stats_sink_prints_keys(self, result):
+        out = io.StringIO()
+        StatsSink(out).emit(result)
+        assert "STATS" in out.getvalue()
+        assert "mean" in out.getvalue()
+
+    def test_uart_sink_transmits_rows(self, result):
+        ser = mock.MagicMock()
+        UartSink(ser).emit(result)
+        (data,) = ser.write.call_args.args
+        assert len(data) == 12 * len(result["frequency_data"])
+
+    def test_plot_sink_runs_graphing_in_child_process(self, result):
+        with mock.patch("sinks.multiprocessing.get_context") as context:
+            PlotSink().emit(result)
+        process = context.return_value.Process
+        assert process.call_args.kwargs["target"] is sinks._plot
+        process.return_value.start.assert_called_once()
+
+
+class TestSinkRunner:
+    def test_flush_delivers_results(self, result):
+        sink = RecordingSink()
+        runner = SinkRunner()
+        runner.submit(result, [sink])
+        runner.flush()
+        assert sink.results == [result]
+
+    def test_submit_does_not_wait_for_sinks(self, result):
+        gate = threading.Event()
+        sink = RecordingSink(gate)
+        runner = SinkRunner()
+        runner.submit(result, [sink])
+        assert sink.results == []
+        gate.set()
+        runner.flush()
+        assert len(sink.results) == 1
+
+    def test_drops_oldest_when_full(self, result):
+        gate = threading.Event()
+        sink = RecordingSink(gate)
+        runner = SinkRunner(maxsize=2)
+        for i in range(6):
+            runner.submit({**result, "index": i}, [sink])
+        gate.set()
+        runner.flush()
+        assert runner.dropped > 0
+        assert sink.results[-1]["index"] == 5
+
+    def test_failing_sink_does_not_stop_others(self, result):
+        failing = mock.MagicMock(spec=Sink)
+        failing.name = "failing"
+        failing.emit.side_effect = OSError("disk full")
+        sink = RecordingSink()
+        runner = SinkRunner()
+        runner.submit(result, [failing, sink])
+        runner.flush()
+        assert len(sink.results) == 1
+        assert runner.errors[0][0] == "failing"
+
+
+class TestProcessPipelineSinks:
+    def test_named_sinks_receive_result(self, raw_df, tmp_path):
+        path = tmp_path / "bands.csv"
+        result = data_processing.process_pipeline(
+            raw_df, sinks=[FileSink(path)]
+        )
+        sinks.get_runner().flush()
+        assert len(pd.read_csv(path)) == len(result["frequency_data"])
+
+    def test_sinks_given_by_name_and_arguments(self, raw_df, tmp_path):
+        path = tmp_path / "bands.csv"
+        result = data_processing.process_pipeline(
+            raw_df, sinks=[("file", {"path": path})]
+        )
+        sinks.get_runner().flush()
+        assert len(pd.read_csv(path)) == len(result["frequency_data"])
+
+    @pytest.mark.parametrize("name", ["uart", "file"])
+    def test_name_missing_arguments_fails_early(self, raw_df, name):
+        with pytest.raises(ValueError, match="needs"):
+            data_processing.process_pipeline(raw_df, sinks=[name])
+
+    def test_headless_env_skips_plot(self, raw_df):
+        with (
+            mock.patch.dict("os.environ", {"NEUROSYNC_HEADLESS": "1"}),
+            mock.patch("sinks.PlotSink.emit") as emit,
+        ):
+            data_processing.process_pipeline(raw_df)
+            sinks.get_runner().flush()
+        emit.assert_not_called()
+
+    def test_headless_never_imports_matplotlib(self):
+        code = (
+            "import sys\n"
+            "import numpy as np, pandas as pd\n"
+            "import data_processing\n"
+            "df = pd.DataFrame(np.ones((512, 4)), "
+            "columns=['ch1', 'ch2', 'ch3', 'ch4'])\n"
+            "df.insert(0, 'timestamp', range(512))\n"
+            "data_processing.process_pipeline(df, sinks=['stats'])\n"
+            "assert 'matplotlib' not in sys.modules\n"
+        )
+        env = {**os.environ, "PYTHONPATH": SRC}
+        subprocess.run([sys.executable, "-c", code], env=env, check=True)
@@ -0,0 +1,303 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+from scipy.fft import fft, fftfreq
+from scipy.signal import welch as scipy_welch
+
+from spectral import (
+    BANDS,
+    PSD_METHODS,
+    STEP_SIZE,
+    WINDOW_SIZE,
+    band_power,
+    dpss_tapers,
+    get_plan,
+    multitaper,
+    periodogram,
+    recording_band_power,
+    session_band_power,
+    sliding_windows,
+    welch,
+    window_band_power,
+)
+
+
+def reference_band_power(signal, window_size=256, step_size=128):
+    """Per-window FFT loop that band_power must reproduce."""
+    rows = []
+    freqs = fftfreq(window_size, 1 / window_size)
+    for start in range(0, len(signal) - window_size + 1, step_size):
+        fft_vals = fft(signal[start : start + window_size], axis=0)
+        fft_vals = fft_vals / window_size
+        rows.append(
+            [
+                np.sum(abs(fft_vals[(freqs >= low) & (freqs < high)]) ** 2)
+                for low, high in BANDS.values()
+            ]
+        )
+    return np.array(rows).reshape(-1, len(BANDS))
+
+
+@pytest.fixture
+def signal():
+    rng = np.random.default_rng(0)
+    return rng.uniform(-100, 100, size=(1024, 4))
+
+
+class TestBandPlan:
+    def test_default_plan_matches_module_constants(self):
+        plan = get_plan()
+        assert plan.window_size == WINDOW_SIZE
+        assert plan.step_size == STEP_SIZE
+        assert plan.band_names == list(BANDS)
+        assert plan.channels == ("ch1", "ch2", "ch3", "ch4")
+
+    def test_equal_configs_share_one_instance(self):
+        assert get_plan() is get_plan(bands=dict(BANDS))
+
+    def test_different_configs_are_distinct(self):
+        assert get_plan() is not get_plan(step_size=64)
+
+    def test_tables_are_computed_once(self):
+        plan = get_plan()
+        assert plan.band_matrix is plan.band_matrix
+        assert plan.freqs is get_plan().freqs
+
+    def test_tables_are_read_only(self):
+        with pytest.raises(ValueError):
+            get_plan().band_matrix[0, 0] = 1.0
+
+    def test_matrix_shape_matches_one_sided_spectrum(self):
+        assert get_plan().band_matrix.shape == (129, len(BANDS))
+
+    def test_bands_do_not_overlap(self):
+        assert ((get_plan().band_matrix > 0).sum(axis=1) <= 1).all()
+
+    def test_delta_covers_bins_one_to_three(self):
+        assert get_plan().band_slices[0] == slice(1, 4)
+
+    def test_used_bins_span_delta_to_beta(self):
+        assert get_plan().bins.tolist() == list(range(1, 32))
+
+    def test_include_gamma_appends_band(self):
+        plan = get_plan(include_gamma=True)
+        assert plan.band_names == list(BANDS) + ["gamma"]
+        assert plan.band_slices[-1] == slice(32, 100)
+
+    def test_rectangular_window_keeps_legacy_scaling(self):
+        plan = get_plan()
+        assert plan.is_rectangular
+        assert plan.band_matrix[1, 0] == pytest.approx(1 / 256**2)
+
+    def test_hann_window_is_not_rectangular(self):
+        assert not get_plan(window="hann").is_rectangular
+
+    def test_rejects_step_larger_than_window(self):
+        with pytest.raises(ValueError):
+            get_plan(window_size=128, step_size=256)
+
+    def test_rejects_band_above_nyquist(self):
+        with pytest.raises(ValueError):
+            get_plan(bands={"gamma": (30, 200)})
+
+    def test_float32_tables(self):
+        plan = get_plan(window="hann", dtype=np.float32)
+        assert plan.dtype == "float32"
+        assert plan.coefficients.dtype == np.float32
+        assert plan.band_indicator.dtype == np.float32
+        assert plan.twiddle.dtype == np.complex64
+        assert plan.freqs.dtype == np.float64
+
+    def test_derived_plans_keep_dtype(self):
+        plan = get_plan(dtype="float32")
+        assert plan.welch_plan.dtype == "float32"
+        assert plan is not get_plan()
+
+    def test_rejects_integer_dtype(self):
+        with pytest.raises(ValueError):
+            get_plan(dtype="int16")
+
+
+class TestSlidingWindows:
+    def test_window_count(self, signal):
+        windows = sliding_windows(signal)
+        assert windows.shape == (7, 4, WINDOW_SIZE)
+
+    def test_windows_are_views(self, signal):
+        windows = sliding_windows(signal)
+        assert np.shares_memory(windows, signal)
+
+    def test_second_window_starts_at_step(self, signal):
+        windows = sliding_windows(signal)
+        np.testing.assert_array_equal(windows[1, :, 0], signal[STEP_SIZE, :])
+
+    def test_short_signal_returns_no_windows(self):
+        windows = sliding_windows(np.zeros((100, 4)))
+        assert windows.shape == (0, 4, WINDOW_SIZE)
+
+
+class TestBandPower:
+    def test_matches_per_window_fft(self, signal):
+        np.testing.assert_allclose(
+            band_power(signal), reference_band_power(signal), rtol=1e-10
+        )
+
+    def test_output_shape(self, signal):
+        assert band_power(signal).shape == (7, len(BANDS))
+
+    def test_short_signal_returns_empty(self):
+        assert band_power(np.zeros((255, 4))).shape == (0, len(BANDS))
+
+    def test_pure_alpha_tone_lands_in_alpha(self):
+        t = np.arange(256) / 256
+        tone = np.sin(2 * np.pi * 10 * t)
+        signal = np.column_stack([tone] * 4)
+        powers = band_power(signal)[0]
+        assert np.argmax(powers) == list(BANDS).index("alpha")
+
+    def test_custom_bands_change_columns(self, signal):
+        plan = get_plan(bands={"low": (1, 10), "high": (10, 40)})
+        powers = band_power(signal, plan)
+        assert powers.shape == (7, 2)
+
+    def test_hann_window_preserves_white_noise_power(self, signal):
+        flat = get_plan(bands={"all": (0, 128)})
+        hann = get_plan(bands={"all": (0, 128)}, window="hann")
+        ratio = band_power(signal, hann).sum() / band_power(signal, flat).sum()
+        assert ratio == pytest.approx(1.0, rel=0.1)
+
+    def test_uses_plan_step_size(self, signal):
+        plan = get_plan(step_size=64)
+        assert len(band_power(signal, plan)) == 13
+
+
+class TestSessionBandPower:
+    @pytest.fixture
+    def sessions(self):
+        rng = np.random.default_rng(3)
+        return rng.uniform(-100, 100, size=(5, 2048, 4))
+
+    @pytest.mark.parametrize("method", PSD_METHODS)
+    def test_matches_per_session_loop(self, sessions, method):
+        expected = np.stack([band_power(s, method=method) for s in sessions])
+        np.testing.assert_allclose(
+            session_band_power(sessions, method=method), expected, rtol=1e-12
+        )
+
+    def test_output_shape(self, sessions):
+        assert session_band_power(sessions).shape == (5, 15, len(BANDS))
+
+    @pytest.mark.parametrize("budget", [1, 100_000, 10_000_000])
+    def test_memory_budget_does_not_change_output(self, sessions, budget):
+        np.testing.assert_allclose(
+            session_band_power(sessions, memory_budget=budget),
+            session_band_power(sessions),
+            rtol=1e-12,
+        )
+
+    def test_budget_bounds_peak_memory(self):
+        sessions = np.zeros((8, 256 * 60, 4))
+        tracemalloc.start()
+        session_band_power(sessions, memory_budget=1 << 20)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        output = 8 * 239 * len(BANDS) * 8
+        assert peak < output + 4 * (1 << 20)
+
+    def test_short_sessions_return_empty(self):
+        assert session_band_power(np.zeros((3, 100, 4))).shape == (
+            3,
+            0,
+            len(BANDS),
+        )
+
+    def test_rejects_two_dimensional_input(self, signal):
+        with pytest.raises(ValueError):
+            session_band_power(signal)
+
+    def test_rejects_unknown_method(self, sessions):
+        with pytest.raises(ValueError):
+            session_band_power(sessions, method="fft")
+
+    @pytest.mark.parametrize("method", PSD_METHODS)
+    def test_float32_plan_stays_in_float32(self, sessions, method):
+        plan = get_plan(dtype="float32")
+        powers = session_band_power(sessions, plan, method)
+        assert powers.dtype == np.float32
+        np.testing.assert_allclose(
+            powers, session_band_power(sessions, method=method), rtol=1e-5
+        )
+
+
+class TestEstimators:
+    def test_periodogram_rectangular_matches_fft_scaling(self, signal):
+        x = signal[:256, 0]
+        expected = np.abs(np.fft.rfft(x)) ** 2 / 256**2
+        np.testing.assert_allclose(periodogram(x, get_plan()), expected)
+
+    def test_welch_matches_scipy_up_to_scaling(self, signal):
+        plan = get_plan(window="hann")
+        x = signal.T
+        freqs, density = scipy_welch(x, fs=256, nperseg=256, detrend=False)
+        ours = welch(x, plan)
+        # scipy returns a doubled one-sided density; ours is power per bin
+        np.testing.assert_allclose(
+            ours[:, 1:-1], density[:, 1:-1] / 2, rtol=1e-10
+        )
+
+    def test_multitaper_tapers_are_cached(self):
+        assert dpss_tapers(256) is dpss_tapers(256)
+
+    @pytest.mark.parametrize("dtype", ["float32", "float64"])
+    def test_multitaper_reuses_cached_tapers(self, signal, dtype):
+        plan = get_plan(dtype=dtype)
+        windows = sliding_windows(signal).astype(dtype)
+        multitaper(windows, plan)
+        before = dpss_tapers.cache_info()
+        multitaper(windows, plan)
+        after = dpss_tapers.cache_info()
+        assert after.hits == before.hits + 1
+        assert after.misses == before.misses
+        assert dpss_tapers(256, dtype=dtype).dtype == dtype
+
+    def test_multitaper_tapers_have_unit_energy(self):
+        np.testing.assert_allclose((dpss_tapers(256) ** 2).sum(axis=1), 1.0)
+
+    def test_multitaper_output_shape(self, signal):
+        windows = sliding_windows(signal)
+        assert multitaper(windows, get_plan()).shape == (7, 4, 129)
+
+    @pytest.mark.parametrize("method", PSD_METHODS)
+    def test_methods_agree_on_white_noise(self, method):
+        rng = np.random.default_rng(5)
+        noise = rng.standard_normal((256 * 64, 4))
+        plan = get_plan(bands={"all": (1, 120)})
+        powers = band_power(noise, plan, method).mean()
+        # four unit-variance channels over 119 of 256 bins
+        assert powers == pytest.approx(4 * 119 / 256, rel=0.1)
+
+    @pytest.mark.parametrize("method", PSD_METHODS)
+    def test_band_power_shape_for_every_method(self, signal, method):
+        assert band_power(signal, method=method).shape == (7, len(BANDS))
+
+    def test_window_band_power_periodogram_matches_band_power(self, signal):
+        windows = sliding_windows(signal)
+        np.testing.assert_allclose(
+            window_band_power(windows, get_plan()).sum(axis=1),
+            band_power(signal),
+        )
+
+    def test_unknown_method_raises(self, signal):
+        with pytest.raises(ValueError):
+            band_power(signal, method="burg")
+
+    def test_recording_band_power_per_channel(self, signal):
+        powers = recording_band_power(signal.T, get_plan(window="hann"))
+        assert powers.shape == (4, len(BANDS))
+
+    @pytest.mark.parametrize("method", ["periodogram", "multitaper"])
+    def test_recording_band_power_whole_signal(self, signal, method):
+        powers = recording_band_power(signal.T, get_plan(), method)
+        assert powers.shape == (4, len(BANDS))
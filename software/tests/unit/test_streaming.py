@@ -0,0 +1,189 @@
+import numpy as np
+import pytest
+
+import spectral
+from streaming import BandPowerStream, SlidingBandPower
+
+
+@pytest.fixture
+def signal():
+    rng = np.random.default_rng(0)
+    return rng.uniform(-100, 100, size=(1024, 4))
+
+
+class TestBandPowerStreamInit:
+    def test_uses_plan_dimensions(self):
+        plan = spectral.get_plan(window_size=128, step_size=32)
+        stream = BandPowerStream(plan)
+        assert stream.window().shape == (128, 4)
+
+    def test_custom_plan_matches_batch(self, signal):
+        plan = spectral.get_plan(step_size=64, window="hann")
+        stream = BandPowerStream(plan)
+        np.testing.assert_allclose(
+            stream.push_chunk(signal), spectral.band_power(signal, plan)
+        )
+
+
+class TestPush:
+    def test_returns_none_until_window_full(self, signal):
+        stream = BandPowerStream()
+        results = [stream.push(s) for s in signal[:255]]
+        assert all(r is None for r in results)
+
+    def test_first_result_at_window_size(self, signal):
+        stream = BandPowerStream()
+        for s in signal[:255]:
+            stream.push(s)
+        result = stream.push(signal[255])
+        assert result.shape == (len(spectral.BANDS),)
+
+    def test_one_result_per_hop(self, signal):
+        stream = BandPowerStream()
+        results = [stream.push(s) for s in signal]
+        emitted = [i for i, r in enumerate(results) if r is not None]
+        assert emitted == [255, 383, 511, 639, 767, 895, 1023]
+
+    def test_matches_batch_band_power(self, signal):
+        stream = BandPowerStream()
+        results = [stream.push(s) for s in signal]
+        streamed = np.array([r for r in results if r is not None])
+        np.testing.assert_allclose(streamed, spectral.band_power(signal))
+
+    def test_rejects_wrong_channel_count(self):
+        stream = BandPowerStream()
+        with pytest.raises(ValueError):
+            stream.push([1.0, 2.0, 3.0])
+
+    def test_push_writes_into_out(self, signal):
+        stream = BandPowerStream()
+        out = np.empty(len(spectral.BANDS))
+        results = [stream.push(sample, out) for sample in signal[:384]]
+        emitted = [r for r in results if r is not None]
+        assert len(emitted) == 2
+        assert all(r is out for r in emitted)
+        np.testing.assert_allclose(out, spectral.band_power(signal[:384])[1])
+
+    def test_tapered_window_matches_batch(self, signal):
+        plan = spectral.get_plan(window="hann")
+        stream = BandPowerStream(plan)
+        np.testing.assert_allclose(
+            stream.push_chunk(signal), spectral.band_power(signal, plan)
+        )
+
+
+class TestPushChunk:
+    @pytest.mark.parametrize("chunk_size", [1, 7, 128, 300, 1024])
+    def test_chunked_matches_batch(self, signal, chunk_size):
+        stream = BandPowerStream()
+        results = [
+            stream.push_chunk(signal[i : i + chunk_size])
+            for i in range(0, len(signal), chunk_size)
+        ]
+        np.testing.assert_allclose(
+            np.concatenate(results), spectral.band_power(signal)
+        )
+
+    def test_empty_chunk_returns_empty(self):
+        stream = BandPowerStream()
+        result = stream.push_chunk(np.empty((0, 4)))
+        assert result.shape == (0, len(spectral.BANDS))
+
+    @pytest.mark.parametrize("chunk_size", [1, 32, 300])
+    def test_writes_into_out(self, signal, chunk_size):
+        stream = BandPowerStream()
+        out = np.empty((stream.max_results(chunk_size), len(spectral.BANDS)))
+        results = []
+        for i in range(0, len(signal), chunk_size):
+            chunk = stream.push_chunk(signal[i : i + chunk_size], out)
+            assert chunk.base is out or len(chunk) == 0
+            results.append(chunk.copy())
+        np.testing.assert_allclose(
+            np.concatenate(results), spectral.band_power(signal)
+        )
+
+    def test_rejects_small_out(self, signal):
+        stream = BandPowerStream()
+        with pytest.raises(ValueError):
+            stream.push_chunk(signal[:512], np.empty((1, len(spectral.BANDS))))
+
+
+class TestWindow:
+    def test_window_is_latest_samples_in_order(self, signal):
+        stream = BandPowerStream()
+        stream.push_chunk(signal[:300])
+        np.testing.assert_array_equal(stream.window(), signal[44:300])
+
+    def test_window_is_view_of_ring(self, signal):
+        stream = BandPowerStream()
+        stream.push_chunk(signal[:300])
+        assert stream.window().base is not None
+
+    def test_reset_discards_samples(self, signal):
+        stream = BandPowerStream()
+        stream.push_chunk(signal[:255])
+        stream.reset()
+        assert stream.push(signal[255]) is None
+
+
+class TestSlidingBandPower:
+    def test_rejects_zero_update_interval(self):
+        with pytest.raises(ValueError):
+            SlidingBandPower(update_every=0)
+
+    def test_rejects_tapered_window(self):
+        with pytest.raises(ValueError):
+            SlidingBandPower(spectral.get_plan(window="hann"))
+
+    def test_gamma_plan_agrees_with_fft(self, signal):
+        plan = spectral.get_plan(include_gamma=True)
+        sliding = SlidingBandPower(plan, update_every=128)
+        np.testing.assert_allclose(
+            sliding.push_chunk(signal),
+            spectral.band_power(signal, plan),
+            rtol=1e-9,
+        )
+
+    def test_first_result_at_window_size(self, signal):
+        sliding = SlidingBandPower(update_every=4)
+        assert len(sliding.push_chunk(signal[:255])) == 0
+        assert sliding.push(signal[255]) is not None
+
+    def test_result_every_update_interval(self, signal):
+        sliding = SlidingBandPower(update_every=16)
+        results = sliding.push_chunk(signal)
+        assert len(results) == (len(signal) - 256) // 16 + 1
+
+    def test_agrees_with_fft_at_hop_boundaries(self, signal):
+        sliding = SlidingBandPower(update_every=16)
+        results = sliding.push_chunk(signal)
+        np.testing.assert_allclose(
+            results[::8], spectral.band_power(signal), rtol=1e-9
+        )
+
+    @pytest.mark.parametrize("chunk_size", [1, 5, 256, 1000])
+    def test_chunking_does_not_change_results(self, signal, chunk_size):
+        expected = SlidingBandPower(update_every=8).push_chunk(signal)
+        sliding = SlidingBandPower(update_every=8)
+        results = np.concatenate(
+            [
+                sliding.push_chunk(signal[i : i + chunk_size])
+                for i in range(0, len(signal), chunk_size)
+            ]
+        )
+        np.testing.assert_allclose(results, expected, rtol=1e-9)
+
+    def test_no_drift_over_long_stream(self):
+        rng = np.random.default_rng(1)
+        signal = rng.uniform(-100, 100, size=(256 * 200, 4))
+        sliding = SlidingBandPower(update_every=128)
+        results = sliding.push_chunk(signal)
+        np.testing.assert_allclose(
+            results[-1], spectral.band_power(signal[-256:])[0], rtol=1e-9
+        )
+
+    def test_reset_discards_samples(self, signal):
+        sliding = SlidingBandPower()
+        sliding.push_chunk(signal[:255])
+        sliding.reset()
+        assert sliding.push(signal[255]) is None
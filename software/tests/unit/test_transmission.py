@@ -1,28 +1,69 @@
+import io
+import mmap
 import struct
-from unittest.mock import MagicMock, call
+from unittest.mock import MagicMock
 
+import numpy as np
 import pandas as pd
+import pytest
 
+from checksums import Crc8Checksum
 from transmission import (
+    PACKET_SIZE,
     PAYLOAD_LENGTH,
+    PROTOCOL_VERSION,
+    PROTOCOLS,
     SYNC_BYTE_1,
     SYNC_BYTE_2,
+    PacketDecoder,
+    PacketEncoder,
+    decode_capture,
+    detect_version,
     df_to_packet,
+    encode_packets,
+    get_protocol,
     packet_to_df,
+    read_frames,
     receive,
     transmit,
     validate_packet,
+    validate_packets,
     xor_checksum,
 )
 
 SAMPLE_ROW = {"delta": 41, "theta": 86, "alpha": 31, "beta": 12}
 
 
+class _ByteSerial:
+    """serial.Serial stand-in that serves a fixed byte stream."""
+
+    def __init__(self, data: bytes):
+        self._stream = io.BytesIO(data)
+        self.reads = []
+
+    @property
+    def in_waiting(self):
+        return len(self._stream.getbuffer()) - self._stream.tell()
+
+    def read(self, size=1):
+        self.reads.append(size)
+        return self._stream.read(size)
+
+
+def _stream(n=20, seed=0, version=PROTOCOL_VERSION):
+    """Returns n encoded packets and their (alpha, beta, theta, delta)."""
+    rng = np.random.default_rng(seed)
+    values = rng.integers(0, 65536, size=(n, 4))
+    packets = encode_packets(values, version=version)
+    return packets.tobytes(), [tuple(v) for v in values]
+
+
 def build_valid_packet(delta=41, theta=86, alpha=31, beta=12) -> bytes:
-    """Build a packet using the same logic as df_to_packet for use in tests."""
+    """Build a packet as EEG_Packet_Parser.sv expects it: the XOR covers LEN
+    and the payload."""
     header = bytes([SYNC_BYTE_1, SYNC_BYTE_2, PAYLOAD_LENGTH])
     payload = struct.pack(">HHHH", alpha, beta, theta, delta)
-    checksum = xor_checksum(payload)
+    checksum = xor_checksum(header[2:] + payload)
     return header + payload + bytes([checksum])
 
 
@@ -106,9 +147,9 @@ class TestDfToPacket:
 
     def test_checksum_comparison_is_accurate(self):
         packet = df_to_packet(SAMPLE_ROW)
-        payload = packet[3:-1]
+        len_and_payload = packet[2:-1]  # as EEG_Packet_Parser.sv checks
 
-        assert packet[-1] == xor_checksum(payload)
+        assert packet[-1] == xor_checksum(len_and_payload)
 
     def test_zero_payload_returns_true(self):
         row = {"delta": 0, "theta": 0, "alpha": 0, "beta": 0}
@@ -125,6 +166,332 @@ class TestDfToPacket:
         assert validate_packet(packet) is True
 
 
+class TestPacketEncoder:
+    def test_matches_df_to_packet(self):
+        bands = ["delta", "theta", "alpha", "beta"]
+        encoder = PacketEncoder(bands)
+        rng = np.random.default_rng(0)
+        for powers in rng.uniform(-1000, 80000, size=(200, 4)):
+            expected = df_to_packet(dict(zip(bands, powers)))
+            assert bytes(encoder.encode(powers)) == expected
+
+    def test_reuses_one_buffer(self):
+        encoder = PacketEncoder()
+        first = encoder.encode(np.array([1.0, 2.0, 3.0, 4.0]))
+        second = encoder.encode(np.array([5.0, 6.0, 7.0, 8.0]))
+        assert first is second
+        assert len(second) == PACKET_SIZE
+        assert validate_packet(bytes(second))
+
+    def test_extra_bands_are_ignored(self):
+        bands = ["delta", "theta", "alpha", "beta", "gamma"]
+        encoder = PacketEncoder(bands)
+        powers = np.array([41.0, 86.0, 31.0, 12.0, 500.0])
+        assert bytes(encoder.encode(powers)) == build_valid_packet()
+
+    def test_rejects_missing_band(self):
+        with pytest.raises(ValueError):
+            PacketEncoder(["delta", "theta", "alpha"])
+
+
+class TestEncodePackets:
+    def test_matches_df_to_packet(self):
+        rng = np.random.default_rng(0)
+        powers = rng.uniform(-1000, 80000, size=(500, 4))
+        packets = encode_packets(powers)
+        assert packets.shape == (500, PACKET_SIZE)
+        expected = b"".join(
+            df_to_packet(dict(zip(["alpha", "beta", "theta", "delta"], row)))
+            for row in powers
+        )
+        assert packets.tobytes() == expected
+
+    def test_reorders_columns_by_band_names(self):
+        bands = ["delta", "theta", "alpha", "beta", "gamma"]
+        packets = encode_packets([[41.0, 86.0, 31.0, 12.0, 9.0]], bands)
+        assert packets.tobytes() == build_valid_packet()
+
+    def test_empty_input(self):
+        assert encode_packets(np.empty((0, 4))).shape == (0, PACKET_SIZE)
+
+    def test_rejects_wrong_shape(self):
+        with pytest.raises(ValueError):
+            encode_packets([1.0, 2.0, 3.0, 4.0])
+
+    def test_rejects_missing_band(self):
+        with pytest.raises(ValueError):
+            encode_packets(np.ones((1, 3)), ["delta", "theta", "alpha"])
+
+
+class TestPacketDecoder:
+    @pytest.mark.parametrize("block", [1, 5, 12, 100, 1000])
+    def test_any_block_size(self, block):
+        data, values = _stream()
+        decoder = PacketDecoder()
+        frames = []
+        for i in range(0, len(data), block):
+            frames.extend(decoder.feed(data[i : i + block]))
+        assert frames == values
+        assert decoder.skipped == 0
+
+    @pytest.mark.parametrize("position", range(PACKET_SIZE))
+    def test_corrupted_byte_costs_one_packet(self, position):
+        data, values = _stream()
+        corrupted = bytearray(data)
+        corrupted[5 * PACKET_SIZE + position] ^= 0x5A
+        frames = PacketDecoder().feed(bytes(corrupted))
+        assert frames == values[:5] + values[6:]
+
+    @pytest.mark.parametrize("position", [0, 2, 3, 11])
+    def test_dropped_byte_costs_one_packet(self, position):
+        data, values = _stream()
+        index = 5 * PACKET_SIZE + position
+        frames = PacketDecoder().feed(data[:index] + data[index + 1 :])
+        assert frames == values[:5] + values[6:]
+
+    def test_extra_bytes_are_skipped(self):
+        data, values = _stream()
+        decoder = PacketDecoder()
+        noisy = b"\x00\xaa" + data[:60] + b"\xaa\x55" + data[60:]
+        assert decoder.feed(noisy) == values
+        assert decoder.skipped == 4
+
+    def test_sync_pattern_inside_payload(self):
+        values = [(0xAA55, 0x0800, 0xAA55, 0x0808)] * 3
+        data = encode_packets(values).tobytes()
+        assert PacketDecoder().feed(data) == values
+
+    def test_buffer_stays_bounded(self):
+        data, _ = _stream(2000)
+        decoder = PacketDecoder()
+        for i in range(0, len(data), 777):
+            decoder.feed(data[i : i + 777])
+            assert len(decoder._buffer) < PACKET_SIZE
+        assert decoder.packets == 2000
+        assert decoder.bytes == len(data)
+
+    def test_needed_counts_missing_bytes(self):
+        decoder = PacketDecoder()
+        decoder.feed(build_valid_packet()[:7])
+        assert decoder.needed == 5
+
+
+class TestDecodeCapture:
+    def test_aligned_capture_is_a_view(self):
+        data, values = _stream(100)
+        capture = decode_capture(data)
+        assert np.shares_memory(capture.frames, np.frombuffer(data, np.uint8))
+        assert list(map(tuple, capture.values())) == values
+        assert len(capture.bad) == 0
+        assert capture.skipped == 0
+
+    def test_memory_mapped_file(self, tmp_path):
+        data, values = _stream(100)
+        path = tmp_path / "capture.bin"
+        path.write_bytes(data)
+        assert list(map(tuple, decode_capture(path).values())) == values
+        with open(path, "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                capture = decode_capture(m)
+                assert len(capture) == 100
+                del capture  # release the export before the map closes
+
+    def test_bad_checksum_is_reported(self):
+        data, values = _stream()
+        corrupted = bytearray(data)
+        corrupted[7 * PACKET_SIZE + 4] ^= 0x01
+        capture = decode_capture(memoryview(corrupted))
+        assert capture.bad.tolist() == [7]
+        assert len(capture) == 20
+        expected = values[:7] + values[8:]
+        assert list(map(tuple, capture.values())) == expected
+
+    @pytest.mark.parametrize("position", [0, 1, 3, 6, 11])
+    def test_dropped_byte_costs_one_packet(self, position):
+        data, values = _stream()
+        index = 5 * PACKET_SIZE + position
+        capture = decode_capture(data[:index] + data[index + 1 :])
+        assert list(map(tuple, capture.values())) == values[:5] + values[6:]
+        assert capture.skipped == PACKET_SIZE - 1
+
+    @pytest.mark.parametrize("position", [1, 3, 6, 11])
+    def test_extra_byte_costs_one_packet(self, position):
+        data, values = _stream()
+        index = 5 * PACKET_SIZE + position
+        capture = decode_capture(data[:index] + b"\x00" + data[index:])
+        assert list(map(tuple, capture.values())) == values[:5] + values[6:]
+        assert capture.skipped == PACKET_SIZE + 1
+
+    @pytest.mark.parametrize("position", [0, 1, 4, 6, 11])
+    def test_dropped_byte_in_second_to_last_packet(self, position):
+        data, values = _stream(3)
+        index = PACKET_SIZE + position
+        capture = decode_capture(data[:index] + data[index + 1 :])
+        assert list(map(tuple, capture.values())) == [values[0], values[2]]
+        assert len(capture.bad) == 0
+
+    def test_bad_last_packet_is_reported(self):
+        data, values = _stream(3)
+        corrupted = bytearray(data)
+        corrupted[-2] ^= 0x01
+        capture = decode_capture(bytes(corrupted))
+        assert capture.bad.tolist() == [2]
+        assert list(map(tuple, capture.values()))[:2] == values[:2]
+
+    def test_garbage_and_partial_frames_are_skipped(self):
+        data, values = _stream()
+        capture = decode_capture(b"\x01\xaa\x55" + data + data[:7])
+        assert list(map(tuple, capture.values())) == values
+        assert capture.skipped == 10
+
+    def test_empty_capture(self, tmp_path):
+        path = tmp_path / "empty.bin"
+        path.write_bytes(b"")
+        for source in (b"", path):
+            capture = decode_capture(source)
+            assert len(capture) == 0
+            assert capture.values().shape == (0, 4)
+
+    def test_to_frame_matches_receive(self):
+        data, _ = _stream(10)
+        pd.testing.assert_frame_equal(
+            decode_capture(data).to_frame(),
+            receive(_ByteSerial(data), 10),
+            check_dtype=False,
+        )
+
+
+class TestProtocolVersions:
+    def test_version_1_layout(self):
+        packet = df_to_packet(SAMPLE_ROW, version=1)
+        assert len(packet) == get_protocol(1).size == PACKET_SIZE + 1
+        assert packet[:4] == bytes([SYNC_BYTE_1, SYNC_BYTE_2, 9, 1])
+        assert packet[4:12] == struct.pack(">HHHH", 31, 12, 86, 41)
+        assert packet[-1] == Crc8Checksum().compute(packet[2:-1])
+
+    def test_default_matches_the_fpga_parser(self):
+        assert PROTOCOL_VERSION == 2
+        packet = df_to_packet(SAMPLE_ROW)
+        assert packet == build_valid_packet()
+        assert packet[:3] == df_to_packet(SAMPLE_ROW, version=0)[:3]
+        assert packet[-1] == df_to_packet(SAMPLE_ROW, version=0)[-1] ^ 8
+
+    def test_validate_packet_accepts_either_unversioned_rule(self):
+        fpga = df_to_packet(SAMPLE_ROW, version=2)
+        legacy = df_to_packet(SAMPLE_ROW, version=0)
+        assert validate_packet(fpga) and validate_packet(legacy)
+        assert validate_packet(fpga, 2) and not validate_packet(fpga, 0)
+        assert validate_packet(legacy, 0) and not validate_packet(legacy, 2)
+
+    def test_unknown_version(self):
+        with pytest.raises(ValueError):
+            get_protocol(3)
+        with pytest.raises(ValueError):
+            encode_packets(np.ones((1, 4)), version=7)
+
+    @pytest.mark.parametrize("version", sorted(PROTOCOLS))
+    def test_encoders_agree(self, version):
+        rng = np.random.default_rng(1)
+        powers = rng.uniform(-10, 70000, size=(50, 4))
+        encoder = PacketEncoder(version=version)
+        expected = b"".join(
+            df_to_packet(
+                dict(zip(["alpha", "beta", "theta", "delta"], row)), version
+            )
+            for row in powers
+        )
+        assert (
+            b"".join(bytes(encoder.encode(row)) for row in powers) == expected
+        )
+        assert encode_packets(powers, version=version).tobytes() == expected
+
+    @pytest.mark.parametrize("version", sorted(PROTOCOLS))
+    def test_decoders_round_trip(self, version):
+        data, values = _stream(30, version=version)
+        assert PacketDecoder(version).feed(data) == values
+        capture = decode_capture(data, version)
+        assert list(map(tuple, capture.values())) == values
+        assert capture.version == version
+        assert receive(_ByteSerial(data), 30, version).shape == (30, 4)
+
+    def test_version_1_corruption_costs_one_packet(self):
+        data, values = _stream(version=1)
+        size = get_protocol(1).size
+        for position in range(size):
+            corrupted = bytearray(data)
+            corrupted[5 * size + position] ^= 0x01
+            frames = PacketDecoder(1).feed(bytes(corrupted))
+            assert frames == values[:5] + values[6:]
+
+    def test_validate_packet_reads_the_version(self):
+        packet = df_to_packet(SAMPLE_ROW, version=1)
+        assert validate_packet(packet)
+        assert not validate_packet(packet[:-1] + bytes([packet[-1] ^ 1]))
+        assert not validate_packet(packet[:-1])
+        assert validate_packet(df_to_packet(SAMPLE_ROW))
+
+    @pytest.mark.parametrize("version", sorted(PROTOCOLS))
+    def test_validate_packets(self, version):
+        data, _ = _stream(10, version=version)
+        corrupted = bytearray(data)
+        corrupted[-1] ^= 0xFF
+        assert validate_packets(bytes(corrupted), version).tolist() == (
+            [True] * 9 + [False]
+        )
+        rows = np.frombuffer(data, np.uint8).reshape(10, -1)
+        assert validate_packets(rows, version).all()
+
+    def test_validate_packets_rejects_partial_packets(self):
+        with pytest.raises(ValueError):
+            validate_packets(build_valid_packet()[:-1])
+
+    def test_versions_reject_each_other(self):
+        v0, _ = _stream(5, version=0)
+        v1, _ = _stream(5, version=1)
+        assert PacketDecoder(0).feed(v1) == []
+        assert PacketDecoder(1).feed(v0) == []
+
+    @pytest.mark.parametrize("version", sorted(PROTOCOLS))
+    def test_detect_version(self, version):
+        data, _ = _stream(5, version=version)
+        assert detect_version(b"\x00\xaa" + data) == version
+        assert detect_version(b"\xaa\x55\x08\x01") is None
+
+    @pytest.mark.parametrize("version", sorted(PROTOCOLS))
+    def test_decoders_adopt_the_sender_version(self, version):
+        data, values = _stream(30, version=version)
+        decoder = PacketDecoder(None)
+        frames = []
+        for i in range(0, len(data), 5):
+            frames.extend(decoder.feed(data[i : i + 5]))
+        assert frames == values
+        assert decoder.protocol.version == version
+        assert decode_capture(data, None).version == version
+
+    @pytest.mark.parametrize("version", sorted(PROTOCOLS))
+    def test_receive_adopts_the_sender_version(self, version):
+        data, values = _stream(30, version=version)
+        ser = _ByteSerial(b"\x00\x01" + data)
+        result = receive(ser, 30, None)
+        assert list(map(tuple, result.to_numpy())) == values
+        assert sum(ser.reads) <= len(data) + 2 + get_protocol(1).size
+
+    def test_receive_without_any_packet(self):
+        assert receive(_ByteSerial(b"\x00" * 40), 5, None).empty
+
+
+class TestReadFrames:
+    def test_drains_port_in_blocks(self):
+        data, values = _stream(100)
+        ser = _ByteSerial(data)
+        assert list(read_frames(ser, block_size=500)) == values
+        assert ser.reads[:3] == [500, 500, 200]
+
+    def test_stops_on_timeout(self):
+        ser = _ByteSerial(b"")
+        assert list(read_frames(ser)) == []
+
+
 class TestPacketToDf:
     def _mock_serial(self, data: bytes) -> MagicMock:
         """Create a mock serial connection and return the object."""
@@ -188,7 +555,7 @@ class TestTransmit:
 
         mock_ser.write.assert_called_once()
 
-    def test_multiple_rows_calls_write_once_per_row(self):
+    def test_multiple_rows_are_written_at_once(self):
         packet = build_valid_packet()
         mock_ser = self._mock_serial(packet)
         df = self._convert_to_df(
@@ -202,7 +569,18 @@ class TestTransmit:
         )
         transmit(df, mock_ser)
 
-        assert mock_ser.write.call_count == 5
+        mock_ser.write.assert_called_once()
+        (data,) = mock_ser.write.call_args.args
+        assert len(data) == 5 * PACKET_SIZE
+
+    def test_prints_nothing(self, capsys):
+        mock_ser = self._mock_serial(build_valid_packet())
+        df = self._convert_to_df(
+            [{"delta": 41, "theta": 86, "alpha": 31, "beta": 12}]
+        )
+        transmit(df, mock_ser)
+
+        assert capsys.readouterr().out == ""
 
     def test_writes_correct_bytes(self):
         packet = build_valid_packet()
@@ -230,8 +608,8 @@ class TestTransmit:
         df = self._convert_to_df(rows)
         transmit(df, mock_ser)
 
-        expected_calls = [call(df_to_packet(x)) for x in rows]
-        mock_ser.write.assert_has_calls(expected_calls, any_order=False)
+        expected = b"".join(df_to_packet(x) for x in rows)
+        mock_ser.write.assert_called_once_with(expected)
 
 
 class TestReceive:
@@ -288,6 +666,23 @@ class TestReceive:
         assert len(result) == 0
         mock_ser.read.assert_not_called()  # check that packet_to_df not called
 
+    def test_dropped_byte_costs_one_row(self):
+        data, values = _stream(4)
+        result = receive(_ByteSerial(data[:3] + data[4:]), 4)
+        assert list(map(tuple, result.to_numpy())) == values[1:]
+
+    def test_reads_past_noise_to_finish_last_packet(self):
+        data, values = _stream(4)
+        ser = _ByteSerial(data[:24] + b"\x00" + data[24:])
+        result = receive(ser, 4)
+        assert list(map(tuple, result.to_numpy())) == values
+        assert ser.reads == [48, 1]
+
+    def test_stops_when_read_times_out(self):
+        data, values = _stream(2)
+        result = receive(_ByteSerial(data), 5)
+        assert len(result) == 2
+
     def test_invalid_packet_skipped(self):
         packet = bytearray(build_valid_packet())
         packet[-1] ^= 0xFF  # flip the checksum byte to make it invalid
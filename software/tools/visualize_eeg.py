@@ -1,13 +1,19 @@
 import argparse
+import sys
 import time
 from pathlib import Path
 
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-from scipy.signal import welch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+import recording  # noqa: E402
+import spectral  # noqa: E402
 
 CSV_FILE = Path("muse2_eeg_data.csv")
+BLOCK_SIZE = 65536  # samples of a binary recording processed at a time
+MAX_PLOT_POINTS = 100_000  # time-series points drawn per channel
 
 
 def read_csv():
@@ -17,6 +23,16 @@ def read_csv():
     return df
 
 
+def load_data(path=CSV_FILE):
+    """Load a CSV as a DataFrame, or memory-map a binary .nsrec recording."""
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Data file not found: {path.resolve()}")
+    if path.suffix == recording.EXTENSION:
+        return recording.load(path)
+    return pd.read_csv(path)
+
+
 def band_definitions():
     return {
         "delta": (0.5, 4),
@@ -27,21 +43,107 @@ def band_definitions():
     }
 
 
-def compute_band_power(signal, sf, band, nperseg=256):
-    """Compute band power for a 1D signal using Welch's method.
+def compute_band_power(df, sf, method="welch", nperseg=256):
+    """Compute power in every band for every channel in one pass.
+
+    Uses the shared spectral estimators with a Hann window over the whole
+    recording, per channel rather than summed across channels. The numbers
+    are not comparable with data_processing.transform_to_hz, which applies a
+    rectangular window to each 256-sample block and sums across channels.
+
+    Returns a DataFrame indexed by channel with one column per band.
+    """
+    channels = [c for c in df.columns if c.startswith("ch")]
+    plan = spectral.get_plan(
+        sampling_rate=sf,
+        window_size=nperseg,
+        step_size=nperseg // 2,
+        window="hann",
+        bands=band_definitions(),
+        channels=channels,
+    )
+    signal = df[channels].to_numpy(dtype=float).T
+    powers = spectral.recording_band_power(signal, plan, method)
+    return pd.DataFrame(powers, index=channels, columns=plan.band_names)
+
 
-    Returns the power (area) within the requested band.
+def compute_recording_band_power(rec, method="welch", nperseg=256):
+    """Compute per-channel band power of a memory-mapped recording.
+
+    Samples are read one block at a time and per-window estimates are
+    averaged, so the recording is never loaded whole. For Welch this is
+    exactly the whole-recording estimate of compute_band_power.
     """
-    f, Pxx = welch(signal, fs=sf, nperseg=min(nperseg, len(signal)))
-    low, high = band
-    mask = (f >= low) & (f <= high)
-    # integrate PSD over the band
-    power = np.trapz(Pxx[mask], f[mask]) if np.any(mask) else 0.0
-    return power
+    plan = spectral.get_plan(
+        sampling_rate=rec.sampling_rate,
+        window_size=nperseg,
+        step_size=nperseg // 2,
+        window="hann",
+        bands=band_definitions(),
+        channels=rec.channels,
+    )
+    total = np.zeros((len(rec.channels), plan.n_bands))
+    count = 0
+
+    for start, stop in spectral.window_blocks(len(rec), plan, BLOCK_SIZE):
+        windows = spectral.sliding_windows(
+            np.asarray(rec.samples[start:stop], dtype=float),
+            plan.window_size,
+            plan.step_size,
+        )
+        if method == "welch":
+            power = spectral.periodogram(windows, plan) @ plan.band_indicator
+        else:
+            power = spectral.window_band_power(windows, plan, method)
+        total += power.sum(axis=0)
+        count += len(windows)
+
+    if count == 0:
+        raise ValueError(f"recording is shorter than {nperseg} samples")
+    return pd.DataFrame(
+        total / count, index=list(rec.channels), columns=plan.band_names
+    )
+
+
+def plot_recording(rec, band=None, method="welch"):
+    """Static plot of a binary recording, decimated for the time series."""
+    if band is None:
+        stride = max(1, len(rec) // MAX_PLOT_POINTS)
+        timestamps = rec.timestamps[::stride]
+        plt.figure(figsize=(12, 6))
+        for index, ch in enumerate(rec.channels):
+            plt.plot(timestamps, rec.samples[::stride, index], label=ch)
+
+        plt.xlabel("Time (s)")
+        plt.ylabel("Amplitude")
+        plt.title("Muse EEG channels")
+        plt.legend(loc="upper right")
+        plt.tight_layout()
+        plt.show()
+        return
+
+    bands = band_definitions()
+    if band not in bands:
+        raise ValueError(
+            f"Unknown band: {band}. Choose from {list(bands.keys())}"
+        )
 
+    lowhigh = bands[band]
+    powers = compute_recording_band_power(rec, method)[band].to_dict()
 
-def plot_static(band=None, sf=256.0):
-    df = read_csv()
+    plt.figure(figsize=(8, 4))
+    plt.bar(powers.keys(), powers.values())
+    plt.ylabel("Band power")
+    plt.title(f"{band.capitalize()} band power ({lowhigh[0]}-{lowhigh[1]} Hz)")
+    plt.tight_layout()
+    plt.show()
+
+
+def plot_static(band=None, sf=256.0, method="welch", path=CSV_FILE):
+    df = load_data(path)
+    if isinstance(df, recording.Recording):
+        plot_recording(df, band, method)
+        return
     if df.empty:
         print("No data in CSV.")
         return
@@ -71,11 +173,7 @@ def plot_static(band=None, sf=256.0):
     lowhigh = bands[band]
 
     # compute band power per channel over the whole recording
-    powers = {}
-    for ch in channels:
-        sig = df[ch].to_numpy()
-        p = compute_band_power(sig, sf, lowhigh)
-        powers[ch] = p
+    powers = compute_band_power(df, sf, method)[band].to_dict()
 
     # plot
     plt.figure(figsize=(8, 4))
@@ -86,7 +184,9 @@ def plot_static(band=None, sf=256.0):
     plt.show()
 
 
-def plot_live(poll_interval=1.0, window=10.0, band=None, sf=256.0):
+def plot_live(
+    poll_interval=1.0, window=10.0, band=None, sf=256.0, method="welch"
+):
     plt.ion()
     fig, ax = plt.subplots(figsize=(12, 6))
 
@@ -134,12 +234,7 @@ def plot_live(poll_interval=1.0, window=10.0, band=None, sf=256.0):
                 # compute band power per channel and display as bar chart
                 if band not in bands:
                     raise ValueError(f"Unknown band: {band}")
-                lowhigh = bands[band]
-                powers = []
-                for ch in channels:
-                    sig = df[ch].to_numpy()
-                    p = compute_band_power(sig, sf, lowhigh)
-                    powers.append(p)
+                powers = compute_band_power(df, sf, method)[band].tolist()
 
                 ax.clear()
                 ax.bar(channels, powers)
@@ -156,6 +251,12 @@ def plot_live(poll_interval=1.0, window=10.0, band=None, sf=256.0):
 
 def main():
     parser = argparse.ArgumentParser(description="Visualize Muse EEG CSV data")
+    parser.add_argument(
+        "--file",
+        type=Path,
+        default=CSV_FILE,
+        help="CSV or binary .nsrec recording to plot (static mode)",
+    )
     parser.add_argument(
         "--live",
         action="store_true",
@@ -185,6 +286,12 @@ def main():
         default=256.0,
         help="Sampling frequency (Hz) of the EEG data",
     )
+    parser.add_argument(
+        "--method",
+        choices=spectral.PSD_METHODS,
+        default="welch",
+        help="PSD estimator used for band power",
+    )
 
     args = parser.parse_args()
 
@@ -194,9 +301,12 @@ def main():
             window=args.window,
             band=args.band,
             sf=args.sf,
+            method=args.method,
         )
     else:
-        plot_static(band=args.band, sf=args.sf)
+        plot_static(
+            band=args.band, sf=args.sf, method=args.method, path=args.file
+        )
 
 
 if __name__ == "__main__":